@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-import json
+import math
 import time
 import sqlite3
 from datetime import date, datetime, timezone
+from json.encoder import encode_basestring_ascii as _json_str
 
 import keyring
 from fastapi import APIRouter, Request
@@ -61,6 +62,70 @@ def _parse_last_event_id(value: str | None) -> int:
     return max(0, parsed)
 
 
+_SSE_KEEPALIVE_S = 15.0
+# Events read per poll; a full page means more are waiting, so the next poll
+# runs without the usual sleep.
+_SSE_EVENT_PAGE = 256
+_STALE_ACTIVE_JOB_S = 60 * 30
+
+
+def _message_date_key(message: str) -> str:
+    """Return the ``YYYY-MM-DD`` prefix of a ``[YYYY-MM-DD] ...`` job message."""
+    if message and message[0] == "[":
+        pot = message[1:11]
+        if len(pot) == 10 and pot[4] == "-" and pot[7] == "-":
+            return pot
+    return ""
+
+
+# SSE frames are yielded as bytes so StreamingResponse does not re-encode
+# every chunk; the constant parts are encoded once here.
+_SSE_NOT_FOUND = b"event: error\ndata: not_found\n\n"
+_SSE_KEEPALIVE = b": keepalive\n\n"
+_SSE_PROGRESS_PREFIX = b"event: progress\ndata: "
+_SSE_SEP = b"\n\n"
+
+
+def _log_event(event_id: int, ts: str, level: str, text: str) -> bytes:
+    # Fixed-shape payload: build the JSON directly instead of allocating a
+    # dict and running the encoder for every event. The escaper emits ASCII
+    # only, so the ascii codec is sufficient.
+    return (
+        f"id: {event_id}\nevent: log\n"
+        f'data: {{"id":{event_id},"ts":{_json_str(ts)},"level":{_json_str(level)},'
+        f'"text":{_json_str(text)}}}\n\n'
+    ).encode("ascii")
+
+
+def _raw_event(event_id: int, event: str, data: str) -> bytes:
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _json_num(value: object) -> str:
+    # repr() of NaN/inf is not JSON and would break JSON.parse in the client.
+    try:
+        f = float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return "0.0"
+    return repr(f) if math.isfinite(f) else "0.0"
+
+
+def _progress_event(job: repo.JobRow, date_key: str) -> bytes:
+    return (
+        _SSE_PROGRESS_PREFIX
+        + (
+            f'{{"status":{_json_str(job.status)},'
+            f'"current":{_json_num(job.progress_current)},'
+            f'"total":{_json_num(job.progress_total)},'
+            f'"message":{_json_str(job.message)},'
+            f'"date_key":{_json_str(date_key)},'
+            f'"created_at":{_json_str(job.created_at)},'
+            f'"updated_at":{_json_str(job.updated_at)}}}'
+        ).encode("ascii")
+        + _SSE_SEP
+    )
+
+
 def _job_age_seconds(updated_at: str) -> float:
     try:
         ts = datetime.fromisoformat(str(updated_at))
@@ -70,14 +135,17 @@ def _job_age_seconds(updated_at: str) -> float:
         return 0.0
 
 
+def _sync_worker_alive(job_id: str) -> bool:
+    try:
+        return bool(is_sync_worker_running(job_id=job_id))
+    except Exception:
+        return False
+
+
 def _is_stale_active_sync_job(job: repo.JobRow) -> tuple[bool, str]:
     age_s = _job_age_seconds(job.updated_at)
     status = str(job.status or "").strip().lower()
-    worker_alive = False
-    try:
-        worker_alive = is_sync_worker_running(job_id=job.id)
-    except Exception:
-        worker_alive = False
+    worker_alive = _sync_worker_alive(job.id)
 
     if status == "queued" and age_s > 120:
         # Don't mark as stale if the runner is busy with another job.
@@ -98,7 +166,7 @@ def _is_stale_active_sync_job(job: repo.JobRow) -> tuple[bool, str]:
         return True, "stale cancel_requested job (worker not running)"
     if status == "running" and not worker_alive and age_s > 45:
         return True, "stale running job (worker not running)"
-    if age_s > 60 * 30:
+    if age_s > _STALE_ACTIVE_JOB_S:
         return True, "stale job (no updates for 30m)"
     return False, ""
 
@@ -125,10 +193,21 @@ def start_sync():
     # Avoid piling up sync jobs if one is already running.
     conn0 = get_conn(_db_path())
     try:
-        active = repo.find_active_job(conn0, kind="sync")
+        # Jobs idle for 30m are stale regardless of worker state; let SQLite
+        # filter them out so the common path needs no timestamp parsing.
+        active = repo.find_active_job(
+            conn0, kind="sync", max_age_s=_STALE_ACTIVE_JOB_S
+        )
+        stale_reason = ""
+        if active is None:
+            active = repo.find_active_job(conn0, kind="sync")
+            stale_reason = "stale job (no updates for 30m)"
+        elif active.status != "running" or not _sync_worker_alive(active.id):
+            # A running job with a live worker and a fresh updated_at cannot
+            # be stale; only the other cases need the finer age checks.
+            _stale, stale_reason = _is_stale_active_sync_job(active)
         if active is not None:
-            stale, stale_reason = _is_stale_active_sync_job(active)
-            if not stale:
+            if not stale_reason:
                 return {"job_id": active.id, "already_running": True}
             try:
                 kill_sync_worker(job_id=str(active.id))
@@ -425,85 +504,94 @@ def get_job(job_id: str):
 def stream_events(job_id: str, request: Request):
     def gen():
         last_id = _parse_last_event_id(request.headers.get("last-event-id"))
-        while True:
-            conn = get_conn(_db_path())
-            try:
+        date_key_source: str | None = None
+        date_key = ""
+        last_progress_state: tuple | None = None
+        last_sent_at = 0.0
+        # One read connection for the whole stream, so polls reuse its cached
+        # statements. Each poll's reads finish before anything is yielded, so
+        # no read snapshot stays open while the client drains events.
+        conn = get_conn(_db_path(), readonly=True)
+        try:
+            while True:
                 job = repo.get_job(conn, job_id)
-                evs = repo.get_events_since(conn, job_id=job_id, last_id=last_id)
-            finally:
-                conn.close()
-
-            if job is None:
-                yield "event: error\ndata: not_found\n\n"
-                return
-
-            for r in evs:
-                event_id = int(r[0])
-                last_id = event_id
-                level = str(r[2])
-                text = str(r[3])
-                if level == "message_updated":
-                    # text is expected to be a JSON object string.
-                    yield f"id: {event_id}\nevent: message_updated\ndata: {text}\n\n"
-                    continue
-                if level == "detail":
-                    # text is expected to be a JSON object string.
-                    yield f"id: {event_id}\nevent: detail\ndata: {text}\n\n"
-                    continue
-                payload = {
-                    "id": event_id,
-                    "ts": str(r[1]),
-                    "level": level,
-                    "text": text,
-                }
-                yield (
-                    f"id: {event_id}\nevent: log\n"
-                    f"data: {json.dumps(payload, ensure_ascii=True)}\n\n"
+                evs = repo.get_events_since(
+                    conn, job_id=job_id, last_id=last_id, limit=_SSE_EVENT_PAGE
                 )
 
-            # Extract date_key if it exists in message for UI mapping
-            date_key = ""
-            if job.message and job.message.startswith("["):
-                pot = job.message[1:11]
-                if len(pot) == 10 and pot[4] == "-" and pot[7] == "-":
-                    date_key = pot
-
-            progress_payload = {
-                "status": job.status,
-                "current": job.progress_current,
-                "total": job.progress_total,
-                "message": job.message,
-                "date_key": date_key,
-                "created_at": job.created_at,
-                "updated_at": job.updated_at,
-            }
-            yield f"event: progress\ndata: {json.dumps(progress_payload, ensure_ascii=True)}\n\n"
-
-            # If a cancel was requested but the worker is already gone, finalize.
-            if job.kind == "sync" and job.status == "cancel_requested":
-                try:
-                    if not is_sync_worker_running(job_id=str(job_id)):
-                        connx = get_conn(_db_path())
-                        try:
-                            cur = repo.get_job(connx, job_id)
-                            if cur is not None and cur.status == "cancel_requested":
-                                repo.add_event(
-                                    connx,
-                                    job_id=job_id,
-                                    level="info",
-                                    text="cancelled",
-                                )
-                                repo.set_job_status(
-                                    connx, job_id=job_id, status="cancelled"
-                                )
-                        finally:
-                            connx.close()
-                except Exception:
-                    pass
-
-            if job.status in {"succeeded", "failed", "cancelled"}:
-                return
-            time.sleep(0.5)
+                if job is None:
+                    yield _SSE_NOT_FOUND
+                    return
+
+                for r in evs:
+                    event_id = int(r[0])
+                    last_id = event_id
+                    level = str(r[2])
+                    text = str(r[3])
+                    if level == "message_updated":
+                        # text is expected to be a JSON object string.
+                        yield _raw_event(event_id, "message_updated", text)
+                        continue
+                    if level == "detail":
+                        # text is expected to be a JSON object string.
+                        yield _raw_event(event_id, "detail", text)
+                        continue
+                    yield _log_event(event_id, str(r[1]), level, text)
+
+                # Extract date_key if it exists in message for UI mapping. Only
+                # re-parse when the message text actually changed.
+                if job.message != date_key_source:
+                    date_key_source = job.message
+                    date_key = _message_date_key(job.message)
+
+                # Skip re-sending an identical progress snapshot; idle jobs only
+                # get a periodic keepalive comment.
+                progress_state = (
+                    job.status,
+                    job.progress_current,
+                    job.progress_total,
+                    job.message,
+                    job.updated_at,
+                )
+                now = time.monotonic()
+                if progress_state != last_progress_state:
+                    last_progress_state = progress_state
+                    last_sent_at = now
+                    yield _progress_event(job, date_key)
+                elif now - last_sent_at >= _SSE_KEEPALIVE_S:
+                    last_sent_at = now
+                    yield _SSE_KEEPALIVE
+
+                if len(evs) >= _SSE_EVENT_PAGE:
+                    continue
+
+                # If a cancel was requested but the worker is already gone, finalize.
+                if job.kind == "sync" and job.status == "cancel_requested":
+                    try:
+                        if not is_sync_worker_running(job_id=str(job_id)):
+                            connx = get_conn(_db_path())
+                            try:
+                                cur = repo.get_job(connx, job_id)
+                                if cur is not None and cur.status == "cancel_requested":
+                                    repo.add_event(
+                                        connx,
+                                        job_id=job_id,
+                                        level="info",
+                                        text="cancelled",
+                                    )
+                                    repo.set_job_status(
+                                        connx, job_id=job_id, status="cancelled"
+                                    )
+                            finally:
+                                connx.close()
+                    except Exception:
+                        pass
+
+                if job.status in {"succeeded", "failed", "cancelled"}:
+                    return
+                time.sleep(0.5)
+        finally:
+            conn.close()
 
     return StreamingResponse(
         gen(),
@@ -5,10 +5,10 @@ from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.responses import RedirectResponse, PlainTextResponse
-from fastapi.staticfiles import StaticFiles
 
 from webmail_summary.api.routes_jobs import router as api_router
 from webmail_summary.api.routes_openrouter import router as openrouter_router
+from webmail_summary.app.static_files import CompressedStaticFiles
 from webmail_summary.index.db import get_conn, init_db
 from webmail_summary.llm.local_status import delete_gguf_and_marker
 from webmail_summary.ui.routes import router as ui_router
@@ -44,6 +44,28 @@ def _cleanup_stale_mei_dirs() -> None:
         pass
 
 
+def _cleanup_legacy_models(data_dir: Path) -> None:
+    """Delete retired GGUF models once, then skip the scans on later starts."""
+    sentinel = data_dir / ".legacy_cleaned_v2"
+    if sentinel.exists():
+        return
+
+    # Remove legacy ultra model artifacts (Qwen2.5 0.5B) if present.
+    delete_gguf_and_marker(
+        hf_repo_id="bartowski/Qwen2.5-0.5B-Instruct-GGUF",
+        hf_filename="Qwen2.5-0.5B-Instruct-Q4_K_M.gguf",
+    )
+    # Also remove the failed Qwen 1.5B model.
+    delete_gguf_and_marker(
+        hf_repo_id="Qwen/Qwen2.5-1.5B-Instruct-GGUF",
+        hf_filename="qwen2.5-1.5b-instruct-q4_k_m.gguf",
+    )
+    try:
+        sentinel.touch()
+    except Exception:
+        pass
+
+
 def create_app() -> FastAPI:
     app = FastAPI(title="Webmail Summary", docs_url=None, redoc_url=None)
 
@@ -80,16 +102,7 @@ def create_app() -> FastAPI:
     data_dir = get_app_data_dir()
     init_db(data_dir / "db.sqlite3")
 
-    # Remove legacy ultra model artifacts (Qwen2.5 0.5B) if present.
-    delete_gguf_and_marker(
-        hf_repo_id="bartowski/Qwen2.5-0.5B-Instruct-GGUF",
-        hf_filename="Qwen2.5-0.5B-Instruct-Q4_K_M.gguf",
-    )
-    # Also remove the failed Qwen 1.5B model.
-    delete_gguf_and_marker(
-        hf_repo_id="Qwen/Qwen2.5-1.5B-Instruct-GGUF",
-        hf_filename="qwen2.5-1.5b-instruct-q4_k_m.gguf",
-    )
+    _cleanup_legacy_models(data_dir)
 
     # On restart, background jobs are not resumed. Mark any previously active
     # jobs as failed so the UI doesn't get stuck watching old job IDs.
@@ -110,7 +123,11 @@ def create_app() -> FastAPI:
     # Static assets (CSS)
     static_dir = Path(__file__).resolve().parents[1] / "ui" / "static"
     if static_dir.exists():
-        app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+        app.mount(
+            "/static",
+            CompressedStaticFiles(directory=str(static_dir)),
+            name="static",
+        )
 
     app.include_router(api_router)
     app.include_router(openrouter_router)
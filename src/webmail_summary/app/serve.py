@@ -17,10 +17,33 @@ from webmail_summary.util.single_instance import SingleInstanceLock
 from webmail_summary.util.ui_lifecycle import should_exit_for_ui_close
 
 
-def _find_free_port() -> int:
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(("127.0.0.1", 0))
-        return int(s.getsockname()[1])
+def _bind_listen_socket(host: str, port: int) -> socket.socket:
+    """Bind the server socket up front and hand it to uvicorn.
+
+    Probing for a free port and closing the probe socket left a window where
+    another process could grab the port before uvicorn bound it. Keeping the
+    bound socket open closes that race; port 0 lets the OS pick a free port.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    try:
+        if os.name != "nt":
+            # Match uvicorn/asyncio: a restart on a fixed port must not fail
+            # while the old process's connections sit in TIME_WAIT. (On
+            # Windows the flag would allow stealing a bound port instead.)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host.strip("[]"), port))
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+
+def _http_url(host: str, port: int) -> str:
+    h = host.strip("[]")
+    if ":" in h:
+        h = f"[{h}]"
+    return f"http://{h}:{port}/"
 
 
 def _load_close_behavior(data_dir: Path) -> str:
@@ -90,8 +113,9 @@ def serve(opts: ServeOptions = ServeOptions()) -> None:
         return
 
     app = create_app()
-    port = opts.port or _find_free_port()
-    url = f"http://{opts.host}:{port}/"
+    sock = _bind_listen_socket(opts.host, opts.port or 0)
+    port = int(sock.getsockname()[1])
+    url = _http_url(opts.host, port)
     stop_watchdog = threading.Event()
 
     def _close_watchdog() -> None:
@@ -117,10 +141,17 @@ def serve(opts: ServeOptions = ServeOptions()) -> None:
         except Exception:
             pass
         if opts.open_browser:
-            try:
-                webbrowser.open(url)
-            except Exception:
-                pass
+            # webbrowser.open can fork xdg-open or hit the registry; keep it
+            # off the startup hook so uvicorn starts accepting immediately.
+            def _open_browser() -> None:
+                try:
+                    webbrowser.open(url)
+                except Exception:
+                    pass
+
+            opener = threading.Timer(0.3, _open_browser)
+            opener.daemon = True
+            opener.start()
 
         def _run_update_check() -> None:
             try:
@@ -158,9 +189,16 @@ def serve(opts: ServeOptions = ServeOptions()) -> None:
             if getattr(sys, "stderr", None) is None:
                 sys.stderr = stream
 
-        uvicorn.run(app, host=opts.host, port=port, log_level="info", use_colors=False)
+        config = uvicorn.Config(
+            app, host=opts.host, port=port, log_level="info", use_colors=False
+        )
+        uvicorn.Server(config).run(sockets=[sock])
     finally:
         stop_watchdog.set()
+        try:
+            sock.close()
+        except Exception:
+            pass
         try:
             url_path.unlink(missing_ok=True)
         except Exception:
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+
+_COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".webmanifest", ".json", ".html"}
+_MIN_COMPRESS_BYTES = 1024
+
+# Templates reference assets as /static/<name>?v=<version>-<content hash>, so a
+# versioned URL never changes content and can be cached forever. Unversioned
+# requests still revalidate through the ETag.
+_CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+_CACHE_REVALIDATE = "no-cache"
+
+
+def _gzip_etag(etag: str | None) -> str | None:
+    if not etag:
+        return None
+    if etag.endswith('"'):
+        return etag[:-1] + '-gz"'
+    return etag + "-gz"
+
+
+def _if_none_match(headers: Headers) -> set[str]:
+    raw = headers.get("if-none-match", "")
+    return {t.strip().removeprefix("W/") for t in raw.split(",") if t.strip()}
+
+
+class CompressedStaticFiles(StaticFiles):
+    """StaticFiles with in-memory gzip variants and cache headers.
+
+    The packaged static dir can be read-only (frozen installs), so compressed
+    bodies are kept in memory and rebuilt when the file's stat() changes.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._gz_cache: dict[str, tuple[int, int, bytes]] = {}
+
+    def _gzip_bytes(self, file_path: str) -> bytes | None:
+        p = Path(file_path)
+        try:
+            st = p.stat()
+        except OSError:
+            return None
+        if st.st_size < _MIN_COMPRESS_BYTES:
+            return None
+        cached = self._gz_cache.get(file_path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        try:
+            body = gzip.compress(p.read_bytes(), compresslevel=9, mtime=0)
+        except OSError:
+            return None
+        self._gz_cache[file_path] = (st.st_mtime_ns, st.st_size, body)
+        return body
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if response.status_code not in (200, 304):
+            return response
+
+        query = (scope.get("query_string", b"") or b"").decode("latin-1")
+        versioned = "v" in parse_qs(query, keep_blank_values=True)
+        response.headers["cache-control"] = (
+            _CACHE_IMMUTABLE if versioned else _CACHE_REVALIDATE
+        )
+
+        if Path(path).suffix.lower() not in _COMPRESSIBLE_SUFFIXES:
+            return response
+        # The 304 must carry Vary too, or caches may pin one coding.
+        response.headers["vary"] = "Accept-Encoding"
+        if response.status_code != 200 or not isinstance(response, FileResponse):
+            return response
+
+        req_headers = Headers(scope=scope)
+        if "gzip" not in req_headers.get("accept-encoding", "").lower():
+            return response
+        if "range" in req_headers:
+            return response
+
+        body = self._gzip_bytes(str(response.path))
+        if body is None:
+            return response
+
+        headers = {
+            k: v
+            for k, v in response.headers.items()
+            if k not in ("content-length", "accept-ranges")
+        }
+        headers["content-encoding"] = "gzip"
+        # A different content-coding needs its own validator (RFC 9110 8.8.3).
+        etag = _gzip_etag(headers.get("etag"))
+        if etag:
+            headers["etag"] = etag
+            if etag in _if_none_match(req_headers):
+                headers.pop("content-encoding", None)
+                return Response(status_code=304, headers=headers)
+        if scope.get("method") == "HEAD":
+            out = Response(headers=headers)
+            out.headers["content-length"] = str(len(body))
+            return out
+        return Response(content=body, headers=headers)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import concurrent.futures
 import hashlib
+import html as html_lib
+import os
 import re
+import tempfile
+import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import urlsplit, urlunsplit
 
+from collections.abc import Callable
 from typing import Any, cast
 
 from bs4 import BeautifulSoup
@@ -14,6 +20,66 @@ from bs4.element import Tag
 
 from webmail_summary.util.net import DownloadBlocked, stream_download
 
+# libxml2-backed tree builder (lxml is a hard dependency); several times
+# faster than html.parser on large marketing mail bodies.
+_HTML_PARSER = "lxml"
+
+
+_CSS_URL_RE = re.compile(r"url\(([^)]+)\)")
+# Top-level scanner for the regex rewriter. Comments and scripts are matched
+# only so they are skipped; <style> blocks and start tags are rewritten.
+_SCAN_RE = re.compile(
+    r"(?P<comment><!--.*?(?:-->|\Z))"
+    r"|(?P<script><script\b.*?</script\s*>)"
+    r"|(?P<style_open><style\b(?:\"[^\"]*\"|'[^']*'|[^'\">])*>)"
+    r"(?P<style_css>.*?)(?P<style_close></style\s*>)"
+    r"|(?P<tag><(?P<name>[A-Za-z][^\s/>]*)(?:\"[^\"]*\"|'[^']*'|[^'\">])*>)",
+    re.IGNORECASE | re.DOTALL,
+)
+_TAG_START_RE = re.compile(r"<[A-Za-z]")
+# One attribute inside a start tag; values are consumed whole so URLs inside
+# other attribute values are never mistaken for attributes.
+_ATTR_RE = re.compile(
+    r"""(?P<attr>[^\s"'>/=]+)(?:(?P<eq>\s*=\s*)"""
+    r"""(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s"'>]+)))?"""
+)
+_TAG_NAME_RE = re.compile(r"<[A-Za-z][^\s/>]*")
+_URL_ATTRS_ORDER = ("src", "href", "poster")
+_URL_ATTRS = frozenset(_URL_ATTRS_ORDER)
+# Content-type substring -> extension, checked in insertion order.
+_CT_TO_EXT = {
+    "png": ".png",
+    "jpeg": ".jpg",
+    "gif": ".gif",
+    "webp": ".webp",
+    "svg": ".svg",
+    "css": ".css",
+    "javascript": ".js",
+    "mp4": ".mp4",
+}
+_WRITE_BUFFER_BYTES = 1 << 20
+_DOWNLOAD_WORKERS = 8
+
+# Small free-list of read buffers so archiving many messages does not churn
+# a fresh bytes object for every network chunk.
+_READ_CHUNK_BYTES = 1024 * 128
+_BUF_POOL_MAX = 8
+_BUF_POOL: list[bytearray] = []
+_BUF_POOL_LOCK = threading.Lock()
+
+
+def _borrow_buffer() -> bytearray:
+    with _BUF_POOL_LOCK:
+        if _BUF_POOL:
+            return _BUF_POOL.pop()
+    return bytearray(_READ_CHUNK_BYTES)
+
+
+def _return_buffer(buf: bytearray) -> None:
+    with _BUF_POOL_LOCK:
+        if len(_BUF_POOL) < _BUF_POOL_MAX:
+            _BUF_POOL.append(buf)
+
 
 @dataclass(frozen=True)
 class ExternalAsset:
@@ -25,35 +91,258 @@ class ExternalAsset:
 
 
 def _hash_url(url: str) -> str:
-    return hashlib.sha256(url.encode("utf-8", errors="replace")).hexdigest()[:16]
+    # 64-bit fingerprint (16 hex chars), same length as the old truncated
+    # SHA-256 but without hashing a full 256-bit digest just to throw it away.
+    return hashlib.blake2b(
+        url.encode("utf-8", errors="replace"), digest_size=8
+    ).hexdigest()
+
+
+def _url_suffix(url: str) -> str:
+    """Extension of the last path segment, e.g. ".png" ("" if none).
+
+    Hand-rolled instead of urlparse + splitext: this runs for every asset.
+    """
+    end = len(url)
+    for i in (url.find("?"), url.find("#")):
+        if i != -1 and i < end:
+            end = i
+    # Ignore the "//host" part so "https://x.test" has no suffix.
+    start = url.find("//")
+    start = start + 2 if start != -1 and start < end else 0
+    slash = url.find("/", start, end)
+    if slash == -1:
+        return ""
+    name_start = url.rfind("/", slash, end) + 1
+    dot = url.rfind(".", name_start, end)
+    # Like splitext, leading dots (".hidden") do not start an extension.
+    if dot < 0 or not url[name_start:dot].strip("."):
+        return ""
+    return url[dot:end]
 
 
 def _guess_ext(content_type: str | None, url: str) -> str:
     # Keep it simple. Prefer URL suffix if any.
-    p = urlparse(url)
-    name = Path(p.path).name
-    suf = Path(name).suffix
-    if suf and len(suf) <= 6:
+    suf = _url_suffix(url)
+    if 1 < len(suf) <= 6:
         return suf
-    if content_type and "png" in content_type:
-        return ".png"
-    if content_type and "jpeg" in content_type:
-        return ".jpg"
-    if content_type and "gif" in content_type:
-        return ".gif"
-    if content_type and "webp" in content_type:
-        return ".webp"
-    if content_type and "svg" in content_type:
-        return ".svg"
-    if content_type and "css" in content_type:
-        return ".css"
-    if content_type and "javascript" in content_type:
-        return ".js"
-    if content_type and "mp4" in content_type:
-        return ".mp4"
+    ct = (content_type or "").lower()
+    if ct:
+        for needle, ext in _CT_TO_EXT.items():
+            if needle in ct:
+                return ext
     return ".bin"
 
 
+def _has_rewritable_refs(html: str) -> bool:
+    """Cheap pre-check: only cid: and http(s) URLs are ever rewritten."""
+    return "cid:" in html or "http://" in html or "https://" in html
+
+
+def _skipped(url: str, status: str) -> ExternalAsset:
+    return ExternalAsset(
+        original_url=url,
+        rel_path=None,
+        status=status,
+        mime_type=None,
+        size_bytes=None,
+    )
+
+
+def _cid_target(ref: str, cid_map: dict[str, str]) -> str | None:
+    return cid_map.get(ref[4:].strip().strip("<>"))
+
+
+def _normalize_asset_url(url: str) -> str:
+    """Cache key for an asset URL: drop the fragment, lowercase scheme/host."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, "")
+    )
+
+
+def _is_http_url(ref: str) -> bool:
+    return ref.startswith("http://") or ref.startswith("https://")
+
+
+def _css_ref(m: re.Match[str]) -> str:
+    return m.group(1).strip().strip("\"'")
+
+
+def _map_ref(
+    ref: str, cid_map: dict[str, str], results: dict[str, ExternalAsset]
+) -> str | None:
+    """Replacement for a src/href/poster/url() reference, if any."""
+    if ref.startswith("cid:"):
+        return _cid_target(ref, cid_map)
+    if _is_http_url(ref):
+        asset = results.get(ref)
+        if asset is not None:
+            return asset.rel_path
+    return None
+
+
+def _rewrite_css(css_text: str, resolve: Callable[[str], str | None]) -> str:
+    def repl(m: re.Match[str]) -> str:
+        mapped = resolve(_css_ref(m))
+        return f"url({mapped})" if mapped else m.group(0)
+
+    return _CSS_URL_RE.sub(repl, css_text)
+
+
+def _rewrite_tag(tag: str, resolve: Callable[[str], str | None]) -> str:
+    def repl(m: re.Match[str]) -> str:
+        name = m.group("attr").lower()
+        if m.group("eq") is None or (name not in _URL_ATTRS and name != "style"):
+            return m.group(0)
+        raw = m.group("dq")
+        if raw is None:
+            raw = m.group("sq")
+        if raw is None:
+            raw = m.group("bare") or ""
+        value = html_lib.unescape(raw)
+        if name == "style":
+            new_value = _rewrite_css(value, resolve)
+            if new_value == value:
+                return m.group(0)
+        else:
+            mapped = resolve(value)
+            if not mapped:
+                return m.group(0)
+            new_value = mapped
+        return f'{m.group("attr")}="{html_lib.escape(new_value, quote=True)}"'
+
+    # Skip "<name" so the tag name is not read as an attribute.
+    m = _TAG_NAME_RE.match(tag)
+    cut = m.end() if m else 1
+    return tag[:cut] + _ATTR_RE.sub(repl, tag[cut:])
+
+
+def _regex_pass(html: str, resolve: Callable[[str], str | None]) -> str | None:
+    """Rewrite URL attributes and CSS url() refs without building a DOM.
+
+    Returns None when the markup has a start tag the scanner cannot
+    tokenize (unbalanced quotes, unclosed <style>/<script>), so the caller
+    can fall back to a real parser.
+    """
+    out: list[str] = []
+    pos = 0
+    for m in _SCAN_RE.finditer(html):
+        gap = html[pos : m.start()]
+        if _TAG_START_RE.search(gap):
+            return None
+        out.append(gap)
+        pos = m.end()
+        if m.group("style_open") is not None:
+            out.append(_rewrite_tag(m.group("style_open"), resolve))
+            out.append(_rewrite_css(m.group("style_css"), resolve))
+            out.append(m.group("style_close"))
+        elif m.group("tag") is not None:
+            if m.group("name").lower() in ("style", "script"):
+                # The block forms did not match, so there is no closing tag.
+                return None
+            out.append(_rewrite_tag(m.group("tag"), resolve))
+        else:
+            out.append(m.group(0))
+    tail = html[pos:]
+    if _TAG_START_RE.search(tail):
+        return None
+    out.append(tail)
+    return "".join(out)
+
+
+_Scan = tuple[list[str], Callable[[dict[str, ExternalAsset]], str]]
+
+
+def _scan_with_regex(html: str, cid_map: dict[str, str]) -> _Scan | None:
+    url_refs: list[str] = []
+
+    def record(ref: str) -> str | None:
+        if ref.startswith("cid:"):
+            return _cid_target(ref, cid_map)
+        if _is_http_url(ref):
+            url_refs.append(ref)
+        return None
+
+    mapped = _regex_pass(html, record)
+    if mapped is None:
+        return None
+
+    def apply(results: dict[str, ExternalAsset]) -> str:
+        if not url_refs:
+            return mapped
+        out = _regex_pass(mapped, lambda ref: _map_ref(ref, cid_map, results))
+        return mapped if out is None else out
+
+    return url_refs, apply
+
+
+def _scan_with_soup(html: str, cid_map: dict[str, str]) -> _Scan:
+    soup = BeautifulSoup(html, _HTML_PARSER)
+    url_refs: list[str] = []
+    attr_targets: list[tuple[Tag, str, str]] = []
+    css_targets: list[tuple[Tag, bool]] = []  # (tag, is <style> block)
+
+    def scan_css(css_text: str) -> bool:
+        found = False
+        for m in _CSS_URL_RE.finditer(css_text):
+            ref = _css_ref(m)
+            if ref.startswith("cid:") or _is_http_url(ref):
+                found = True
+                if _is_http_url(ref):
+                    url_refs.append(ref)
+        return found
+
+    for el in soup.find_all(True):
+        if not isinstance(el, Tag):
+            continue
+        tag = el
+        if tag.name == "style" and tag.string is not None:
+            if scan_css(str(tag.string)):
+                css_targets.append((tag, True))
+        if "style" in tag.attrs:
+            if scan_css(str(tag.attrs.get("style") or "")):
+                css_targets.append((tag, False))
+        for attr in _URL_ATTRS_ORDER:
+            if attr not in tag.attrs:
+                continue
+            v = str(tag.get(attr) or "")
+            if not v:
+                continue
+            if v.startswith("cid:"):
+                target = _cid_target(v, cid_map)
+                if target:
+                    tag[attr] = target
+                continue
+            if _is_http_url(v):
+                url_refs.append(v)
+                attr_targets.append((tag, attr, v))
+
+    def apply(results: dict[str, ExternalAsset]) -> str:
+        def resolve(ref: str) -> str | None:
+            return _map_ref(ref, cid_map, results)
+
+        for tag, attr, url in attr_targets:
+            rel_path = results[url].rel_path
+            if rel_path:
+                tag[attr] = rel_path
+        for tag, is_block in css_targets:
+            if is_block:
+                st = tag.string
+                if st is not None:
+                    # NavigableString has replace_with; treat dynamically.
+                    ns = cast(Any, st)
+                    ns.replace_with(_rewrite_css(str(st), resolve))
+            else:
+                tag["style"] = _rewrite_css(str(tag.attrs.get("style") or ""), resolve)
+        return str(soup)
+
+    return url_refs, apply
+
+
 def rewrite_html_and_download_assets(
     *,
     html: str,
@@ -64,64 +353,67 @@ def rewrite_html_and_download_assets(
     max_assets: int = 120,
     max_total_seconds: int = 90,
     user_agent: str = "WebmailSummary/1.0",
+    max_workers: int = _DOWNLOAD_WORKERS,
 ) -> tuple[str, list[ExternalAsset]]:
     external_dir.mkdir(parents=True, exist_ok=True)
-    soup = BeautifulSoup(html, "html.parser")
-    assets: list[ExternalAsset] = []
-
+    if not _has_rewritable_refs(html):
+        # Nothing to map or download: skip building the DOM entirely. The
+        # caller sanitizes (and so re-serializes) the result anyway.
+        return html, []
     started = time.time()
     deadline = time.monotonic() + float(max_total_seconds)
 
     remaining = max_total_bytes
+    budget_lock = threading.Lock()
 
     def download(url: str) -> ExternalAsset:
         nonlocal remaining
-        if len(assets) >= int(max_assets):
-            return ExternalAsset(
-                original_url=url,
-                rel_path=None,
-                status="skipped_assets_limit",
-                mime_type=None,
-                size_bytes=None,
-            )
-
         if (time.time() - started) > float(max_total_seconds):
-            return ExternalAsset(
-                original_url=url,
-                rel_path=None,
-                status="skipped_time_budget",
-                mime_type=None,
-                size_bytes=None,
-            )
-        if remaining <= 0:
-            return ExternalAsset(
-                original_url=url,
-                rel_path=None,
-                status="skipped_limit",
-                mime_type=None,
-                size_bytes=None,
-            )
+            return _skipped(url, "skipped_time_budget")
+        with budget_lock:
+            budget = remaining
+        if budget <= 0:
+            return _skipped(url, "skipped_limit")
 
+        # Best-effort content-type from magic bytes isn't worth it; just use extension heuristics.
+        ext = _guess_ext(None, url)
+        fname = f"{_hash_url(url)}{ext}"
+        out_path = external_dir / fname
         try:
-            chunks = []
+            # Stream straight to disk so peak memory stays at one chunk. The
+            # body goes to a temp file that replaces out_path only once it is
+            # complete: exported vaults may hardlink the previous file.
             written = 0
-            for chunk in stream_download(
-                url=url,
-                timeout_s=timeout_s,
-                max_bytes=remaining,
-                user_agent=user_agent,
-                deadline_monotonic=deadline,
-            ):
-                chunks.append(chunk)
-                written += len(chunk)
-            remaining -= written
-            blob = b"".join(chunks)
-
-            # Best-effort content-type from magic bytes isn't worth it; just use extension heuristics.
-            ext = _guess_ext(None, url)
-            fname = f"{_hash_url(url)}{ext}"
-            out_path = external_dir / fname
-            out_path.write_bytes(blob)
+            buf = _borrow_buffer()
+            fd, tmp = tempfile.mkstemp(prefix=fname + ".", dir=str(external_dir))
+            tmp_path = Path(tmp)
+            try:
+                with os.fdopen(fd, "wb", buffering=_WRITE_BUFFER_BYTES) as f:
+                    for chunk in stream_download(
+                        url=url,
+                        timeout_s=timeout_s,
+                        max_bytes=budget,
+                        user_agent=user_agent,
+                        deadline_monotonic=deadline,
+                        buffer=buf,
+                    ):
+                        f.write(chunk)
+                        written += len(chunk)
+                with budget_lock:
+                    # Concurrent downloads each saw the same snapshot; the
+                    # one that would overdraw the shared budget is dropped.
+                    if written > remaining:
+                        raise DownloadBlocked("download exceeds max_bytes")
+                    remaining -= written
+                tmp_path.replace(out_path)
+            except BaseException:
+                try:
+                    tmp_path.unlink(missing_ok=True)
+                except Exception:
+                    pass
+                raise
+            finally:
+                _return_buffer(buf)
             rel = f"external/{fname}"
             return ExternalAsset(
                 original_url=url,
@@ -131,77 +423,64 @@ def rewrite_html_and_download_assets(
                 size_bytes=written,
             )
         except DownloadBlocked as e:
-            return ExternalAsset(
-                original_url=url,
-                rel_path=None,
-                status=f"blocked:{e}",
-                mime_type=None,
-                size_bytes=None,
-            )
+            return _skipped(url, f"blocked:{e}")
         except Exception as e:
-            return ExternalAsset(
-                original_url=url,
-                rel_path=None,
-                status=f"error:{e}",
-                mime_type=None,
-                size_bytes=None,
-            )
+            return _skipped(url, f"error:{e}")
 
-    # Rewrite src/href URLs
-    for el in soup.find_all(True):
-        if not isinstance(el, Tag):
-            continue
-        tag = el
-        for attr in ("src", "href", "poster"):
-            if attr not in tag.attrs:
-                continue
-            v = str(tag.get(attr) or "")
-            if not v:
-                continue
-            if v.startswith("cid:"):
-                cid = v[4:].strip().strip("<>")
-                mapped = cid_map.get(cid)
-                if mapped:
-                    tag[attr] = mapped
-                continue
-            if v.startswith("http://") or v.startswith("https://"):
-                asset = download(v)
-                assets.append(asset)
-                if asset.rel_path:
-                    tag[attr] = asset.rel_path
-
-    # Rewrite url(...) inside style attributes and <style> blocks
-    url_re = re.compile(r"url\(([^)]+)\)")
-
-    def rewrite_css(css_text: str) -> str:
-        def repl(m: re.Match[str]) -> str:
-            raw = m.group(1).strip().strip("\"'")
-            if raw.startswith("cid:"):
-                cid = raw[4:].strip().strip("<>")
-                mapped = cid_map.get(cid)
-                if mapped:
-                    return f"url({mapped})"
-                return m.group(0)
-            if raw.startswith("http://") or raw.startswith("https://"):
-                asset = download(raw)
-                assets.append(asset)
-                if asset.rel_path:
-                    return f"url({asset.rel_path})"
-            return m.group(0)
+    # Pass 1: find references. cid: references are mapped right away;
+    # http(s) references are recorded (in document order) for download.
+    # Well-formed mail goes through the regex rewriter; anything it cannot
+    # tokenize falls back to a BeautifulSoup tree.
+    scan = _scan_with_regex(html, cid_map)
+    if scan is None:
+        scan = _scan_with_soup(html, cid_map)
+    url_refs, apply = scan
 
-        return url_re.sub(repl, css_text)
+    # Pass 2: fetch each distinct URL once, overlapping network round trips
+    # on a small thread pool. URLs that differ only by fragment or
+    # scheme/host case share one fetch. Only the first max_assets distinct
+    # URLs are attempted.
+    first_by_key: dict[str, str] = {}
+    for url in url_refs:
+        first_by_key.setdefault(_normalize_asset_url(url), url)
+    unique_urls = list(first_by_key.values())
+    fetched: dict[str, ExternalAsset] = {}
+    to_fetch = unique_urls[: max(0, int(max_assets))]
+    for url in unique_urls[len(to_fetch) :]:
+        fetched[url] = _skipped(url, "skipped_assets_limit")
+    if to_fetch:
+        workers = max(1, min(int(max_workers), len(to_fetch)))
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="asset-dl"
+        ) as ex:
+            for url, asset in zip(to_fetch, ex.map(download, to_fetch)):
+                fetched[url] = asset
 
-    for el in soup.find_all(style=True):
-        if isinstance(el, Tag) and "style" in el.attrs:
-            el["style"] = rewrite_css(str(el.attrs.get("style") or ""))
-    for el in soup.find_all("style"):
-        if not isinstance(el, Tag):
-            continue
-        s = el.string
-        if s is None:
-            continue
-        # NavigableString has replace_with; treat dynamically.
-        ns = cast(Any, s)
-        ns.replace_with(rewrite_css(str(s)))
+    # One row per reference. Repeats of a downloaded URL point at the same
+    # file but are marked "deduped" with no size, so byte totals and
+    # multimodal picks count the file once.
+    results: dict[str, ExternalAsset] = {}
+    assets: list[ExternalAsset] = []
+    emitted: set[str] = set()
+    for url in url_refs:
+        first = first_by_key[_normalize_asset_url(url)]
+        base = fetched[first]
+        results[url] = base
+        if first not in emitted:
+            emitted.add(first)
+            assets.append(base)
+        elif base.rel_path:
+            assets.append(
+                ExternalAsset(
+                    original_url=url,
+                    rel_path=base.rel_path,
+                    status="deduped",
+                    mime_type=base.mime_type,
+                    size_bytes=None,
+                )
+            )
+        else:
+            assets.append(_skipped(url, base.status))
 
-    return str(soup), assets
+    # Pass 3: apply downloaded paths.
+    return apply(results), assets
@@ -8,6 +8,13 @@ from email.message import Message
 from pathlib import Path
 from typing import Any
 
+from webmail_summary.util.atomic_io import atomic_write_bytes
+
+
+_UNSAFE_CHARS_RE = re.compile(r"[\\/:*?\"<>|]")
+_WS_RE = re.compile(r"\s+")
+_BODY_TYPES = ("text/html", "text/plain")
+
 
 @dataclass(frozen=True)
 class SavedAttachment:
@@ -22,8 +29,8 @@ class SavedAttachment:
 def _sanitize_filename(name: str) -> str:
     name = name.strip().replace("\x00", "")
     name = os.path.basename(name)
-    name = re.sub(r"[\\/:*?\"<>|]", "-", name)
-    name = re.sub(r"\s+", " ", name).strip()
+    name = _UNSAFE_CHARS_RE.sub("-", name)
+    name = _WS_RE.sub(" ", name).strip()
     return name or "file.bin"
 
 
@@ -41,9 +48,24 @@ def _unique_path(dir_path: Path, filename: str) -> Path:
         i += 1
 
 
+def _decode_text(part: Message) -> str:
+    payload = part.get_payload(decode=True)
+    if isinstance(payload, (bytes, bytearray)):
+        charset = part.get_content_charset() or "utf-8"
+        return bytes(payload).decode(charset, errors="replace")
+    # Fallback
+    return str(part.get_payload() or "")
+
+
 def extract_attachments(
-    *, msg: Message, out_dir: Path
+    *, msg: Message, out_dir: Path, bodies: dict[str, str] | None = None
 ) -> tuple[list[SavedAttachment], dict[str, str]]:
+    """Save non-body parts under out_dir.
+
+    When `bodies` is given, the first non-attachment text/html and text/plain
+    parts are decoded into it during the same walk, so callers that need
+    both never traverse the MIME tree twice.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
     saved: list[SavedAttachment] = []
     cid_map: dict[str, str] = {}
@@ -58,7 +80,16 @@ def extract_attachments(
         filename = part.get_filename() or ""
         content_id = (part.get("Content-ID") or "").strip().strip("<>")
 
-        is_body = ctype in {"text/plain", "text/html"} and disp == "" and not filename
+        if (
+            bodies is not None
+            and ctype in _BODY_TYPES
+            and ctype not in bodies
+            and disp != "attachment"
+            and not filename
+        ):
+            bodies[ctype] = _decode_text(part)
+
+        is_body = ctype in _BODY_TYPES and disp == "" and not filename
         if is_body:
             continue
 
@@ -78,15 +109,14 @@ def extract_attachments(
             payload = str(part.get_payload() or "").encode("utf-8", errors="replace")
 
         file_path = _unique_path(out_dir, filename)
-        file_path.write_bytes(payload)
+        atomic_write_bytes(file_path, payload)
 
         rel = f"attachments/{file_path.name}"
-        size = file_path.stat().st_size
         item = SavedAttachment(
             filename=file_path.name,
             rel_path=rel,
             mime_type=ctype,
-            size_bytes=size,
+            size_bytes=len(payload),
             content_id=content_id or None,
             is_inline=is_inline,
         )
@@ -5,10 +5,14 @@ from dataclasses import dataclass
 from pathlib import Path
 
 
+_SEG_UNSAFE_RE = re.compile(r"[^a-zA-Z0-9._-]+")
+_DASHES_RE = re.compile(r"-+")
+
+
 def _safe_seg(text: str, max_len: int = 80) -> str:
     text = text.strip()
-    text = re.sub(r"[^a-zA-Z0-9._-]+", "-", text)
-    text = re.sub(r"-+", "-", text).strip("-")
+    text = _SEG_UNSAFE_RE.sub("-", text)
+    text = _DASHES_RE.sub("-", text).strip("-")
     if not text:
         text = "default"
     if len(text) > max_len:
@@ -8,7 +8,7 @@ from webmail_summary.util.platform_caps import ui_platform_caps
 from webmail_summary.app.serve import ServeOptions, serve
 from webmail_summary.jobs.runner import get_runner
 from webmail_summary.jobs.tasks_sync import sync_mailbox_task
-from webmail_summary.jobs.worker_sync import run_worker
+from webmail_summary.jobs.worker_sync import run_worker, serve_stdio
 from webmail_summary.ui.native_window import run_ui
 
 
@@ -27,7 +27,9 @@ def main(argv: list[str] | None = None) -> None:
 
     sub.add_parser("sync")
     p_sync_worker = sub.add_parser("sync-worker")
-    p_sync_worker.add_argument("--job-id", required=True)
+    sync_worker_mode = p_sync_worker.add_mutually_exclusive_group(required=True)
+    sync_worker_mode.add_argument("--job-id")
+    sync_worker_mode.add_argument("--serve", action="store_true")
 
     args = parser.parse_args(argv)
 
@@ -52,6 +54,9 @@ def main(argv: list[str] | None = None) -> None:
         print(job_id)
         return
     if args.cmd == "sync-worker":
+        if args.serve:
+            serve_stdio()
+            return
         run_worker(str(args.job_id))
         return
 
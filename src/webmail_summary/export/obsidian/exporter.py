@@ -1,7 +1,10 @@
 from __future__ import annotations
 
 import datetime as dt
+import os
+import re
 import shutil
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -9,6 +12,9 @@ from webmail_summary.export.obsidian.naming import safe_filename, safe_topic_nam
 from webmail_summary.util.atomic_io import atomic_write_text
 
 
+_WIKILINK_RE = re.compile(r"\[\[([^\]]+)\]\]")
+
+
 @dataclass(frozen=True)
 class MessageExportInput:
     message_key: str
@@ -42,16 +48,66 @@ def _wikilink_for(vault_root: Path, note_path: Path) -> str:
     return f"[[{s}]]"
 
 
+_FICLONE = 0x40049409  # Linux ioctl: share extents (btrfs/XFS reflink)
+
+
+def _link_or_copy(src: str | Path, dst: str | Path) -> None:
+    """Place ``src`` at ``dst`` without duplicating bytes when possible.
+
+    Every archive writer (pipeline, attachments, external assets) writes a
+    temp file and renames it over the target, so re-archiving swaps in a new
+    inode and never rewrites one a vault hardlink still points at. That is
+    what makes a hardlink as good as a copy here. Falls back to a reflink on
+    Linux, then to a plain copy (cross-volume, FAT, etc.).
+    """
+    src_p = Path(src)
+    dst_p = Path(dst)
+    try:
+        if dst_p.exists():
+            if os.path.samefile(src_p, dst_p):
+                return
+            dst_p.unlink()
+        os.link(src_p, dst_p)
+        return
+    except OSError:
+        pass
+    if sys.platform.startswith("linux"):
+        try:
+            import fcntl
+
+            with open(src_p, "rb") as fs, open(dst_p, "wb") as fd:
+                fcntl.ioctl(fd.fileno(), _FICLONE, fs.fileno())
+            shutil.copystat(src_p, dst_p)
+            return
+        except OSError:
+            pass
+    shutil.copy2(src_p, dst_p)
+
+
 def _copy_tree(src: Path, dst: Path) -> None:
-    if not src.exists():
+    if not src.is_dir():
         return
-    _ensure_dir(dst)
-    for item in src.iterdir():
-        if item.is_dir():
-            _copy_tree(item, dst / item.name)
-        else:
-            (dst / item.name).parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(item, dst / item.name)
+    shutil.copytree(src, dst, dirs_exist_ok=True, copy_function=_link_or_copy)
+
+
+_IMAGE_EXTS = frozenset({"png", "jpg", "jpeg", "gif", "webp"})
+
+
+def _first_images(attach_dir: Path, limit: int = 20) -> list[str]:
+    """Names of up to ``limit`` image files in ``attach_dir`` (listing order)."""
+    out: list[str] = []
+    try:
+        with os.scandir(attach_dir) as it:
+            for entry in it:
+                ext = entry.name.rsplit(".", 1)[-1].lower() if "." in entry.name else ""
+                if ext not in _IMAGE_EXTS or not entry.is_file():
+                    continue
+                out.append(entry.name)
+                if len(out) >= limit:
+                    break
+    except OSError:
+        return []
+    return out
 
 
 def export_email_note(*, vault_root: Path, inp: MessageExportInput) -> Path:
@@ -68,14 +124,14 @@ def export_email_note(*, vault_root: Path, inp: MessageExportInput) -> Path:
     for name in ["rendered.html", "body.html", "body.txt"]:
         src = inp.archive_dir / name
         if src.exists():
-            shutil.copy2(src, assets_dir / name)
+            _link_or_copy(src, assets_dir / name)
 
     _copy_tree(inp.archive_dir / "attachments", assets_dir / "attachments")
     _copy_tree(inp.archive_dir / "external", assets_dir / "external")
 
     raw_src = inp.archive_dir / "raw.eml"
     if raw_src.exists():
-        shutil.copy2(raw_src, raw_dir / f"{inp.message_key}.eml")
+        _link_or_copy(raw_src, raw_dir / f"{inp.message_key}.eml")
 
     # Build markdown
     tags = [t.strip().lstrip("#") for t in inp.tags if t.strip()]
@@ -99,32 +155,25 @@ def export_email_note(*, vault_root: Path, inp: MessageExportInput) -> Path:
         front.append(f"  - {t}")
     front.append("---")
 
-    body = "\n".join(front) + "\n\n"
-    body += f"{daily_link} {topic_links}\n\n"
-    body += (
-        "## 핵심 요약 / 상세 요약\n\n"
-        + (inp.summary.strip() or "(no summary)")
-        + "\n\n"
-    )
-    body += "## Original\n\n"
-    body += f"- Rendered HTML: [[Assets/{inp.message_key}/rendered.html]]\n"
-    body += f"- Raw EML: [[Raw/{inp.message_key}.eml]]\n"
+    parts = ["\n".join(front), "\n\n"]
+    parts.append(f"{daily_link} {topic_links}\n\n")
+    parts.append("## 핵심 요약 / 상세 요약\n\n")
+    parts.append(inp.summary.strip() or "(no summary)")
+    parts.append("\n\n")
+    parts.append("## Original\n\n")
+    parts.append(f"- Rendered HTML: [[Assets/{inp.message_key}/rendered.html]]\n")
+    parts.append(f"- Raw EML: [[Raw/{inp.message_key}.eml]]\n")
 
     # Embed inline images if present (best-effort)
-    attach_dir = assets_dir / "attachments"
-    if attach_dir.exists():
-        exts = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
-        imgs = [
-            p for p in attach_dir.iterdir() if p.is_file() and p.suffix.lower() in exts
-        ]
-        if imgs:
-            body += "\n## Images\n\n"
-            for p in imgs[:20]:
-                body += f"![[Assets/{inp.message_key}/attachments/{p.name}]]\n"
+    imgs = _first_images(assets_dir / "attachments")
+    if imgs:
+        parts.append("\n## Images\n\n")
+        for name in imgs:
+            parts.append(f"![[Assets/{inp.message_key}/attachments/{name}]]\n")
 
     fname = email_note_filename(inp.date, inp.subject, inp.message_key)
     out_path = mail_dir / fname
-    atomic_write_text(out_path, body)
+    atomic_write_text(out_path, "".join(parts))
     return out_path
 
 
@@ -134,9 +183,7 @@ def _extract_existing_links(file_path: Path) -> set[str]:
         return set()
     try:
         text = file_path.read_text(encoding="utf-8", errors="replace")
-        import re
-
-        return set(re.findall(r"\[\[([^\]]+)\]\]", text))
+        return set(_WIKILINK_RE.findall(text))
     except Exception:
         return set()
 
@@ -172,12 +219,12 @@ def export_daily_note(
             all_links.append(link)
 
     front = ["---", f"date: {date:%Y-%m-%d}", "---"]
-    body = "\n".join(front) + "\n\n"
-    body += "## Daily Digest\n\n" + (daily_summary.strip() or "(no digest)") + "\n\n"
-    body += "## Messages\n\n"
-    for link in all_links:
-        body += f"- {link}\n"
-    atomic_write_text(out_path, body)
+    parts = ["\n".join(front), "\n\n"]
+    parts.append("## Daily Digest\n\n")
+    parts.append(daily_summary.strip() or "(no digest)")
+    parts.append("\n\n## Messages\n\n")
+    parts.extend(f"- {link}\n" for link in all_links)
+    atomic_write_text(out_path, "".join(parts))
     return out_path
 
 
@@ -219,9 +266,7 @@ def export_topic_note(
                 all_links.append(link)
 
     front = ["---", f"topic: {name}", "---"]
-    body = "\n".join(front) + "\n\n"
-    body += "## Messages\n\n"
-    for link in all_links:
-        body += f"- {link}\n"
-    atomic_write_text(out_path, body)
+    parts = ["\n".join(front), "\n\n## Messages\n\n"]
+    parts.extend(f"- {link}\n" for link in all_links)
+    atomic_write_text(out_path, "".join(parts))
     return out_path
@@ -3,10 +3,14 @@ from __future__ import annotations
 import re
 
 
+_UNSAFE_CHARS_RE = re.compile(r"[\\/:*?\"<>|]")
+_WS_RE = re.compile(r"\s+")
+
+
 def safe_filename(text: str, *, max_len: int = 120) -> str:
     text = (text or "").strip()
-    text = re.sub(r"[\\/:*?\"<>|]", "-", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _UNSAFE_CHARS_RE.sub("-", text)
+    text = _WS_RE.sub(" ", text).strip()
     if not text:
         text = "(no subject)"
     if len(text) > max_len:
@@ -16,8 +20,8 @@ def safe_filename(text: str, *, max_len: int = 120) -> str:
 
 def safe_topic_name(text: str, *, max_len: int = 80) -> str:
     text = (text or "").strip().strip("[]")
-    text = re.sub(r"[\\/:*?\"<>|]", "-", text)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _UNSAFE_CHARS_RE.sub("-", text)
+    text = _WS_RE.sub(" ", text).strip()
     if not text:
         text = "Topic"
     if len(text) > max_len:
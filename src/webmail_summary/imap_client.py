@@ -1,13 +1,30 @@
 from __future__ import annotations
 
+import atexit
 import datetime as dt
+import functools
+import hashlib
 import ssl
 import re
+import threading
+import time
 from dataclasses import dataclass
 from collections.abc import Callable, Iterator
 from typing import Any, Iterable, Mapping, cast
 
 from imapclient import IMAPClient
+from imapclient.exceptions import IMAPClientAbortError, IMAPClientError
+
+
+# Most UIDs per body FETCH round trip. Large enough that per-command latency
+# is amortised on ordinary mail.
+FETCH_CHUNK_SIZE = 100
+# Byte budget (by RFC822.SIZE) for one body FETCH response, so a run of large
+# attachments cannot make a single response balloon in memory. A message
+# over the budget is fetched on its own.
+FETCH_BATCH_MAX_BYTES = 16 * 1024 * 1024
+# UIDs per RFC822.SIZE probe; sizes are tiny, so one probe covers many batches.
+_SIZE_PROBE_CHUNK = 1000
 
 
 @dataclass(frozen=True)
@@ -123,6 +140,7 @@ def build_mail_search_filter_value(mail_filter: MailSearchFilter) -> str:
     return ", ".join(parts)
 
 
+@functools.lru_cache(maxsize=32)
 def parse_mail_search_filter(raw_value: str) -> MailSearchFilter:
     raw = str(raw_value or "").strip()
     if not raw:
@@ -203,18 +221,158 @@ def _is_transient_imap_error(exc: BaseException) -> bool:
     return False
 
 
+def _is_fetch_rejection(exc: BaseException) -> bool:
+    """True when the server answered a FETCH with BAD/NO.
+
+    Aborts and socket-level failures are connection problems, not a verdict
+    on the FETCH form, and must propagate.
+    """
+    if isinstance(exc, IMAPClientAbortError) or not isinstance(exc, IMAPClientError):
+        return False
+    return not _is_transient_imap_error(exc)
+
+
+def _size_batches(
+    uids: list[int], sizes: Mapping[int, int], *, max_count: int, max_bytes: int
+) -> list[list[int]]:
+    """Split uids into runs of at most max_count UIDs and ~max_bytes bytes.
+
+    UIDs without a known size count as zero bytes.
+    """
+    out: list[list[int]] = []
+    batch: list[int] = []
+    batch_bytes = 0
+    for uid in uids:
+        size = max(0, int(sizes.get(uid, 0)))
+        if batch and (len(batch) >= max_count or batch_bytes + size > max_bytes):
+            out.append(batch)
+            batch = []
+            batch_bytes = 0
+        batch.append(uid)
+        batch_bytes += size
+    if batch:
+        out.append(batch)
+    return out
+
+
+def _logout_quietly(client: IMAPClient) -> None:
+    # Some servers can emit extra untagged responses that confuse IMAPClient
+    # during LOGOUT. LOGOUT errors are not actionable for our workflow, so
+    # treat them as best-effort.
+    try:
+        client.logout()
+    except Exception:
+        pass
+
+
+# Idle connections are dropped well before typical server autologout (RFC 3501
+# requires at least 30 minutes), so a pooled client is normally still alive.
+_POOL_IDLE_S = 120.0
+
+
+class ImapConnectionPool:
+    """Logged-in IMAPClient instances parked between ImapSession uses.
+
+    Keyed by (host, port, user, password digest) so a changed password never
+    reuses an old login. At most one idle client is kept per key; clients
+    idle longer than `idle_s` are logged out by a background sweep, and a
+    NOOP on checkout weeds out connections the server already closed.
+    """
+
+    def __init__(self, idle_s: float = _POOL_IDLE_S) -> None:
+        self._idle_s = float(idle_s)
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, int, str, str], tuple[IMAPClient, str, float]] = {}
+        self._timer: threading.Timer | None = None
+
+    def acquire(self, key: tuple[str, int, str, str]) -> tuple[IMAPClient, str] | None:
+        with self._lock:
+            entry = self._idle.pop(key, None)
+        if entry is None:
+            return None
+        client, tls_mode, released_at = entry
+        if time.monotonic() - released_at > self._idle_s:
+            _logout_quietly(client)
+            return None
+        try:
+            client.noop()
+        except Exception:
+            _logout_quietly(client)
+            return None
+        return client, tls_mode
+
+    def release(
+        self, key: tuple[str, int, str, str], client: IMAPClient, tls_mode: str
+    ) -> None:
+        with self._lock:
+            previous = self._idle.pop(key, None)
+            self._idle[key] = (client, tls_mode, time.monotonic())
+            self._schedule_sweep_locked()
+        if previous is not None:
+            _logout_quietly(previous[0])
+
+    def close_all(self) -> None:
+        with self._lock:
+            entries = list(self._idle.values())
+            self._idle.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for client, _mode, _ts in entries:
+            _logout_quietly(client)
+
+    def _schedule_sweep_locked(self) -> None:
+        if self._timer is not None:
+            return
+        timer = threading.Timer(self._idle_s, self._sweep)
+        timer.daemon = True
+        self._timer = timer
+        timer.start()
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._timer = None
+            expired = [
+                k for k, (_c, _m, ts) in self._idle.items() if now - ts >= self._idle_s
+            ]
+            clients = [self._idle.pop(k)[0] for k in expired]
+            if self._idle:
+                self._schedule_sweep_locked()
+        for client in clients:
+            _logout_quietly(client)
+
+
+_POOL = ImapConnectionPool()
+atexit.register(_POOL.close_all)
+
+
 class ImapSession:
-    def __init__(self, host: str, port: int, user: str, password: str) -> None:
+    def __init__(
+        self, host: str, port: int, user: str, password: str, *, pooled: bool = True
+    ) -> None:
         self._host = host
         self._port = port
         self._user = user
         self._password = password
+        self._pooled = bool(pooled)
         self._client: IMAPClient | None = None
         self._tls_mode = "default"
         self._selected_folder: str | None = None
         self._selected_readonly: bool = False
 
+    def _pool_key(self) -> tuple[str, int, str, str]:
+        digest = hashlib.sha256(
+            str(self._password or "").encode("utf-8", errors="replace")
+        ).hexdigest()
+        return (str(self._host), int(self._port), str(self._user), digest)
+
     def __enter__(self) -> "ImapSession":
+        if self._pooled:
+            reused = _POOL.acquire(self._pool_key())
+            if reused is not None:
+                self._client, self._tls_mode = reused
+                return self
         first_error: Exception | None = None
         for compatibility in (False, True):
             if compatibility and first_error is None:
@@ -234,10 +392,7 @@ class ImapSession:
                 return self
             except Exception as exc:
                 if client is not None:
-                    try:
-                        client.logout()
-                    except Exception:
-                        pass
+                    _logout_quietly(client)
                 if not compatibility and is_imap_tls_error(exc):
                     first_error = exc
                     continue
@@ -252,17 +407,15 @@ class ImapSession:
         raise RuntimeError("IMAP client not connected")
 
     def __exit__(self, exc_type, exc, tb) -> None:
-        if self._client is not None:
-            try:
-                # Some servers can emit extra untagged responses that confuse
-                # IMAPClient during LOGOUT. LOGOUT errors are not actionable
-                # for our workflow, so treat them as best-effort.
-                try:
-                    self._client.logout()
-                except Exception:
-                    pass
-            finally:
-                self._client = None
+        client, self._client = self._client, None
+        if client is None:
+            return
+        # Only hand back connections that ended cleanly; after an error the
+        # protocol state is unknown.
+        if self._pooled and exc_type is None:
+            _POOL.release(self._pool_key(), client, self._tls_mode)
+        else:
+            _logout_quietly(client)
 
     @property
     def client(self) -> IMAPClient:
@@ -287,14 +440,8 @@ class ImapSession:
         Used after transient TLS/socket drops mid-sync.
         """
         # Close any half-dead client first.
-        try:
-            if self._client is not None:
-                try:
-                    self._client.logout()
-                except Exception:
-                    pass
-        except Exception:
-            pass
+        if self._client is not None:
+            _logout_quietly(self._client)
         self._client = None
 
         # Reconnect using the same TLS mode that worked last time.
@@ -385,18 +532,18 @@ class ImapSession:
         self,
         uids: Iterable[int],
         *,
-        chunk_size: int = 20,
+        chunk_size: int = FETCH_CHUNK_SIZE,
         on_progress: Callable[[int, int], None] | None = None,
     ) -> Iterator[ImapMessage]:
         uid_list = [int(x) for x in uids]
         if not uid_list:
             return iter(())
 
-        # Some servers are sensitive to large FETCH responses with literals.
-        # Fetch metadata first (no literals), then raw message bodies with PEEK.
         def chunks(seq: list[int], n: int) -> list[list[int]]:
             return [seq[i : i + n] for i in range(0, len(seq), n)]
 
+        max_count = max(1, int(chunk_size))
+
         fetched = 0
         total = len(uid_list)
 
@@ -423,16 +570,58 @@ class ImapSession:
             assert last_exc is not None
             raise last_exc
 
+        def sizes_for(window: list[int]) -> dict[int, int]:
+            try:
+                resp = _fetch_with_retry(window, ["RFC822.SIZE"])
+            except Exception as exc:
+                if not _is_fetch_rejection(exc):
+                    raise
+                # No sizes: batches are bounded by count only.
+                return {}
+            out: dict[int, int] = {}
+            for uid, item in resp.items():
+                size = (item or {}).get(b"RFC822.SIZE")
+                if isinstance(size, int):
+                    out[int(uid)] = size
+            return out
+
+        def batches() -> Iterator[list[int]]:
+            for window in chunks(uid_list, _SIZE_PROBE_CHUNK):
+                yield from _size_batches(
+                    window,
+                    sizes_for(window),
+                    max_count=max_count,
+                    max_bytes=FETCH_BATCH_MAX_BYTES,
+                )
+
         def gen() -> Iterator[ImapMessage]:
             nonlocal fetched
-            for part in chunks(uid_list, max(1, int(chunk_size))):
-                meta = _fetch_with_retry(part, ["FLAGS", "INTERNALDATE"])
-
-                try:
-                    raw_map = _fetch_with_retry(part, ["BODY.PEEK[]"])
-                except Exception:
-                    # Fallback for servers that don't accept BODY.PEEK[].
-                    raw_map = _fetch_with_retry(part, ["RFC822"])
+            split_fetch = False
+            for part in batches():
+                meta: Mapping[int, Mapping[bytes, Any]] = {}
+                raw_map: Mapping[int, Mapping[bytes, Any]] | None = None
+                if not split_fetch:
+                    # One round trip per batch: metadata and body together.
+                    try:
+                        raw_map = _fetch_with_retry(
+                            part, ["FLAGS", "INTERNALDATE", "BODY.PEEK[]"]
+                        )
+                    except Exception as exc:
+                        if not _is_fetch_rejection(exc):
+                            raise
+                        # Some servers reject FETCH responses mixing metadata
+                        # and literals; switch to the split form for the rest
+                        # of this run.
+                        split_fetch = True
+                if raw_map is None:
+                    meta = _fetch_with_retry(part, ["FLAGS", "INTERNALDATE"])
+                    try:
+                        raw_map = _fetch_with_retry(part, ["BODY.PEEK[]"])
+                    except Exception as exc:
+                        if not _is_fetch_rejection(exc):
+                            raise
+                        # Fallback for servers that don't accept BODY.PEEK[].
+                        raw_map = _fetch_with_retry(part, ["RFC822"])
 
                 fetched += len(part)
                 if on_progress is not None:
@@ -478,7 +667,7 @@ class ImapSession:
         return gen()
 
     def fetch_messages(self, uids: Iterable[int]) -> list[ImapMessage]:
-        return list(self.iter_messages(uids, chunk_size=20, on_progress=None))
+        return list(self.iter_messages(uids, on_progress=None))
 
     def mark_seen(self, uid: int) -> None:
         # \Seen is the IMAP-standard read flag.
@@ -1,71 +1,219 @@
 from __future__ import annotations
 
+import atexit
+import contextlib
 import sqlite3
+import threading
+import weakref
+from collections.abc import Iterator
 from pathlib import Path
 
 
+_CACHED_STATEMENTS = 256
+
+
+def _tune_reads(conn: sqlite3.Connection) -> None:
+    conn.execute("PRAGMA temp_store=MEMORY;")
+    conn.execute("PRAGMA cache_size=-40000;")  # ~40 MB page cache
+    # Memory-mapped reads; silently capped/ignored where unsupported.
+    conn.execute("PRAGMA mmap_size=268435456;")
+
+
 def _connect(db_path: Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
     # Increase timeout to reduce "database is locked" errors
     # when background jobs and UI requests overlap.
-    conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30.0)
+    conn = sqlite3.connect(
+        str(db_path),
+        check_same_thread=False,
+        timeout=30.0,
+        factory=_ThreadCachedConnection,
+        # sqlite3 keeps compiled statements per connection keyed by SQL
+        # text; room for every distinct statement in the repos.
+        cached_statements=_CACHED_STATEMENTS,
+    )
     conn.row_factory = sqlite3.Row
     # Reasonable defaults for local app
     conn.execute("PRAGMA journal_mode=WAL;")
     conn.execute("PRAGMA synchronous=NORMAL;")
     conn.execute("PRAGMA foreign_keys=ON;")
     conn.execute("PRAGMA busy_timeout=30000;")
+    conn.execute("PRAGMA wal_autocheckpoint=2000;")
+    _tune_reads(conn)
     return conn
 
 
 def init_db(db_path: Path) -> None:
     conn = _connect(db_path)
     try:
-        conn.execute(
-            "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"
-        )
-        cur = conn.execute("SELECT version FROM schema_version")
-        row = cur.fetchone()
-        if row is None:
-            conn.execute("INSERT INTO schema_version(version) VALUES (0)")
-            conn.commit()
-
-        version = int(conn.execute("SELECT version FROM schema_version").fetchone()[0])
-        target = 4
-        if version < 1:
-            _migrate_0_to_1(conn)
-            conn.execute("UPDATE schema_version SET version = 1")
-            conn.commit()
-            version = 1
-        if version < 2:
-            _migrate_1_to_2(conn)
-            conn.execute("UPDATE schema_version SET version = 2")
-            conn.commit()
-            version = 2
-        if version < 3:
-            _migrate_2_to_3(conn)
-            conn.execute("UPDATE schema_version SET version = 3")
-            conn.commit()
-            version = 3
-        if version < 4:
-            _migrate_3_to_4(conn)
-            conn.execute("UPDATE schema_version SET version = 4")
-            conn.commit()
-            version = 4
-
-        if version > target:
-            raise RuntimeError(f"DB schema too new: {version} > {target}")
+        # One explicit transaction for the version check and every pending
+        # migration: a cold install is a single durable commit, and a failed
+        # migration leaves the previous schema untouched.
+        conn.isolation_level = None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"
+            )
+            row = conn.execute("SELECT version FROM schema_version").fetchone()
+            if row is None:
+                conn.execute("INSERT INTO schema_version(version) VALUES (0)")
+                version = 0
+            else:
+                version = int(row[0])
+
+            target = len(_MIGRATIONS)
+            if version > target:
+                raise RuntimeError(f"DB schema too new: {version} > {target}")
+            for migrate in _MIGRATIONS[version:]:
+                migrate(conn)
+            if version < target:
+                conn.execute("UPDATE schema_version SET version = ?", (target,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
     finally:
         conn.close()
 
 
-def get_conn(db_path: Path) -> sqlite3.Connection:
-    return _connect(db_path)
+def _connect_readonly(db_path: Path) -> sqlite3.Connection:
+    # mode=ro + query_only: a UI read can never write by accident, and it
+    # skips the journal-mode setup and schema work that writer connections do.
+    conn = sqlite3.connect(
+        db_path.resolve().as_uri() + "?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        timeout=30.0,
+        factory=_ThreadCachedConnection,
+        cached_statements=_CACHED_STATEMENTS,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA query_only=1;")
+    conn.execute("PRAGMA busy_timeout=30000;")
+    _tune_reads(conn)
+    return conn
+
+
+class _ThreadCachedConnection(sqlite3.Connection):
+    """Connection whose close() parks it for reuse by the closing thread.
+
+    Callers keep the usual open/try/finally-close pattern; a parked
+    connection has any open transaction rolled back first, exactly what a
+    real close would have discarded.
+    """
+
+    _cache_key: tuple[str, bool] | None = None
+
+    def close(self) -> None:
+        key = self._cache_key
+        slots = _thread_slots()
+        if key is not None and slots.get(key) is self:
+            return  # already parked; a second close() is a no-op
+        if key is None or key in slots:
+            super().close()
+            return
+        try:
+            if self.in_transaction:
+                self.rollback()
+            self.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            super().close()
+            return
+        slots[key] = self
+
+
+_tls = threading.local()
+# Every cacheable connection, for the exit hook; weak so a finished thread's
+# parked connections are released along with its thread-local slots.
+_parked: weakref.WeakSet[_ThreadCachedConnection] = weakref.WeakSet()
+
+
+def _thread_slots() -> dict[tuple[str, bool], _ThreadCachedConnection]:
+    slots = getattr(_tls, "slots", None)
+    if slots is None:
+        slots = _tls.slots = {}
+    return slots
+
+
+@atexit.register
+def _close_parked() -> None:
+    for conn in list(_parked):
+        conn._cache_key = None
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@contextlib.contextmanager
+def write_batch(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run several writes as one BEGIN IMMEDIATE ... COMMIT.
+
+    Repo writers that normally commit per call (jobs/repo) defer to the
+    batch while it is open, so a status change plus its events costs one
+    WAL commit instead of one each. Nested batches join the outer one.
+    """
+    batches = _thread_batches()
+    if id(conn) in batches:
+        yield conn
+        return
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    batches.add(id(conn))
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        batches.discard(id(conn))
+
+
+def _thread_batches() -> set[int]:
+    batches = getattr(_tls, "batches", None)
+    if batches is None:
+        batches = _tls.batches = set()
+    return batches
+
+
+def commit_unless_batched(conn: sqlite3.Connection) -> None:
+    if id(conn) not in _thread_batches():
+        conn.commit()
+
+
+def get_conn(db_path: Path, *, readonly: bool = False) -> sqlite3.Connection:
+    """Connection for ``db_path``, reusing the one this thread last closed.
+
+    At most one idle connection per (path, mode) is kept per thread, so the
+    open + PRAGMA setup runs once per thread instead of once per call. A
+    nested get_conn while that one is checked out gets a connection of its
+    own, so transactions are never shared by accident.
+    """
+    readonly = readonly and db_path.exists()
+    key = (str(db_path), readonly)
+    conn = _thread_slots().pop(key, None)
+    if conn is not None:
+        return conn
+    conn = _connect_readonly(db_path) if readonly else _connect(db_path)
+    if isinstance(conn, _ThreadCachedConnection):
+        conn._cache_key = key
+        _parked.add(conn)
+    return conn
 
 
 def _migrate_0_to_1(conn: sqlite3.Connection) -> None:
-    conn.executescript(
-        """
+    # Statement by statement rather than executescript(), which would commit
+    # the surrounding init_db transaction first.
+    for stmt in _SCHEMA_V1.split(";"):
+        if stmt.strip():
+            conn.execute(stmt)
+
+
+_SCHEMA_V1 = """
         CREATE TABLE IF NOT EXISTS settings (
           key TEXT PRIMARY KEY,
           value TEXT NOT NULL
@@ -144,8 +292,7 @@ def _migrate_0_to_1(conn: sqlite3.Connection) -> None:
           created_at TEXT NOT NULL,
           FOREIGN KEY(message_fk) REFERENCES messages(id) ON DELETE CASCADE
         );
-        """
-    )
+"""
 
 
 def _migrate_1_to_2(conn: sqlite3.Connection) -> None:
@@ -179,3 +326,51 @@ def _migrate_3_to_4(conn: sqlite3.Connection) -> None:
     conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_pending_summary ON messages(id) WHERE summarized_at IS NULL")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_sync_resume ON messages(account_id, mailbox, uidvalidity, uid) WHERE seen_marked_at IS NOT NULL")
 
+
+def _migrate_4_to_5(conn: sqlite3.Connection) -> None:
+    # Day lookups probe by day and return rows in internal_date order; with
+    # both in one index SQLite skips the temp B-tree sort. Wide columns
+    # (summary, paths) stay out of the index to keep it small.
+    # Built-in substr() on purpose: an index over an app-registered day()
+    # function would make every connection that lacks it (the sqlite3 CLI,
+    # native_window's settings read) fail to write messages, and a Python
+    # callback is slower per row than substr().
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_messages_day_date "
+        "ON messages(substr(internal_date, 1, 10), internal_date)"
+    )
+
+
+def _migrate_5_to_6(conn: sqlite3.Connection) -> None:
+    # Single-day lookups are range scans on idx_messages_internal_date now,
+    # and idx_messages_day_date leads with the same substr() expression, so
+    # the one-column day index only costs writes.
+    conn.execute("DROP INDEX IF EXISTS idx_messages_day_prefix")
+
+
+def _migrate_6_to_7(conn: sqlite3.Connection) -> None:
+    # The SSE stream polls job_events by (job_id, id > last seen).
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_job_events_job_id_id ON job_events(job_id, id)"
+    )
+
+
+def _migrate_7_to_8(conn: sqlite3.Connection) -> None:
+    # Partial index for find_active_job: its WHERE must match the query's
+    # status IN (...) term exactly for SQLite to use it.
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_jobs_active ON jobs(kind, updated_at DESC) "
+        "WHERE status IN ('queued','running','cancel_requested')"
+    )
+
+
+_MIGRATIONS = (
+    _migrate_0_to_1,
+    _migrate_1_to_2,
+    _migrate_2_to_3,
+    _migrate_3_to_4,
+    _migrate_4_to_5,
+    _migrate_5_to_6,
+    _migrate_6_to_7,
+    _migrate_7_to_8,
+)
@@ -2,54 +2,44 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple
+
+
+# Hot statement kept as a module constant so every call reuses the same SQL
+# text (and so the same compiled statement in sqlite3's per-connection cache).
+_UPSERT_MESSAGE_SQL = """
+    INSERT INTO messages(
+      account_id, mailbox, uidvalidity, uid, message_id, internal_date, from_addr, to_addr, subject,
+      raw_eml_path, body_html_path, body_text_path, rendered_html_path,
+      created_at, updated_at, archived_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(account_id, mailbox, uidvalidity, uid)
+    DO UPDATE SET
+      message_id=excluded.message_id,
+      internal_date=excluded.internal_date,
+      from_addr=excluded.from_addr,
+      to_addr=excluded.to_addr,
+      subject=excluded.subject,
+      raw_eml_path=excluded.raw_eml_path,
+      body_html_path=excluded.body_html_path,
+      body_text_path=excluded.body_text_path,
+      rendered_html_path=excluded.rendered_html_path,
+      updated_at=excluded.updated_at,
+      archived_at=COALESCE(messages.archived_at, excluded.archived_at)
+    """
+# RETURNING (SQLite >= 3.35) yields the row id for both the insert and the
+# conflict-update branch, saving the follow-up lookup.
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_UPSERT_MESSAGE_RETURNING_SQL = _UPSERT_MESSAGE_SQL + "RETURNING id\n"
 
 
 def _now() -> str:
+    # Writers take an optional ``ts`` so one message's rows (upsert,
+    # attachments, assets) share a single timestamp instead of one each.
     return datetime.now(timezone.utc).isoformat()
 
 
-@dataclass(frozen=True)
-class MessageRow:
-    id: int
-    account_id: str
-    mailbox: str
-    uidvalidity: int
-    uid: int
-    subject: str
-    archived_at: str | None
-    exported_at: str | None
-    seen_marked_at: str | None
-
-
-def get_existing_message(
-    conn: sqlite3.Connection,
-    *,
-    account_id: str,
-    mailbox: str,
-    uidvalidity: int,
-    uid: int,
-) -> MessageRow | None:
-    row = conn.execute(
-        "SELECT id, account_id, mailbox, uidvalidity, uid, subject, archived_at, exported_at, seen_marked_at FROM messages WHERE account_id=? AND mailbox=? AND uidvalidity=? AND uid=?",
-        (account_id, mailbox, int(uidvalidity), int(uid)),
-    ).fetchone()
-    if not row:
-        return None
-    return MessageRow(
-        id=int(row[0]),
-        account_id=str(row[1]),
-        mailbox=str(row[2]),
-        uidvalidity=int(row[3]),
-        uid=int(row[4]),
-        subject=str(row[5] or ""),
-        archived_at=str(row[6]) if row[6] else None,
-        exported_at=str(row[7]) if row[7] else None,
-        seen_marked_at=str(row[8]) if row[8] else None,
-    )
-
-
 def upsert_message(
     conn: sqlite3.Connection,
     *,
@@ -66,29 +56,11 @@ def upsert_message(
     body_html_path: str | None,
     body_text_path: str | None,
     rendered_html_path: str | None,
+    ts: str | None = None,
 ) -> int:
-    ts = _now()
-    conn.execute(
-        """
-        INSERT INTO messages(
-          account_id, mailbox, uidvalidity, uid, message_id, internal_date, from_addr, to_addr, subject,
-          raw_eml_path, body_html_path, body_text_path, rendered_html_path,
-          created_at, updated_at, archived_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(account_id, mailbox, uidvalidity, uid)
-        DO UPDATE SET
-          message_id=excluded.message_id,
-          internal_date=excluded.internal_date,
-          from_addr=excluded.from_addr,
-          to_addr=excluded.to_addr,
-          subject=excluded.subject,
-          raw_eml_path=excluded.raw_eml_path,
-          body_html_path=excluded.body_html_path,
-          body_text_path=excluded.body_text_path,
-          rendered_html_path=excluded.rendered_html_path,
-          updated_at=excluded.updated_at,
-          archived_at=COALESCE(messages.archived_at, excluded.archived_at)
-        """,
+    ts = ts or _now()
+    cur = conn.execute(
+        _UPSERT_MESSAGE_RETURNING_SQL if _HAS_RETURNING else _UPSERT_MESSAGE_SQL,
         (
             account_id,
             mailbox,
@@ -108,23 +80,35 @@ def upsert_message(
             ts,
         ),
     )
-    row = conn.execute(
-        "SELECT id FROM messages WHERE account_id=? AND mailbox=? AND uidvalidity=? AND uid=?",
-        (account_id, mailbox, int(uidvalidity), int(uid)),
-    ).fetchone()
+    if _HAS_RETURNING:
+        row = cur.fetchone()
+        # Drain the cursor so the statement is reset before the caller commits.
+        cur.fetchall()
+    else:
+        row = conn.execute(
+            "SELECT id FROM messages WHERE account_id=? AND mailbox=? AND uidvalidity=? AND uid=?",
+            (account_id, mailbox, int(uidvalidity), int(uid)),
+        ).fetchone()
     return int(row[0])
 
 
 def replace_attachments(
-    conn: sqlite3.Connection, *, message_fk: int, items: list[dict]
+    conn: sqlite3.Connection,
+    *,
+    message_fk: int,
+    items: list[dict],
+    ts: str | None = None,
 ) -> None:
-    ts = _now()
-    conn.execute("DELETE FROM attachments WHERE message_fk = ?", (int(message_fk),))
-    for it in items:
-        conn.execute(
-            "INSERT INTO attachments(message_fk, filename, mime_type, size_bytes, rel_path, content_id, is_inline, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+    ts = ts or _now()
+    fk = int(message_fk)
+    conn.execute("DELETE FROM attachments WHERE message_fk = ?", (fk,))
+    if not items:
+        return
+    conn.executemany(
+        "INSERT INTO attachments(message_fk, filename, mime_type, size_bytes, rel_path, content_id, is_inline, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
             (
-                int(message_fk),
+                fk,
                 str(it["filename"]),
                 it.get("mime_type"),
                 int(it["size_bytes"]),
@@ -132,28 +116,43 @@ def replace_attachments(
                 it.get("content_id"),
                 1 if it.get("is_inline") else 0,
                 ts,
-            ),
-        )
+            )
+            for it in items
+        ],
+    )
 
 
 def replace_external_assets(
-    conn: sqlite3.Connection, *, message_fk: int, items: list[dict]
+    conn: sqlite3.Connection,
+    *,
+    message_fk: int,
+    items: list[dict],
+    ts: str | None = None,
 ) -> None:
-    ts = _now()
-    conn.execute("DELETE FROM external_assets WHERE message_fk = ?", (int(message_fk),))
-    for it in items:
-        conn.execute(
-            "INSERT INTO external_assets(message_fk, original_url, rel_path, mime_type, size_bytes, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+    ts = ts or _now()
+    fk = int(message_fk)
+    conn.execute("DELETE FROM external_assets WHERE message_fk = ?", (fk,))
+    if not items:
+        return
+    conn.executemany(
+        "INSERT INTO external_assets(message_fk, original_url, rel_path, mime_type, size_bytes, status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
             (
-                int(message_fk),
+                fk,
                 str(it["original_url"]),
                 it.get("rel_path"),
                 it.get("mime_type"),
                 it.get("size_bytes"),
                 str(it.get("status") or ""),
                 ts,
-            ),
-        )
+            )
+            for it in items
+        ],
+    )
+
+
+# Compact encoder for the tags/topics columns: no padding after separators.
+_json_list = json.JSONEncoder(ensure_ascii=True, separators=(",", ":")).encode
 
 
 def set_analysis(
@@ -173,8 +172,8 @@ def set_analysis(
         "UPDATE messages SET summary=?, tags_json=?, topics_json=?, personal=?, indexed_at=?, summarized_at=?, summarize_ms=?, updated_at=? WHERE id=?",
         (
             summary,
-            json.dumps(tags, ensure_ascii=True),
-            json.dumps(topics, ensure_ascii=True),
+            _json_list(tags),
+            _json_list(topics),
             1 if personal else 0,
             ts,
             sat,
@@ -187,20 +186,28 @@ def set_analysis(
 
 def set_exported(
     conn: sqlite3.Connection, *, message_fk: int, exported_at: str | None = None
-) -> None:
+) -> bool:
+    """Record the first export; returns False if it was already recorded.
+
+    The IS NULL guard turns repeat calls into no-op UPDATEs that dirty no
+    pages (and so write nothing to the WAL).
+    """
     ts = exported_at or _now()
-    conn.execute(
-        "UPDATE messages SET exported_at=?, updated_at=? WHERE id=?",
+    cur = conn.execute(
+        "UPDATE messages SET exported_at=?, updated_at=? WHERE id=? AND exported_at IS NULL",
         (ts, ts, int(message_fk)),
     )
+    return cur.rowcount > 0
 
 
-def set_seen_marked(conn: sqlite3.Connection, *, message_fk: int) -> None:
+def set_seen_marked(conn: sqlite3.Connection, *, message_fk: int) -> bool:
+    """Record the first \\Seen marking; returns False if already recorded."""
     ts = _now()
-    conn.execute(
-        "UPDATE messages SET seen_marked_at=?, updated_at=? WHERE id=?",
+    cur = conn.execute(
+        "UPDATE messages SET seen_marked_at=?, updated_at=? WHERE id=? AND seen_marked_at IS NULL",
         (ts, ts, int(message_fk)),
     )
+    return cur.rowcount > 0
 
 
 def get_max_uid(
@@ -234,27 +241,97 @@ def get_incomplete_uids(
     return [int(r[0]) for r in rows]
 
 
+class DayMessageRow(NamedTuple):
+    id: int
+    subject: str | None
+    from_addr: str | None
+    internal_date: str | None
+    summary: str | None
+    tags_json: str | None
+    topics_json: str | None
+    raw_eml_path: str | None
+    rendered_html_path: str | None
+    summarized_at: str | None
+    summarize_ms: int | None
+
+
+class RecentMessageRow(NamedTuple):
+    id: int
+    subject: str | None
+    from_addr: str | None
+    internal_date: str | None
+    summary: str | None
+    tags_json: str | None
+    topics_json: str | None
+    rendered_html_path: str | None
+    summarized_at: str | None
+    summarize_ms: int | None
+
+
+class ResummarizeRow(NamedTuple):
+    """Fields for recomputing message_key and reading archived bodies.
+
+    topics_json is included to detect topic changes during resummarize.
+    Text and number columns are COALESCEd in SQL, so none are NULL.
+    """
+
+    id: int
+    account_id: str
+    mailbox: str
+    uidvalidity: int
+    uid: int
+    subject: str
+    from_addr: str
+    internal_date: str
+    summary: str
+    raw_eml_path: str
+    body_text_path: str
+    body_html_path: str
+    topics_json: str
+
+
+def _day_range(day: str) -> tuple[str, str] | None:
+    """Half-open [day, next day) bounds for ISO internal_date strings.
+
+    A plain range lets idx_messages_internal_date both filter and order.
+    """
+    try:
+        start = date.fromisoformat(str(day).strip())
+    except ValueError:
+        return None
+    return start.isoformat(), (start + timedelta(days=1)).isoformat()
+
+
+def _plain_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    # List queries build NamedTuples straight from plain tuples instead of
+    # allocating a sqlite3.Row per row first.
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur
+
+
 def list_messages_by_date(
     conn: sqlite3.Connection, *, date_prefix: str
-) -> list[sqlite3.Row]:
+) -> list[DayMessageRow]:
     # date_prefix: 'YYYY-MM-DD'
-    return list(
-        conn.execute(
-            "SELECT id, subject, from_addr, internal_date, summary, tags_json, topics_json, raw_eml_path, rendered_html_path, summarized_at, summarize_ms FROM messages WHERE internal_date LIKE ? ORDER BY internal_date ASC",
-            (f"{date_prefix}%",),
-        ).fetchall()
+    day_range = _day_range(date_prefix)
+    if day_range is None:
+        return []
+    rows = _plain_cursor(conn).execute(
+        "SELECT id, subject, from_addr, internal_date, summary, tags_json, topics_json, raw_eml_path, rendered_html_path, summarized_at, summarize_ms FROM messages WHERE internal_date >= ? AND internal_date < ? ORDER BY internal_date ASC",
+        day_range,
     )
+    return list(map(DayMessageRow._make, rows))
 
 
 def list_recent_messages(
     conn: sqlite3.Connection, *, limit: int = 50
-) -> list[sqlite3.Row]:
-    return list(
-        conn.execute(
-            "SELECT id, subject, from_addr, internal_date, summary, tags_json, topics_json, rendered_html_path, summarized_at, summarize_ms FROM messages ORDER BY internal_date DESC, id DESC LIMIT ?",
-            (int(limit),),
-        ).fetchall()
+) -> list[RecentMessageRow]:
+    rows = _plain_cursor(conn).execute(
+        "SELECT id, subject, from_addr, internal_date, summary, tags_json, topics_json, rendered_html_path, summarized_at, summarize_ms FROM messages ORDER BY internal_date DESC, id DESC LIMIT ?",
+        (int(limit),),
     )
+    return list(map(RecentMessageRow._make, rows))
 
 
 def get_message_detail(conn: sqlite3.Connection, message_id: int) -> sqlite3.Row | None:
@@ -264,51 +341,111 @@ def get_message_detail(conn: sqlite3.Connection, message_id: int) -> sqlite3.Row
     ).fetchone()
 
 
+_RESUMMARIZE_COLUMNS = (
+    "id, COALESCE(account_id, ''), COALESCE(mailbox, ''), "
+    "COALESCE(uidvalidity, 0), COALESCE(uid, 0), COALESCE(subject, ''), "
+    "COALESCE(from_addr, ''), COALESCE(internal_date, ''), COALESCE(summary, ''), "
+    "COALESCE(raw_eml_path, ''), COALESCE(body_text_path, ''), "
+    "COALESCE(body_html_path, ''), COALESCE(topics_json, '[]')"
+)
+# Whatever str.strip() removes, as SQLite char() arguments for ltrim().
+_STRIP_CODEPOINTS = ",".join(str(c) for c in range(0x3001) if chr(c).isspace())
+_LTRIMMED_SUMMARY = f"ltrim(summary, char({_STRIP_CODEPOINTS}))"
+# SQL side of jobs.tasks_resummarize._needs_resummarize, kept in step with its
+# pattern list. LIKE cannot express "any punctuation between letters", so the
+# spaced phrases use '%' between letters instead: this matches a superset of
+# the real check, which the caller still applies to the few rows that pass.
+_NEEDS_RESUMMARIZE_SQL = (
+    "(summary IS NULL"
+    f" OR {_LTRIMMED_SUMMARY} = ''"
+    f" OR {_LTRIMMED_SUMMARY} LIKE '{{%'"
+    f" OR {_LTRIMMED_SUMMARY} LIKE '```%'"
+    " OR summary LIKE '%n%o%s%u%m%m%a%r%y%'"
+    " OR summary LIKE '%\uc694%\uc57d%\ud56d%\ubaa9%\uc774%\ubd80%\uc871%\ud569%\ub2c8%\ub2e4%'"
+    " OR summary LIKE '%llm timeout%'"
+    " OR summary LIKE '%llm unavailable%'"
+    " OR summary LIKE '%llm error%'"
+    " OR summary LIKE '%failed to format input%'"
+    " OR summary LIKE '%invalid codepoint%'"
+    " OR summary LIKE '%loading model%'"
+    " OR summary LIKE '%available commands%')"
+)
+
+
 def list_messages_for_resummarize_by_date(
-    conn: sqlite3.Connection, *, date_prefix: str
-) -> list[sqlite3.Row]:
-    # Includes fields required for recomputing message_key and reading archived bodies.
-    # topics_json (index 12) is included to detect topic changes during resummarize.
-    return list(
-        conn.execute(
-            "SELECT id, account_id, mailbox, uidvalidity, uid, subject, from_addr, internal_date, summary, raw_eml_path, body_text_path, body_html_path, topics_json "
-            "FROM messages WHERE internal_date LIKE ? ORDER BY internal_date ASC",
-            (f"{date_prefix}%",),
-        ).fetchall()
+    conn: sqlite3.Connection,
+    *,
+    date_prefix: str,
+    needs_resummarize_only: bool = False,
+) -> list[ResummarizeRow]:
+    day_range = _day_range(date_prefix)
+    if day_range is None:
+        return []
+    where = "internal_date >= ? AND internal_date < ?"
+    if needs_resummarize_only:
+        where += f" AND {_NEEDS_RESUMMARIZE_SQL}"
+    rows = _plain_cursor(conn).execute(
+        f"SELECT {_RESUMMARIZE_COLUMNS} FROM messages WHERE {where} "
+        "ORDER BY internal_date ASC",
+        day_range,
     )
+    return list(map(ResummarizeRow._make, rows))
 
 
 def list_messages_for_resummarize_by_dates(
-    conn: sqlite3.Connection, *, date_keys: list[str]
-) -> list[sqlite3.Row]:
+    conn: sqlite3.Connection,
+    *,
+    date_keys: list[str],
+    needs_resummarize_only: bool = False,
+) -> list[ResummarizeRow]:
     days = [str(x or "").strip() for x in (date_keys or []) if str(x or "").strip()]
     if not days:
         return []
     # Preserve the caller's normalized order while deduplicating.
     days = list(dict.fromkeys(days))
     qmarks = ",".join(["?"] * len(days))
+    where = f"substr(internal_date, 1, 10) IN ({qmarks})"
+    if needs_resummarize_only:
+        where += f" AND {_NEEDS_RESUMMARIZE_SQL}"
     sql = (
-        "SELECT id, account_id, mailbox, uidvalidity, uid, subject, from_addr, "
-        "internal_date, summary, raw_eml_path, body_text_path, body_html_path, "
-        "topics_json "
-        f"FROM messages WHERE substr(internal_date, 1, 10) IN ({qmarks}) "
+        f"SELECT {_RESUMMARIZE_COLUMNS} FROM messages WHERE {where} "
         "ORDER BY internal_date ASC"
     )
-    return list(conn.execute(sql, tuple(days)).fetchall())
+    return list(map(ResummarizeRow._make, _plain_cursor(conn).execute(sql, tuple(days))))
+
+
+# json_each is built in from SQLite 3.38; older builds use a temp id table.
+_HAS_JSON_EACH = sqlite3.sqlite_version_info >= (3, 38, 0)
+_RESUMMARIZE_BY_IDS_SQL = (
+    f"SELECT {_RESUMMARIZE_COLUMNS} FROM messages "
+    "WHERE id IN (SELECT value FROM json_each(?)) ORDER BY internal_date ASC"
+)
+_RESUMMARIZE_BY_TEMP_IDS_SQL = (
+    f"SELECT {_RESUMMARIZE_COLUMNS} FROM messages "
+    "WHERE id IN (SELECT id FROM temp._resummarize_ids) ORDER BY internal_date ASC"
+)
 
 
 def list_messages_for_resummarize_by_ids(
     conn: sqlite3.Connection, *, message_ids: list[int]
-) -> list[sqlite3.Row]:
+) -> list[ResummarizeRow]:
     mids = [int(x) for x in (message_ids or []) if str(x).strip()]
     if not mids:
         return []
-    qmarks = ",".join(["?"] * len(mids))
-    sql = (
-        "SELECT id, account_id, mailbox, uidvalidity, uid, subject, from_addr, internal_date, summary, raw_eml_path, body_text_path, body_html_path, topics_json "
-        f"FROM messages WHERE id IN ({qmarks}) ORDER BY internal_date ASC"
+    if _HAS_JSON_EACH:
+        # One bound parameter however many ids: no 999-variable limit and
+        # the same statement text (and cached plan) for every call.
+        rows = _plain_cursor(conn).execute(
+            _RESUMMARIZE_BY_IDS_SQL, (json.dumps(mids),)
+        )
+        return list(map(ResummarizeRow._make, rows))
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _resummarize_ids(id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM _resummarize_ids")
+    conn.executemany(
+        "INSERT OR IGNORE INTO _resummarize_ids(id) VALUES (?)", [(i,) for i in mids]
     )
-    return list(conn.execute(sql, tuple(mids)).fetchall())
+    rows = _plain_cursor(conn).execute(_RESUMMARIZE_BY_TEMP_IDS_SQL)
+    return list(map(ResummarizeRow._make, rows))
 
 
 def get_message_ids_by_topic(
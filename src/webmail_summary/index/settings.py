@@ -1,10 +1,50 @@
 from __future__ import annotations
 
+import functools
 import json
 import sqlite3
 from dataclasses import dataclass
 
 
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on"})
+
+_SETTINGS_KEYS = (
+    "imap_host",
+    "imap_port",
+    "imap_user",
+    "imap_folder",
+    "sender_filter",
+    "obsidian_root",
+    "llm_backend",
+    "cloud_provider",
+    "cloud_multimodal_enabled",
+    "openrouter_model",
+    "local_model_id",
+    "external_max_bytes",
+    "revert_seen_after_sync",
+    "user_roles",
+    "user_interests",
+    "close_behavior",
+    "update_channel",
+    "update_latest_version",
+    "update_auto_check_enabled",
+    "update_repo",
+    "update_snooze_until",
+    "update_skip_version",
+    "update_last_checked_at",
+    "update_download_url",
+    "update_last_check_status",
+    "local_engine",
+    "local_accel",
+    "local_threads",
+    "new_models_v2_dismissed",
+    "ui_theme",
+)
+_SELECT_SETTINGS_SQL = "SELECT key, value FROM settings WHERE key IN ({})".format(
+    ",".join("?" * len(_SETTINGS_KEYS))
+)
+
+
 @dataclass(frozen=True)
 class Settings:
     imap_host: str
@@ -63,77 +103,86 @@ def _normalize_ui_theme(value: str | None) -> str:
     return v
 
 
+@functools.lru_cache(maxsize=16)
+def _parse_user_roles(raw: str) -> tuple:
+    # Cached on the raw string; callers get a fresh list per Settings.
+    try:
+        roles = json.loads(raw)
+    except Exception:
+        return ()
+    return tuple(roles) if isinstance(roles, list) else ()
+
+
+def _read_settings(conn: sqlite3.Connection) -> dict[str, str]:
+    """All known settings in one query; missing keys are simply absent."""
+    rows = conn.execute(_SELECT_SETTINGS_SQL, _SETTINGS_KEYS).fetchall()
+    return {str(r[0]): str(r[1]) for r in rows}
+
+
 def load_settings(conn: sqlite3.Connection) -> Settings:
-    imap_host = get_setting(conn, "imap_host") or ""
-    imap_port = int(get_setting(conn, "imap_port") or "993")
-    imap_user = get_setting(conn, "imap_user") or ""
-    imap_folder = get_setting(conn, "imap_folder") or "INBOX"
-    sender_filter = get_setting(conn, "sender_filter") or ""
-    obsidian_root = get_setting(conn, "obsidian_root") or ""
-    llm_backend = get_setting(conn, "llm_backend") or "local"
-    cloud_provider = get_setting(conn, "cloud_provider") or "openai"
+    values = _read_settings(conn)
+    imap_host = values.get("imap_host") or ""
+    imap_port = int(values.get("imap_port") or "993")
+    imap_user = values.get("imap_user") or ""
+    imap_folder = values.get("imap_folder") or "INBOX"
+    sender_filter = values.get("sender_filter") or ""
+    obsidian_root = values.get("obsidian_root") or ""
+    llm_backend = values.get("llm_backend") or "local"
+    cloud_provider = values.get("cloud_provider") or "openai"
     cloud_multimodal_enabled = (
-        get_setting(conn, "cloud_multimodal_enabled") or "0"
-    ).strip().lower() in {"1", "true", "yes", "on"}
-    openrouter_model = get_setting(conn, "openrouter_model") or "openai/gpt-4o-mini"
+        values.get("cloud_multimodal_enabled") or "0"
+    ).strip().lower() in _TRUE_VALUES
+    openrouter_model = values.get("openrouter_model") or "openai/gpt-4o-mini"
     from webmail_summary.llm.local_models import get_local_model, recommend_local_model
 
     local_model_id = (
-        (get_setting(conn, "local_model_id") or recommend_local_model().id)
+        (values.get("local_model_id") or recommend_local_model().id)
         .strip()
         .lower()
     )
     # Normalize to a known model id; unknown values fall back to default.
     local_model_id = get_local_model(local_model_id).id
-    external_max_bytes = int(get_setting(conn, "external_max_bytes") or str(1024**3))
+    external_max_bytes = int(values.get("external_max_bytes") or str(1024**3))
     revert_seen_after_sync = (
-        get_setting(conn, "revert_seen_after_sync") or "0"
-    ).strip() in {
-        "1",
-        "true",
-        "yes",
-        "on",
-    }
-    try:
-        user_roles = json.loads(get_setting(conn, "user_roles") or "[]")
-    except Exception:
-        user_roles = []
-    user_interests = get_setting(conn, "user_interests") or ""
+        values.get("revert_seen_after_sync") or "0"
+    ).strip().lower() in _TRUE_VALUES
+    user_roles = list(_parse_user_roles(values.get("user_roles") or "[]"))
+    user_interests = values.get("user_interests") or ""
     close_behavior = (
-        (get_setting(conn, "close_behavior") or "background").strip().lower()
+        (values.get("close_behavior") or "background").strip().lower()
     )
     if close_behavior not in {"background", "exit"}:
         close_behavior = "background"
-    update_channel = (get_setting(conn, "update_channel") or "stable").strip().lower()
+    update_channel = (values.get("update_channel") or "stable").strip().lower()
     if update_channel not in {"stable", "beta"}:
         update_channel = "stable"
-    update_latest_version = (get_setting(conn, "update_latest_version") or "").strip()
+    update_latest_version = (values.get("update_latest_version") or "").strip()
     update_auto_check_enabled = (
-        get_setting(conn, "update_auto_check_enabled") or "1"
-    ).strip().lower() in {"1", "true", "yes", "on"}
-    update_repo = (get_setting(conn, "update_repo") or "").strip()
-    update_snooze_until = (get_setting(conn, "update_snooze_until") or "").strip()
-    update_skip_version = (get_setting(conn, "update_skip_version") or "").strip()
-    update_last_checked_at = (get_setting(conn, "update_last_checked_at") or "").strip()
-    update_download_url = (get_setting(conn, "update_download_url") or "").strip()
+        values.get("update_auto_check_enabled") or "1"
+    ).strip().lower() in _TRUE_VALUES
+    update_repo = (values.get("update_repo") or "").strip()
+    update_snooze_until = (values.get("update_snooze_until") or "").strip()
+    update_skip_version = (values.get("update_skip_version") or "").strip()
+    update_last_checked_at = (values.get("update_last_checked_at") or "").strip()
+    update_download_url = (values.get("update_download_url") or "").strip()
     update_last_check_status = (
-        get_setting(conn, "update_last_check_status") or ""
+        values.get("update_last_check_status") or ""
     ).strip()
-    local_engine = (get_setting(conn, "local_engine") or "auto").strip().lower()
+    local_engine = (values.get("local_engine") or "auto").strip().lower()
     if local_engine not in {"auto", "llamacpp", "mlx"}:
         local_engine = "auto"
-    local_accel = (get_setting(conn, "local_accel") or "cpu").strip().lower()
+    local_accel = (values.get("local_accel") or "cpu").strip().lower()
     if local_accel not in {"cpu", "vulkan"}:
         local_accel = "cpu"
     try:
-        local_threads = int(get_setting(conn, "local_threads") or "0")
+        local_threads = int(values.get("local_threads") or "0")
     except Exception:
         local_threads = 0
     if local_threads < 0:
         local_threads = 0
     new_models_v2_dismissed = (
-        get_setting(conn, "new_models_v2_dismissed") or "0"
-    ).strip().lower() in {"1", "true", "yes", "on"}
+        values.get("new_models_v2_dismissed") or "0"
+    ).strip().lower() in _TRUE_VALUES
 
     return Settings(
         imap_host=imap_host,
@@ -151,7 +200,7 @@ def load_settings(conn: sqlite3.Connection) -> Settings:
         revert_seen_after_sync=revert_seen_after_sync,
         user_roles=user_roles,
         user_interests=user_interests,
-        ui_theme=_normalize_ui_theme(get_setting(conn, "ui_theme")),
+        ui_theme=_normalize_ui_theme(values.get("ui_theme")),
         close_behavior=close_behavior,
         update_channel=update_channel,
         update_latest_version=update_latest_version,
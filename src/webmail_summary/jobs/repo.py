@@ -1,9 +1,34 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+import time
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime, timezone
 
+from webmail_summary.index.db import commit_unless_batched
+
+
+_UPDATE_PROGRESS_SQL = (
+    "UPDATE jobs SET progress_current = ?, progress_total = ?, message = ?, "
+    "updated_at = ? WHERE id = ?"
+)
+_EVENTS_SINCE_SQL = (
+    "SELECT id, ts, level, text FROM job_events "
+    "WHERE job_id = ? AND id > ? ORDER BY id ASC LIMIT ?"
+)
+
+# Progress writes are coalesced: an update that keeps the same message, moves
+# the fraction by less than _PROGRESS_MIN_DELTA and lands within
+# _PROGRESS_MIN_INTERVAL_S of the last write is held back and written by the
+# next real write, flush_progress() or set_job_status().
+_PROGRESS_MIN_INTERVAL_S = 0.2
+_PROGRESS_MIN_DELTA = 0.01
+_progress_lock = threading.Lock()
+_progress_last: dict[str, tuple[float, float, str]] = {}
+_progress_pending: dict[str, tuple[float, float, str]] = {}
+
 
 def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
@@ -21,12 +46,23 @@ class JobRow:
     updated_at: str
 
 
-def find_active_job(conn: sqlite3.Connection, *, kind: str) -> JobRow | None:
-    row = conn.execute(
+def find_active_job(
+    conn: sqlite3.Connection, *, kind: str, max_age_s: float | None = None
+) -> JobRow | None:
+    """Return the newest queued/running job of ``kind``.
+
+    With ``max_age_s``, jobs whose ``updated_at`` is older than that are
+    ignored; the age check runs in SQLite rather than parsing timestamps here.
+    """
+    sql = (
         "SELECT id, kind, status, progress_current, progress_total, message, created_at, updated_at "
-        "FROM jobs WHERE kind = ? AND status IN ('queued','running','cancel_requested') ORDER BY updated_at DESC LIMIT 1",
-        (str(kind),),
-    ).fetchone()
+        "FROM jobs WHERE kind = ? AND status IN ('queued','running','cancel_requested')"
+    )
+    params: tuple = (str(kind),)
+    if max_age_s is not None:
+        sql += " AND julianday(updated_at) >= julianday('now', ?)"
+        params += (f"-{max(0, int(max_age_s))} seconds",)
+    row = conn.execute(sql + " ORDER BY updated_at DESC LIMIT 1", params).fetchone()
     if not row:
         return None
     return JobRow(
@@ -47,17 +83,37 @@ def create_job(conn: sqlite3.Connection, *, job_id: str, kind: str) -> None:
         "INSERT INTO jobs(id, kind, status, progress_current, progress_total, message, created_at, updated_at) VALUES (?, ?, ?, 0, 0, '', ?, ?)",
         (job_id, kind, "queued", ts, ts),
     )
-    conn.commit()
+    commit_unless_batched(conn)
 
 
 def set_job_status(
     conn: sqlite3.Connection, *, job_id: str, status: str, message: str = ""
 ) -> None:
+    flush_progress(conn, job_id=job_id)
     conn.execute(
         "UPDATE jobs SET status = ?, message = ?, updated_at = ? WHERE id = ?",
         (status, message, _now(), job_id),
     )
-    conn.commit()
+    commit_unless_batched(conn)
+
+
+def _coalesce_progress(job_id: str, current: float, total: float, message: str) -> bool:
+    """Return True when this update can be skipped (kept as pending)."""
+    pct = float(current) / max(float(total), 1.0)
+    now = time.monotonic()
+    with _progress_lock:
+        last = _progress_last.get(job_id)
+        if (
+            last is not None
+            and message == last[2]
+            and now - last[0] < _PROGRESS_MIN_INTERVAL_S
+            and abs(pct - last[1]) < _PROGRESS_MIN_DELTA
+        ):
+            _progress_pending[job_id] = (float(current), float(total), message)
+            return True
+        _progress_last[job_id] = (now, pct, message)
+        _progress_pending.pop(job_id, None)
+        return False
 
 
 def update_progress(
@@ -67,20 +123,58 @@ def update_progress(
     current: float,
     total: float,
     message: str,
+    ts: str | None = None,
 ) -> None:
+    if _coalesce_progress(job_id, current, total, message):
+        return
     conn.execute(
-        "UPDATE jobs SET progress_current = ?, progress_total = ?, message = ?, updated_at = ? WHERE id = ?",
-        (float(current), float(total), message, _now(), job_id),
+        _UPDATE_PROGRESS_SQL,
+        (float(current), float(total), message, ts or _now(), job_id),
     )
-    conn.commit()
+    commit_unless_batched(conn)
+
 
+def flush_progress(conn: sqlite3.Connection, *, job_id: str) -> None:
+    """Write any held-back progress for ``job_id`` and forget its state."""
+    with _progress_lock:
+        pending = _progress_pending.pop(job_id, None)
+        _progress_last.pop(job_id, None)
+    if pending is None:
+        return
+    current, total, message = pending
+    conn.execute(_UPDATE_PROGRESS_SQL, (current, total, message, _now(), job_id))
+    commit_unless_batched(conn)
 
-def add_event(conn: sqlite3.Connection, *, job_id: str, level: str, text: str) -> None:
+
+def add_event(
+    conn: sqlite3.Connection,
+    *,
+    job_id: str,
+    level: str,
+    text: str,
+    ts: str | None = None,
+) -> None:
     conn.execute(
         "INSERT INTO job_events(job_id, ts, level, text) VALUES (?, ?, ?, ?)",
-        (job_id, _now(), level, text),
+        (job_id, ts or _now(), level, text),
+    )
+    commit_unless_batched(conn)
+
+
+def add_events(
+    conn: sqlite3.Connection,
+    *,
+    job_id: str,
+    events: Iterable[tuple[str, str]],
+    ts: str | None = None,
+) -> None:
+    """Insert several ``(level, text)`` events for one job in one commit."""
+    ts = ts or _now()
+    conn.executemany(
+        "INSERT INTO job_events(job_id, ts, level, text) VALUES (?, ?, ?, ?)",
+        [(job_id, ts, level, text) for level, text in events],
     )
-    conn.commit()
+    commit_unless_batched(conn)
 
 
 def get_job(conn: sqlite3.Connection, job_id: str) -> JobRow | None:
@@ -103,11 +197,9 @@ def get_job(conn: sqlite3.Connection, job_id: str) -> JobRow | None:
 
 
 def get_events_since(
-    conn: sqlite3.Connection, *, job_id: str, last_id: int
+    conn: sqlite3.Connection, *, job_id: str, last_id: int, limit: int = -1
 ) -> list[sqlite3.Row]:
+    """Events after ``last_id`` in id order; at most ``limit`` (-1: all)."""
     return list(
-        conn.execute(
-            "SELECT id, ts, level, text FROM job_events WHERE job_id = ? AND id > ? ORDER BY id ASC",
-            (job_id, int(last_id)),
-        ).fetchall()
+        conn.execute(_EVENTS_SINCE_SQL, (job_id, int(last_id), int(limit))).fetchall()
     )
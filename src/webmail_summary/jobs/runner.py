@@ -1,42 +1,111 @@
 from __future__ import annotations
 
+import os
 import queue
 import subprocess
 import sys
 import threading
 import time
 import uuid
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, replace
 from typing import Callable
 
-from webmail_summary.index.db import get_conn
+from webmail_summary.index.db import get_conn, write_batch
 from webmail_summary.jobs import repo
 from webmail_summary.jobs.worker_probe import kill_sync_worker
+from webmail_summary.jobs.worker_probe import register_served_job
+from webmail_summary.jobs.worker_probe import unregister_served_job
 from webmail_summary.util.app_data import get_app_data_dir
 from webmail_summary.util.error_reports import write_error_report
-from webmail_summary.util.process_control import hidden_subprocess_kwargs
+from webmail_summary.util.process_control import kill_pidfd
+from webmail_summary.util.process_control import open_pidfd
+from webmail_summary.util.process_control import process_group_subprocess_kwargs
 from webmail_summary.util.process_control import terminate_process_tree
+from webmail_summary.util.process_control import wait_pidfd
 
 
 JobFunc = Callable[[str, threading.Event], None]
 
+# Queued (not yet started) jobs before enqueue() blocks its caller.
+_MAX_QUEUED = 1024
 
-def _sync_worker_command(job_id: str) -> list[str]:
-    """Build sync worker command for source and frozen builds.
 
-    - Source/dev runs: python -m webmail_summary.jobs.worker_sync --job-id <id>
-    - Frozen exe runs:  webmail-summary.exe sync-worker --job-id <id>
+def _wait_proc(
+    proc: subprocess.Popen[str], pidfd: int | None, timeout: float
+) -> int:
+    # Popen.wait(timeout=...) sleep-polls on POSIX; a pidfd wakes on exit.
+    if pidfd is not None and not wait_pidfd(pidfd, timeout):
+        raise subprocess.TimeoutExpired(proc.args, timeout)
+    return proc.wait(timeout=timeout)
+
+
+def _sync_worker_command() -> list[str]:
+    """Build the long-lived sync worker command for source and frozen builds.
+
+    - Source/dev runs: python -m webmail_summary.jobs.worker_sync --serve
+    - Frozen exe runs:  webmail-summary.exe sync-worker --serve
     """
 
     if bool(getattr(sys, "frozen", False)):
-        return [sys.executable, "sync-worker", "--job-id", str(job_id)]
-    return [
-        sys.executable,
-        "-m",
-        "webmail_summary.jobs.worker_sync",
-        "--job-id",
-        str(job_id),
-    ]
+        return [sys.executable, "sync-worker", "--serve"]
+    return [sys.executable, "-m", "webmail_summary.jobs.worker_sync", "--serve"]
+
+
+class _SyncWorker:
+    """One ``worker_sync --serve`` process reused across sync jobs.
+
+    Job ids go in on stdin; a reader thread queues the ``OK``/``ERR`` replies,
+    and ``None`` once stdout closes (the worker exited or was killed).
+    """
+
+    def __init__(self) -> None:
+        popen_kwargs: dict = {
+            "stdin": subprocess.PIPE,
+            "stdout": subprocess.PIPE,
+            "stderr": subprocess.DEVNULL,
+            "text": True,
+            "encoding": "utf-8",
+            "errors": "replace",
+            "bufsize": 1,
+        }
+        # Own process group, so a cancel also takes down anything it spawned.
+        popen_kwargs.update(process_group_subprocess_kwargs())
+        self.proc: subprocess.Popen[str] = subprocess.Popen(
+            _sync_worker_command(), **popen_kwargs
+        )
+        self.pidfd = open_pidfd(self.proc.pid)
+        self.replies: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        threading.Thread(target=self._read_replies, daemon=True).start()
+
+    def _read_replies(self) -> None:
+        try:
+            assert self.proc.stdout is not None
+            for line in self.proc.stdout:
+                if line.startswith(("OK ", "ERR ")):
+                    self.replies.put(line.rstrip("\n"))
+        except Exception:
+            pass
+        finally:
+            self.replies.put(None)
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def submit(self, job_id: str) -> None:
+        assert self.proc.stdin is not None
+        self.proc.stdin.write(f"{job_id}\n")
+        self.proc.stdin.flush()
+
+    def close(self) -> None:
+        try:
+            if self.proc.stdin is not None:
+                self.proc.stdin.close()
+        except Exception:
+            pass
+        if self.pidfd is not None:
+            os.close(self.pidfd)
+            self.pidfd = None
 
 
 @dataclass(frozen=True)
@@ -44,18 +113,28 @@ class EnqueuedJob:
     id: str
     kind: str
     fn: JobFunc
+    # Set in place on the queue by cancel(); the loop skips such entries.
+    cancelled: bool = False
 
 
 class JobRunner:
-    def __init__(self) -> None:
-        self._q: "queue.Queue[EnqueuedJob]" = queue.Queue()
+    def __init__(self, *, max_queued: int = _MAX_QUEUED) -> None:
+        self._q: deque[EnqueuedJob] = deque()
+        self._max_queued = max(1, int(max_queued))
         self._thread = threading.Thread(target=self._loop, daemon=True)
         self._started = False
         self._active: dict[str, threading.Event] = {}
         self._lock = threading.Lock()
-        self._cancelled_queued: set[str] = set()
+        # Shares _lock, so waking the loop needs no second lock.
+        self._cv = threading.Condition(self._lock)
         self._active_procs: dict[str, subprocess.Popen[str]] = {}
+        self._active_pidfds: dict[str, int] = {}
         self._cancelled_procs: set[str] = set()
+        # Only the loop thread replaces this; terminate_all reads it under _lock.
+        self._sync_worker: _SyncWorker | None = None
+        # Resolved once: get_app_data_dir() mkdirs the app dir on every call.
+        self._app_dir = get_app_data_dir()
+        self._db_path = self._app_dir / "db.sqlite3"
 
     def start(self) -> None:
         if self._started:
@@ -65,14 +144,22 @@ class JobRunner:
 
     def enqueue(self, *, kind: str, fn: JobFunc) -> str:
         self.start()
+        # Back-pressure before the job row is created. The loop thread itself
+        # (follow-up jobs) must never block on its own queue. Producers racing
+        # past the wait can overshoot the cap by at most one job each.
+        if threading.current_thread() is not self._thread:
+            with self._cv:
+                self._cv.wait_for(lambda: len(self._q) < self._max_queued)
         job_id = uuid.uuid4().hex
-        db_path = get_app_data_dir() / "db.sqlite3"
-        conn = get_conn(db_path)
+        conn = get_conn(self._db_path)
         try:
             repo.create_job(conn, job_id=job_id, kind=kind)
         finally:
             conn.close()
-        self._q.put(EnqueuedJob(id=job_id, kind=kind, fn=fn))
+        with self._cv:
+            self._q.append(EnqueuedJob(id=job_id, kind=kind, fn=fn))
+            # The loop and blocked producers share this condition.
+            self._cv.notify_all()
         return job_id
 
     def cancel(self, job_id: str) -> bool:
@@ -81,12 +168,17 @@ class JobRunner:
             proc = self._active_procs.get(jid)
             if proc is not None:
                 self._cancelled_procs.add(jid)
+                pidfd = self._active_pidfds.get(jid)
+                # Group first: once the worker is reaped its group can't be looked up.
                 try:
-                    proc.terminate()
+                    terminate_process_tree(int(proc.pid))
                 except Exception:
                     pass
                 try:
-                    terminate_process_tree(int(proc.pid))
+                    if pidfd is not None:
+                        kill_pidfd(pidfd)
+                    else:
+                        proc.terminate()
                 except Exception:
                     pass
                 return True
@@ -94,8 +186,11 @@ class JobRunner:
             if ev is not None:
                 ev.set()
                 return True
-            # If job hasn't started yet, remember the cancellation.
-            self._cancelled_queued.add(jid)
+            # If job hasn't started yet, mark its queue entry.
+            for i, queued in enumerate(self._q):
+                if queued.id == jid:
+                    self._q[i] = replace(queued, cancelled=True)
+                    return True
 
         # Fallback: if runner lost track of the subprocess, try to find/kill it.
         try:
@@ -105,16 +200,23 @@ class JobRunner:
         return True
 
     def _loop(self) -> None:
-        db_path = get_app_data_dir() / "db.sqlite3"
+        db_path = self._db_path
         while True:
-            job = self._q.get()
             cancel = threading.Event()
+            # Pop and register under one lock hold, so cancel() always finds
+            # the job either on the queue or in _active.
+            with self._cv:
+                while not self._q:
+                    self._cv.wait()
+                job = self._q.popleft()
+                self._cv.notify_all()
+                if not job.cancelled:
+                    self._active[job.id] = cancel
 
-            with self._lock:
-                if job.id in self._cancelled_queued:
-                    self._cancelled_queued.discard(job.id)
-                    connx = get_conn(db_path)
-                    try:
+            if job.cancelled:
+                connx = get_conn(db_path)
+                try:
+                    with write_batch(connx):
                         repo.set_job_status(connx, job_id=job.id, status="cancelled")
                         repo.add_event(
                             connx,
@@ -122,44 +224,48 @@ class JobRunner:
                             level="info",
                             text="cancelled before start",
                         )
-                    finally:
-                        connx.close()
-                    continue
-
-                self._active[job.id] = cancel
+                finally:
+                    connx.close()
+                continue
 
             conn = get_conn(db_path)
             try:
-                repo.set_job_status(conn, job_id=job.id, status="running")
-                repo.add_event(
-                    conn, job_id=job.id, level="info", text=f"start {job.kind}"
-                )
+                with write_batch(conn):
+                    repo.set_job_status(conn, job_id=job.id, status="running")
+                    repo.add_event(
+                        conn, job_id=job.id, level="info", text=f"start {job.kind}"
+                    )
             finally:
                 conn.close()
 
             try:
                 if job.kind == "sync":
                     # Run sync in a separate process so cancel can stop immediately.
-                    cmd = _sync_worker_command(job.id)
-                    popen_kwargs: dict = {
-                        "stdout": subprocess.DEVNULL,
-                        "stderr": subprocess.DEVNULL,
-                        "text": True,
-                    }
-                    popen_kwargs.update(hidden_subprocess_kwargs())
-                    proc = subprocess.Popen(
-                        cmd,
-                        **popen_kwargs,
-                    )
+                    # The process is reused across jobs; killing it (cancel) just
+                    # means the next sync starts a fresh one.
+                    worker = self._submit_sync(job.id)
+                    proc = worker.proc
+                    pidfd = worker.pidfd
                     with self._lock:
                         self._active_procs[job.id] = proc
+                        if pidfd is not None:
+                            self._active_pidfds[job.id] = pidfd
+                    register_served_job(job_id=job.id, pid=proc.pid)
                     started_at = time.monotonic()
                     status_after: str = ""
                     while True:
                         try:
-                            rc = proc.wait(timeout=1.0)
+                            reply = worker.replies.get(timeout=1.0)
+                            if reply is None:
+                                # Worker exited mid-job (killed or crashed).
+                                rc = _wait_proc(proc, pidfd, 5.0)
+                                break
+                            verdict, _, rest = reply.partition(" ")
+                            if rest.split(" ", 1)[0] != job.id:
+                                continue
+                            rc = 0 if verdict == "OK" else 1
                             break
-                        except subprocess.TimeoutExpired:
+                        except queue.Empty:
                             # If DB already reached a terminal state but worker process
                             # is still alive, terminate it so queue processing can continue.
                             conn_status = get_conn(db_path)
@@ -200,14 +306,14 @@ class JobRunner:
                                 except Exception:
                                     pass
                                 try:
-                                    rc = proc.wait(timeout=4.0)
+                                    rc = _wait_proc(proc, pidfd, 4.0)
                                 except subprocess.TimeoutExpired:
                                     try:
                                         proc.kill()
                                     except Exception:
                                         pass
                                     try:
-                                        rc = proc.wait(timeout=2.0)
+                                        rc = _wait_proc(proc, pidfd, 2.0)
                                     except Exception:
                                         rc = -9
                                 break
@@ -302,28 +408,31 @@ class JobRunner:
                         "job_id": job.id,
                         "job_kind": job.kind,
                     },
-                    related_paths=[get_app_data_dir() / "logs" / "server.log"],
+                    related_paths=[self._app_dir / "logs" / "server.log"],
                 )
                 conn2 = get_conn(db_path)
                 try:
-                    repo.add_event(conn2, job_id=job.id, level="error", text=str(e))
-                    repo.add_event(
-                        conn2,
-                        job_id=job.id,
-                        level="error",
-                        text=f"error report saved: {report_path}",
-                    )
-                    cur = repo.get_job(conn2, job.id)
-                    if cancel.is_set() or (
-                        cur is not None and cur.status in {"cancelled"}
-                    ):
-                        # Preserve cancelled state; cancellation can look like an error
-                        # (e.g. terminated subprocess).
-                        pass
-                    else:
-                        repo.set_job_status(
-                            conn2, job_id=job.id, status="failed", message=str(e)
+                    with write_batch(conn2):
+                        repo.add_event(
+                            conn2, job_id=job.id, level="error", text=str(e)
+                        )
+                        repo.add_event(
+                            conn2,
+                            job_id=job.id,
+                            level="error",
+                            text=f"error report saved: {report_path}",
                         )
+                        cur = repo.get_job(conn2, job.id)
+                        if cancel.is_set() or (
+                            cur is not None and cur.status in {"cancelled"}
+                        ):
+                            # Preserve cancelled state; cancellation can look like an error
+                            # (e.g. terminated subprocess).
+                            pass
+                        else:
+                            repo.set_job_status(
+                                conn2, job_id=job.id, status="failed", message=str(e)
+                            )
                 finally:
                     conn2.close()
             else:
@@ -344,11 +453,38 @@ class JobRunner:
                     self._active.pop(job.id, None)
                     self._active_procs.pop(job.id, None)
                     self._cancelled_procs.discard(job.id)
+                    self._active_pidfds.pop(job.id, None)
+                unregister_served_job(job_id=job.id)
+                worker = self._sync_worker
+                if worker is not None and not worker.alive():
+                    with self._lock:
+                        self._sync_worker = None
+                    worker.close()
+
+    def _submit_sync(self, job_id: str) -> _SyncWorker:
+        worker = self._sync_worker
+        if worker is not None:
+            if worker.alive():
+                try:
+                    worker.submit(job_id)
+                    return worker
+                except OSError:
+                    pass
+            with self._lock:
+                self._sync_worker = None
+            worker.close()
+        worker = _SyncWorker()
+        with self._lock:
+            self._sync_worker = worker
+        worker.submit(job_id)
+        return worker
 
     def terminate_all(self) -> None:
         """Forcefully terminate all active subprocesses (e.g. on server shutdown)."""
         with self._lock:
             pids = [p.pid for p in self._active_procs.values()]
+            if self._sync_worker is not None:
+                pids.append(self._sync_worker.proc.pid)
             for pid in pids:
                 try:
                     terminate_process_tree(int(pid))
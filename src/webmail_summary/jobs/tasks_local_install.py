@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import os
 import threading
 import time
 from pathlib import Path
 
-from webmail_summary.index.db import get_conn
+from webmail_summary.index.db import get_conn, write_batch
 from webmail_summary.jobs import repo
 from webmail_summary.llm.hf_download import (
     DownloadCancelled,
@@ -24,6 +25,26 @@ from webmail_summary.util.app_data import get_models_dir
 from webmail_summary.util.atomic_io import atomic_write_text
 
 
+_CLEANUP_SUFFIXES = (".gguf", ".complete")
+
+
+def _path_key(path: str | os.PathLike[str]) -> str:
+    # abspath/normcase are pure string ops; Path.resolve() stats every component.
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _iter_stale_model_files(root: Path):
+    """Yield model/marker paths under root, already in _path_key form.
+
+    One os.walk pass (scandir underneath, symlinked dirs not followed); the
+    root is normalized once so each file only needs a join + normcase.
+    """
+    for dirpath, _dirs, files in os.walk(_path_key(root)):
+        for name in files:
+            if name.endswith(_CLEANUP_SUFFIXES):
+                yield os.path.normcase(os.path.join(dirpath, name))
+
+
 def _run_mlx_install(job_id: str, cancel: threading.Event, model_id_norm: str) -> None:
     """Install MLX engine + trigger model cache via a test server start."""
     from webmail_summary.llm.mlx_engine import ensure_mlx_installed, MlxNotSupported, MlxInstallError
@@ -230,35 +251,30 @@ def local_install_task(*, model_id: str):
             if cancel.is_set():
                 return
 
-            # Throttle DB writes to avoid slowing downloads.
+            # Throttle DB writes to avoid slowing downloads. The decision is
+            # made before touching the DB, so skipped callbacks (most of
+            # them: one per downloaded chunk) cost no connection at all.
             nonlocal last_pct, last_emit_ts
             now = time.monotonic()
+            if p.total and p.total > 0:
+                pct = int(p.downloaded * 100 / p.total)
+                if pct == last_pct and (now - last_emit_ts) < 1.0:
+                    return
+                last_pct = pct
+            else:
+                pct = 0
+                if (now - last_emit_ts) < 2.0:
+                    return
+            last_emit_ts = now
             connp = get_conn(db_path)
             try:
-                if p.total and p.total > 0:
-                    pct = int(p.downloaded * 100 / p.total)
-                    if pct == last_pct and (now - last_emit_ts) < 1.0:
-                        return
-                    last_pct = pct
-                    last_emit_ts = now
-                    repo.update_progress(
-                        connp,
-                        job_id=job_id,
-                        current=pct,
-                        total=100,
-                        message=f"download {m.hf_filename}",
-                    )
-                else:
-                    if (now - last_emit_ts) < 2.0:
-                        return
-                    last_emit_ts = now
-                    repo.update_progress(
-                        connp,
-                        job_id=job_id,
-                        current=0,
-                        total=100,
-                        message=f"download {m.hf_filename}",
-                    )
+                repo.update_progress(
+                    connp,
+                    job_id=job_id,
+                    current=pct,
+                    total=100,
+                    message=f"download {m.hf_filename}",
+                )
             finally:
                 connp.close()
 
@@ -281,42 +297,34 @@ def local_install_task(*, model_id: str):
 
         # Cleanup any previously downloaded models not in our supported list.
         gguf_root = get_models_dir() / "gguf"
-        keep_files: set[Path] = set()
-        keep_markers: set[Path] = set()
+        keep: set[str] = set()
         for choice in LOCAL_MODELS:
-            mp = get_local_model_path(model_id=choice.id)
-            keep_files.add(mp.resolve())
-            keep_markers.add(
-                get_local_model_complete_marker(model_id=choice.id).resolve()
+            keep.add(_path_key(get_local_model_path(model_id=choice.id)))
+            keep.add(
+                _path_key(get_local_model_complete_marker(model_id=choice.id))
             )
 
-        for p in gguf_root.rglob("*.gguf"):
-            try:
-                if p.resolve() not in keep_files:
-                    p.unlink(missing_ok=True)
-            except Exception:
-                pass
-        for p in gguf_root.rglob("*.complete"):
-            try:
-                if p.resolve() not in keep_markers:
-                    p.unlink(missing_ok=True)
-            except Exception:
-                pass
+        for path in _iter_stale_model_files(gguf_root):
+            if path not in keep:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
 
         conn3 = get_conn(db_path)
         try:
-            repo.add_event(
-                conn3,
-                job_id=job_id,
-                level="info",
-                text=f"engine: {inst.llama_cli_path}",
-            )
-            repo.add_event(
-                conn3, job_id=job_id, level="info", text=f"model: {out_path}"
-            )
-            repo.update_progress(
-                conn3, job_id=job_id, current=100, total=100, message="installed"
-            )
+            with write_batch(conn3):
+                repo.add_events(
+                    conn3,
+                    job_id=job_id,
+                    events=[
+                        ("info", f"engine: {inst.llama_cli_path}"),
+                        ("info", f"model: {out_path}"),
+                    ],
+                )
+                repo.update_progress(
+                    conn3, job_id=job_id, current=100, total=100, message="installed"
+                )
         finally:
             conn3.close()
 
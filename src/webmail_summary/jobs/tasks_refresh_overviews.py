@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import itertools
 import re
+import sqlite3
 import threading
+from dataclasses import dataclass
 from datetime import datetime
 from collections.abc import Callable
 from pathlib import Path
-from webmail_summary.index.db import get_conn
+from webmail_summary.index.db import get_conn, write_batch
 from webmail_summary.index.mail_repo import set_daily_overview
 from webmail_summary.index.settings import load_settings
 from webmail_summary.jobs import repo
@@ -14,25 +17,85 @@ from webmail_summary.llm.long_summarize import synthesize_daily_overview
 from webmail_summary.util.app_data import get_app_data_dir
 
 
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _normalize_days(raw_days: list[str] | None) -> list[str]:
+    """Valid YYYY-MM-DD keys from raw_days, deduplicated in input order."""
+    if not raw_days:
+        return []
+    days = (str(d or "").strip() for d in raw_days)
+    return list(dict.fromkeys(d for d in days if _DATE_RE.fullmatch(d)))
+
+
+def _overview_is_current(ov_ts: str | None, max_msg_ts: str | None) -> bool:
+    """Whether the overview timestamp is at or after the newest summary.
+
+    Both columns hold ``isoformat()`` strings, which order as text when they
+    share a UTC offset suffix, so most days need no datetime parsing.
+    """
+    a = str(ov_ts or "").strip()
+    b = str(max_msg_ts or "").strip()
+    if not a or not b:
+        return False
+    if a[-6:] == b[-6:]:
+        return a >= b
+    try:
+        return datetime.fromisoformat(a) >= datetime.fromisoformat(b)
+    except (TypeError, ValueError):
+        return False
+
+
+@dataclass(frozen=True)
+class _DayInputs:
+    """Per-day overview inputs, loaded for a whole run in three queries."""
+
+    max_summarized_at: dict[str, str]
+    overview_updated_at: dict[str, str]
+    summaries: dict[str, list[str]]
+
+
+def _load_day_inputs(conn: sqlite3.Connection, days: list[str]) -> _DayInputs:
+    if not days:
+        return _DayInputs({}, {}, {})
+    qmarks = ",".join(["?"] * len(days))
+    params = tuple(days)
+    max_ts = {
+        str(r[0]): str(r[1])
+        for r in conn.execute(
+            "SELECT substr(internal_date, 1, 10) AS day, MAX(summarized_at) "
+            f"FROM messages WHERE substr(internal_date, 1, 10) IN ({qmarks}) "
+            "AND summarized_at IS NOT NULL GROUP BY day",
+            params,
+        )
+        if r[1]
+    }
+    ov_ts = {
+        str(r[0]): str(r[1])
+        for r in conn.execute(
+            f"SELECT day, updated_at FROM daily_overviews WHERE day IN ({qmarks})",
+            params,
+        )
+        if r[1]
+    }
+    rows = conn.execute(
+        "SELECT substr(internal_date, 1, 10) AS day, summary FROM messages "
+        f"WHERE substr(internal_date, 1, 10) IN ({qmarks}) "
+        "AND summary IS NOT NULL AND trim(summary) <> '' "
+        "ORDER BY day, internal_date ASC",
+        params,
+    )
+    sums = {
+        str(day): [str(r[1]) for r in group]
+        for day, group in itertools.groupby(rows, key=lambda r: r[0])
+    }
+    return _DayInputs(max_ts, ov_ts, sums)
+
+
 def refresh_overviews_task(
     date_keys: list[str] | None = None,
     force_refresh: bool = False,
 ) -> Callable[[str, threading.Event], None]:
-    def _normalize_days(raw_days: list[str] | None) -> list[str]:
-        if not raw_days:
-            return []
-        out: list[str] = []
-        seen: set[str] = set()
-        for d in raw_days:
-            day = str(d or "").strip()
-            if not re.fullmatch(r"\d{4}-\d{2}-\d{2}", day):
-                continue
-            if day in seen:
-                continue
-            seen.add(day)
-            out.append(day)
-        return out
-
     def run(job_id: str, cancel: threading.Event) -> None:
         db_path = get_app_data_dir() / "db.sqlite3"
         conn = get_conn(db_path)
@@ -64,18 +127,15 @@ def refresh_overviews_task(
                 )
                 return
 
+            # Timestamps and summaries for every target day up front, instead
+            # of two queries per day.
+            inputs = _load_day_inputs(conn, days)
+
             for i, d in enumerate(days, start=1):
                 if cancel.is_set():
                     break
 
-                repo.update_progress(
-                    conn,
-                    job_id=job_id,
-                    current=i - 0.5,
-                    total=total,
-                    message=f"[{d}] 날짜별요약 생성 중 ({i}/{total})",
-                )
-
+                # One progress write per day, once the day is settled.
                 refreshed = refresh_overviews_for_dates(
                     db_path=db_path,
                     provider=provider,
@@ -83,12 +143,14 @@ def refresh_overviews_task(
                     date_keys=[d],
                     force_refresh=(force_refresh or bool(normalized_days)),
                     job_id=job_id,
+                    inputs=inputs,
+                    cancel=cancel,
                 )
                 if not refreshed:
                     repo.update_progress(
                         conn,
                         job_id=job_id,
-                        current=float(i),
+                        current=i,
                         total=total,
                         message=f"[{d}] 최신 상태 (건너뜀)",
                     )
@@ -97,7 +159,7 @@ def refresh_overviews_task(
                 repo.update_progress(
                     conn,
                     job_id=job_id,
-                    current=float(i),
+                    current=i,
                     total=total,
                     message=f"[{d}] 날짜별요약 생성 완료",
                 )
@@ -116,123 +178,84 @@ def refresh_overviews_for_dates(
     date_keys: list[str],
     force_refresh: bool = True,
     job_id: str | None = None,
+    inputs: _DayInputs | None = None,
+    cancel: threading.Event | None = None,
 ) -> list[str]:
-    def _normalize_days(raw_days: list[str] | None) -> list[str]:
-        if not raw_days:
-            return []
-        out: list[str] = []
-        seen: set[str] = set()
-        for d in raw_days:
-            day = str(d or "").strip()
-            if not re.fullmatch(r"\d{4}-\d{2}-\d{2}", day):
-                continue
-            if day in seen:
-                continue
-            seen.add(day)
-            out.append(day)
-        return out
-
-    def _parse_iso(ts: str | None) -> datetime | None:
-        if not ts:
-            return None
-        s = str(ts).strip()
-        if not s:
-            return None
-        try:
-            return datetime.fromisoformat(s)
-        except Exception:
-            return None
-
     normalized_days = _normalize_days(date_keys)
     if not normalized_days:
         return []
 
     refreshed: list[str] = []
+    user_profile = {
+        "roles": settings.user_roles,
+        "interests": settings.user_interests,
+    }
+    # One connection for the input load, events and overview writes; each
+    # day's overview is committed on its own. Events are held in memory and
+    # written together: before each (slow) LLM call, with each overview
+    # write, and at the end, so a run of skipped days costs one commit.
+    events: list[tuple[str, str]] = []
+
+    def _event(level: str, text: str) -> None:
+        if job_id:
+            events.append((level, text))
+
+    def _flush_events() -> None:
+        if events and job_id:
+            repo.add_events(conn, job_id=job_id, events=events)
+        events.clear()
+
     conn = get_conn(db_path)
     try:
+        if inputs is None:
+            inputs = _load_day_inputs(conn, normalized_days)
         for d in normalized_days:
-            day_conn = get_conn(db_path)
             try:
-                ts_row = day_conn.execute(
-                    "SELECT "
-                    "(SELECT MAX(summarized_at) FROM messages WHERE internal_date LIKE ? AND summarized_at IS NOT NULL), "
-                    "(SELECT updated_at FROM daily_overviews WHERE day = ?)",
-                    (f"{d}%", d),
-                ).fetchone()
-                max_msg_ts = _parse_iso(ts_row[0] if ts_row else None)
-                ov_ts = _parse_iso(ts_row[1] if ts_row else None)
-                if (
-                    not force_refresh
-                    and max_msg_ts is not None
-                    and ov_ts is not None
-                    and ov_ts >= max_msg_ts
+                if not force_refresh and _overview_is_current(
+                    inputs.overview_updated_at.get(d),
+                    inputs.max_summarized_at.get(d),
                 ):
-                    if job_id:
-                        repo.add_event(
-                            conn,
-                            job_id=job_id,
-                            level="info",
-                            text=f"[{d}] 최신 상태라 건너뜀",
-                        )
+                    _event("info", f"[{d}] 최신 상태라 건너뜀")
                     continue
 
-                rows = day_conn.execute(
-                    "SELECT summary FROM messages "
-                    "WHERE internal_date LIKE ? AND summary IS NOT NULL AND trim(summary) <> '' "
-                    "ORDER BY internal_date ASC",
-                    (f"{d}%",),
-                ).fetchall()
                 # Exclude failed/placeholder summaries from the overview
                 # input — otherwise the daily digest inherits those strings.
                 from webmail_summary.jobs.tasks_resummarize import _needs_resummarize
 
-                all_sums = [
-                    str(r[0] or "")
-                    for r in rows
-                    if r[0] and not _needs_resummarize(str(r[0] or ""))
-                ]
-
-                if not all_sums:
-                    if job_id:
-                        repo.add_event(
-                            conn,
-                            job_id=job_id,
-                            level="info",
-                            text=f"[{d}] 요약 데이터가 없어 건너뜀",
-                        )
+                # Filtered lazily: the synthesizer stops reading once its
+                # item/char budget is full, so later rows are never checked.
+                usable = (
+                    t for t in inputs.summaries.get(d, []) if not _needs_resummarize(t)
+                )
+                first = next(usable, None)
+                if first is None:
+                    _event("info", f"[{d}] 요약 데이터가 없어 건너뜀")
                     continue
 
-                user_profile = {
-                    "roles": settings.user_roles,
-                    "interests": settings.user_interests,
-                }
+                # Skip the LLM call entirely once the job was cancelled.
+                if cancel is not None and cancel.wait(timeout=0):
+                    break
+
+                _flush_events()
                 overview = synthesize_daily_overview(
                     provider,
                     day=d,
-                    summaries=all_sums,
+                    summaries=itertools.chain((first,), usable),
                     user_profile=user_profile,
+                    stop=cancel,
                 )
                 if overview:
-                    set_daily_overview(day_conn, day=d, overview=overview)
-                    day_conn.commit()
+                    with write_batch(conn):
+                        set_daily_overview(conn, day=d, overview=overview)
+                        _flush_events()
                     refreshed.append(d)
-                elif job_id:
-                    repo.add_event(
-                        conn,
-                        job_id=job_id,
-                        level="warn",
-                        text=f"[{d}] 날짜별요약 생성 결과가 비어 있어 건너뜀",
-                    )
+                else:
+                    _event("warn", f"[{d}] 날짜별요약 생성 결과가 비어 있어 건너뜀")
             except Exception as e:
-                if job_id:
-                    repo.add_event(
-                        conn,
-                        job_id=job_id,
-                        level="error",
-                        text=f"[{d}] 개요 생성 실패: {e}",
-                    )
-            finally:
-                day_conn.close()
+                # Don't let a failed day's write ride along with the next commit.
+                conn.rollback()
+                _event("error", f"[{d}] 개요 생성 실패: {e}")
+        _flush_events()
     finally:
         conn.close()
 
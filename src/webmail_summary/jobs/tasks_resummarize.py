@@ -2,8 +2,14 @@ from __future__ import annotations
 
 import datetime as dt
 import json
+import os
+import re
+import sqlite3
 import threading
 import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
 from pathlib import Path
 
 from webmail_summary.export.obsidian.exporter import (
@@ -14,8 +20,9 @@ from webmail_summary.export.obsidian.exporter import (
     export_topic_note,
 )
 from webmail_summary.export.obsidian.naming import safe_topic_name
-from webmail_summary.index.db import get_conn
+from webmail_summary.index.db import get_conn, write_batch
 from webmail_summary.index.mail_repo import (
+    ResummarizeRow,
     get_message_ids_by_topic,
     list_messages_for_resummarize_by_date,
     list_messages_for_resummarize_by_dates,
@@ -24,18 +31,31 @@ from webmail_summary.index.mail_repo import (
 )
 from webmail_summary.index.settings import load_settings
 from webmail_summary.jobs import repo
-from webmail_summary.jobs.tasks_refresh_overviews import refresh_overviews_for_dates
+from webmail_summary.jobs.tasks_refresh_overviews import (
+    _DayInputs,
+    refresh_overviews_for_dates,
+)
 from webmail_summary.llm.base import LlmResult
 from webmail_summary.llm.long_summarize import summarize_email_long_aware
 from webmail_summary.llm.provider import LlmNotReady, get_llm_provider
 from webmail_summary.util.app_data import default_obsidian_root, get_app_data_dir
 from webmail_summary.util.text_sanitize import (
-    html_to_visible_text,
+    html_file_to_visible_text,
     prepare_body_for_llm,
     sanitize_text_for_llm,
 )
 
 
+# One encoder for every event payload; json.dumps(..., ensure_ascii=True)
+# builds a fresh JSONEncoder on each call with non-default options.
+_dumps = json.JSONEncoder(ensure_ascii=True, separators=(",", ":")).encode
+
+_STAGE_READ = _dumps({"type": "stage", "stage": "read"})
+_STAGE_LLM = _dumps({"type": "stage", "stage": "llm"})
+_STAGE_SAVE = _dumps({"type": "stage", "stage": "save"})
+_STAGE_EXPORT = _dumps({"type": "stage", "stage": "export"})
+
+
 def _parse_date_key(date_key: str) -> dt.date:
     dk = (date_key or "").strip()
     try:
@@ -60,30 +80,43 @@ def _normalize_date_keys(
     return out
 
 
+def _spaced(word: str) -> str:
+    # Matches word with any punctuation/whitespace between its characters.
+    return r"[\W_]*".join(re.escape(ch) for ch in word)
+
+
+# Placeholder/error text a stored summary must not be, as one case-insensitive
+# pattern so a row is checked in a single scan without lower() copies.
+# mail_repo._NEEDS_RESUMMARIZE_SQL mirrors this list as a LIKE prefilter.
+_BAD_SUMMARY_RE = re.compile(
+    "|".join(
+        [
+            _spaced("nosummary"),
+            _spaced("\uc694\uc57d\ud56d\ubaa9\uc774\ubd80\uc871\ud569\ub2c8\ub2e4"),
+            "llm timeout",
+            "llm unavailable",
+            "llm error",
+            "failed to format input",
+            "invalid codepoint",
+            "loading model",
+            "available commands",
+        ]
+    ),
+    re.IGNORECASE,
+)
+# Raw JSON / fenced output instead of a bullet summary.
+_JSONISH_PREFIXES = ("{", "```")
+# Floor between sub-item progress writes from the LLM callback.
+_PROGRESS_MIN_INTERVAL_S = 0.25
+
+
 def _needs_resummarize(summary: str) -> bool:
-    s = (summary or "").strip().lower()
+    s = (summary or "").strip()
     if not s:
         return True
-    compact = "".join(ch for ch in s if ch.isalnum() or ("\uac00" <= ch <= "\ud7a3"))
-    if "nosummary" in compact or "?붿빟?놁쓬" in compact:
-        return True
-    if "?곸꽭?붿빟??ぉ?대?議깊빀?덈떎" in compact:
-        return True
-    if "\uc694\uc57d\ud56d\ubaa9\uc774\ubd80\uc871\ud569\ub2c8\ub2e4" in compact:
+    if s.startswith(_JSONISH_PREFIXES):
         return True
-    if "llm timeout" in s or "(llm timeout)" in s:
-        return True
-    if "llm unavailable" in s:
-        return True
-    if "llm error" in s or "(llm error" in s:
-        return True
-    if "failed to format input" in s or "invalid codepoint" in s:
-        return True
-    if "loading model" in s or "available commands" in s:
-        return True
-    if s.startswith("{") or s.startswith("```json") or s.startswith("```"):
-        return True
-    return False
+    return _BAD_SUMMARY_RE.search(s) is not None
 
 
 def _cloud_base_delay_seconds(cloud_provider: str, model: str) -> float:
@@ -99,6 +132,169 @@ def _cloud_base_delay_seconds(cloud_provider: str, model: str) -> float:
     return 0.4
 
 
+def _cloud_chunk_size(cloud_provider: str, model: str) -> int:
+    """Concurrent cloud LLM calls; same per-provider limits as the sync task."""
+    provider = str(cloud_provider or "").strip().lower()
+    model_name = str(model or "").strip().lower()
+
+    if provider in {"google", "upstage"}:
+        return 2
+    if "flash" in model_name or ":free" in model_name or "/free" in model_name:
+        return 2
+    if provider in {"openai", "anthropic"}:
+        return 5
+    if provider == "openrouter":
+        return 3
+    return 3
+
+
+class _TokenBucket:
+    """Start-rate limiter: `capacity` calls at once, then one per 1/rate s."""
+
+    def __init__(self, rate_per_sec: float, capacity: int) -> None:
+        self._rate = max(1e-6, float(rate_per_sec))
+        self._capacity = float(max(1, capacity))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self._capacity, self._tokens + (now - self._updated) * self._rate
+            )
+            self._updated = now
+            wait_s = (1.0 - self._tokens) / self._rate
+            self._tokens -= 1.0
+        # A negative balance reserves the next slot, so waiters queue up in
+        # arrival order without holding the lock while they sleep.
+        if wait_s > 0:
+            time.sleep(wait_s)
+
+
+class _AheadItemReporter:
+    """on_detail/on_progress for one item summarized ahead on the LLM pool.
+
+    Until the run reaches the item, its detail events are held back and its
+    progress is only remembered, so the job log and progress bar stay in
+    item order; go_live() flushes the backlog and writes from then on, and
+    finish() silences a call that outlived its item (e.g. after a timeout).
+    """
+
+    def __init__(
+        self,
+        *,
+        db_path: Path,
+        job_id: str,
+        index: int,
+        total: int,
+        check_cancel: Callable[[], None],
+    ) -> None:
+        self._db_path = db_path
+        self._job_id = job_id
+        self._index = index
+        self._total = total
+        self._check_cancel = check_cancel
+        self._lock = threading.Lock()
+        self._pending: list[str] | None = []
+        self._message = ""
+        self._last_write = 0.0
+        self._finished = False
+        self.fraction = 0.0
+
+    def go_live(self, conn: sqlite3.Connection, *, message: str) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self._message = message
+        if pending:
+            repo.add_events(
+                conn, job_id=self._job_id, events=[("detail", t) for t in pending]
+            )
+
+    def finish(self) -> None:
+        with self._lock:
+            self._finished = True
+
+    def on_detail(self, d: dict) -> None:
+        self._check_cancel()
+        text = _dumps(d)
+        with self._lock:
+            if self._finished:
+                return
+            if self._pending is not None:
+                self._pending.append(text)
+                return
+        conn = get_conn(self._db_path)
+        try:
+            repo.add_event(conn, job_id=self._job_id, level="detail", text=text)
+        finally:
+            conn.close()
+
+    def on_progress(self, fraction: float) -> None:
+        self._check_cancel()
+        try:
+            frac = max(0.0, min(1.0, float(fraction)))
+        except Exception:
+            return
+        with self._lock:
+            self.fraction = max(self.fraction, frac)
+            if self._finished or self._pending is not None:
+                return
+            message = self._message
+            now = time.monotonic()
+            if frac < 1.0 and now - self._last_write < _PROGRESS_MIN_INTERVAL_S:
+                return
+            self._last_write = now
+        conn = get_conn(self._db_path)
+        try:
+            repo.update_progress(
+                conn,
+                job_id=self._job_id,
+                current=self._index - 1 + frac,
+                total=self._total,
+                message=message,
+            )
+        finally:
+            conn.close()
+
+
+def _llm_timeout_seconds(provider) -> float:
+    tier = getattr(provider, "tier", "standard")
+    if tier == "cloud":
+        return 420.0
+    if tier == "fast":
+        return 240.0
+    return 360.0
+
+
+def _read_utf8(path: str) -> str:
+    # One readall sized from fstat, decoded in one go; read_text
+    # goes through a TextIOWrapper and its newline translation, which
+    # prepare_body_for_llm redoes anyway.
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+def _load_body_for_llm(r: ResummarizeRow) -> str:
+    # Plain os.path on the stored strings: one stat per candidate file and
+    # no Path objects for rows that only need their body read.
+    # Current archives store body.txt for HTML-only mail as well; older
+    # ones kept the original HTML as body.html. rendered.html is never used:
+    # sanitizing drops the hidden-content markers html_to_visible_text needs.
+    body_text_path = r.body_text_path
+    body_html_path = r.body_html_path
+
+    if body_text_path and os.path.isfile(body_text_path):
+        body_text = _read_utf8(body_text_path)
+    elif body_html_path and os.path.isfile(body_html_path):
+        body_text = html_file_to_visible_text(body_html_path)
+    else:
+        body_text = ""
+
+    return prepare_body_for_llm(body_text)
+
+
 def resummarize_day_task(
     *,
     date_key: str = "",
@@ -133,626 +329,711 @@ def resummarize_day_task(
             total: int,
             *,
             llm: bool = False,
-            elapsed: str = "",
         ) -> str:
             if is_multi_day:
                 stage = "선택 날짜 LLM 호출 중" if llm else "선택 날짜 다시 요약 중"
-                base = f"{stage} {display_date} / {display_sub} ({index}/{total})"
-            else:
-                stage = "LLM 호출 중" if llm else "다시 요약 중"
-                base = f"[{display_date}] {stage} {display_sub} ({index}/{total})"
-            if elapsed:
-                return f"{base} {elapsed}"
-            return base
-
-        conn = get_conn(db_path)
+                return f"{stage} {display_date} / {display_sub} ({index}/{total})"
+            stage = "LLM 호출 중" if llm else "다시 요약 중"
+            return f"[{display_date}] {stage} {display_sub} ({index}/{total})"
+
+        # One connection for every write made on this thread during the run.
+        # The LLM worker and heartbeat threads use get_conn(), which already
+        # keeps one parked connection per thread.
+        conn_main = get_conn(db_path)
+        llm_pool: ThreadPoolExecutor | None = None
+        # Note files are written in submission order by one worker.
+        export_pool = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="resummarize-export"
+        )
+        exports: list[tuple[str, list[str], list[str], Future]] = []
         try:
-            settings = load_settings(conn)
-        finally:
-            conn.close()
+            settings = load_settings(conn_main)
 
-        try:
-            provider = get_llm_provider(settings)
-        except LlmNotReady as e:
-            connr = get_conn(db_path)
             try:
-                repo.add_event(connr, job_id=job_id, level="error", text=str(e))
+                provider = get_llm_provider(settings)
+            except LlmNotReady as e:
+                repo.add_event(conn_main, job_id=job_id, level="error", text=str(e))
                 repo.set_job_status(
-                    connr, job_id=job_id, status="failed", message=str(e)
+                    conn_main, job_id=job_id, status="failed", message=str(e)
                 )
-            finally:
-                connr.close()
-            raise
+                raise
 
-        connpi = get_conn(db_path)
-        try:
             repo.add_event(
-                connpi,
+                conn_main,
                 job_id=job_id,
                 level="info",
                 text=f"llm_provider={provider.__class__.__name__}",
             )
-        finally:
-            connpi.close()
 
-        vault_root = (
-            Path(settings.obsidian_root)
-            if settings.obsidian_root
-            else default_obsidian_root()
-        )
-        vault_root.mkdir(parents=True, exist_ok=True)
+            vault_root = (
+                Path(settings.obsidian_root)
+                if settings.obsidian_root
+                else default_obsidian_root()
+            )
+            vault_root.mkdir(parents=True, exist_ok=True)
 
-        conn0 = get_conn(db_path)
-        try:
             if message_ids:
                 rows = list_messages_for_resummarize_by_ids(
-                    conn0, message_ids=list(message_ids)
+                    conn_main, message_ids=list(message_ids)
                 )
             elif len(day_keys) == 1:
                 rows = list_messages_for_resummarize_by_date(
-                    conn0, date_prefix=day_keys[0]
+                    conn_main,
+                    date_prefix=day_keys[0],
+                    needs_resummarize_only=only_failed,
                 )
             else:
                 rows = list_messages_for_resummarize_by_dates(
-                    conn0, date_keys=list(day_keys)
+                    conn_main,
+                    date_keys=list(day_keys),
+                    needs_resummarize_only=only_failed,
                 )
-        finally:
-            conn0.close()
-
-        if message_ids:
-            targets = rows
-        elif only_failed:
-            targets = [r for r in rows if _needs_resummarize(str(r[8] or ""))]
-        else:
-            targets = rows
-
-        prepare_message = _scope_message(
-            single=f"[{single_day_key}] 날짜별 다시 요약 준비 중",
-            multi=(
-                f"선택 날짜 {len(day_keys)}일 "
-                + ("오류만 다시 요약 준비 중" if only_failed else "전체 다시 요약 준비 중")
-            ),
-        )
-        empty_message = _scope_message(
-            single=f"[{single_day_key}] 다시 요약 대상 없음",
-            multi=(
-                "선택 날짜에 오류 요약 대상이 없습니다"
-                if only_failed
-                else "선택 날짜에 다시 요약할 대상이 없습니다"
-            ),
-        )
-        cancelled_message = _scope_message(
-            single=f"[{single_day_key}] 다시 요약 취소됨",
-            multi="선택 날짜 다시 요약 취소됨",
-        )
-        completed_message = _scope_message(
-            single=f"[{single_day_key}] 다시 요약 완료",
-            multi="선택 날짜 다시 요약 완료",
-        )
 
-        connp = get_conn(db_path)
-        try:
+            if message_ids:
+                targets = rows
+            elif only_failed:
+                # SQL already dropped healthy rows; this exact check only sees
+                # the candidates its LIKE prefilter let through.
+                targets = [r for r in rows if _needs_resummarize(r.summary)]
+            else:
+                targets = rows
+
+            prepare_message = _scope_message(
+                single=f"[{single_day_key}] 날짜별 다시 요약 준비 중",
+                multi=(
+                    f"선택 날짜 {len(day_keys)}일 "
+                    + ("오류만 다시 요약 준비 중" if only_failed else "전체 다시 요약 준비 중")
+                ),
+            )
+            empty_message = _scope_message(
+                single=f"[{single_day_key}] 다시 요약 대상 없음",
+                multi=(
+                    "선택 날짜에 오류 요약 대상이 없습니다"
+                    if only_failed
+                    else "선택 날짜에 다시 요약할 대상이 없습니다"
+                ),
+            )
+            cancelled_message = _scope_message(
+                single=f"[{single_day_key}] 다시 요약 취소됨",
+                multi="선택 날짜 다시 요약 취소됨",
+            )
+            completed_message = _scope_message(
+                single=f"[{single_day_key}] 다시 요약 완료",
+                multi="선택 날짜 다시 요약 완료",
+            )
+            n_targets = len(targets)
+            progress_total = max(n_targets, 1)
+
             repo.update_progress(
-                connp,
+                conn_main,
                 job_id=job_id,
                 current=0,
-                total=max(len(targets), 1),
+                total=progress_total,
                 message=prepare_message,
             )
             repo.add_event(
-                connp,
+                conn_main,
                 job_id=job_id,
                 level="info",
-                text=f"resummarize days={','.join(day_keys)} targets={len(targets)}",
+                text=f"resummarize days={','.join(day_keys)} targets={n_targets}",
             )
-        finally:
-            connp.close()
 
-        processed_notes_by_day: dict[str, list[Path]] = {}
-        touched_day_keys: set[str] = set()
-        all_topics: dict[str, list[Path]] = {}
-        processed_count = 0
+            processed_notes_by_day: dict[str, list[Path]] = {}
+            touched_day_keys: set[str] = set()
+            # A full (not only_failed) run over whole days already holds every
+            # message of those days, so the overview input is kept up to date
+            # here instead of being read back from the database afterwards.
+            day_summaries: dict[str, dict[int, str]] | None = None
+            if not message_ids and not only_failed:
+                day_summaries = {}
+                for row in rows:
+                    day_summaries.setdefault(row.internal_date[:10], {})[row.id] = (
+                        row.summary
+                    )
+            all_topics: dict[str, list[Path]] = {}
+            processed_count = 0
 
-        if not targets:
-            connz = get_conn(db_path)
-            try:
+            if not targets:
                 repo.update_progress(
-                    connz,
+                    conn_main,
                     job_id=job_id,
                     current=1,
                     total=1,
                     message=empty_message,
                 )
-                repo.add_event(connz, job_id=job_id, level="info", text="no targets")
-            finally:
-                connz.close()
-            return
-
-        for i, r in enumerate(targets, start=1):
-            if cancel.is_set():
-                break
-
-            msg_id = int(r[0])
-            account_id = str(r[1] or "")
-            uidvalidity = int(r[3] or 0)
-            uid = int(r[4] or 0)
-            subject = str(r[5] or "(no subject)")
-            from_addr = str(r[6] or settings.sender_filter or "")
-            internal_date = str(r[7] or "")
-            raw_eml_path = str(r[9] or "")
-            body_text_path = str(r[10] or "")
-            body_html_path = str(r[11] or "")
-
-            old_topics: list[str] = []
-            try:
-                old_topics = json.loads(str(r[12] or "[]")) or []
-            except Exception:
-                old_topics = []
-
-            display_date = internal_date[:10] if len(internal_date) >= 10 else single_day_key
-            display_sub = (subject[:30] + "...") if len(subject) > 30 else subject
-
-            connx = get_conn(db_path)
-            try:
-                repo.update_progress(
-                    connx,
-                    job_id=job_id,
-                    current=i - 0.99,
-                    total=max(len(targets), 1),
-                    message=_item_message(
-                        display_date,
-                        display_sub,
-                        i,
-                        len(targets),
-                    ),
-                )
-                repo.add_event(
-                    connx,
-                    job_id=job_id,
-                    level="info",
-                    text=f"item {i}/{len(targets)}: {subject}",
-                )
-                repo.add_event(
-                    connx,
-                    job_id=job_id,
-                    level="detail",
-                    text=json.dumps(
-                        {
-                            "type": "email",
-                            "message_id": msg_id,
-                            "index": i,
-                            "total": len(targets),
-                            "subject": subject,
-                        },
-                        ensure_ascii=True,
-                    ),
-                )
-                repo.add_event(
-                    connx,
-                    job_id=job_id,
-                    level="detail",
-                    text=json.dumps(
-                        {"type": "stage", "stage": "read"}, ensure_ascii=True
-                    ),
-                )
-            finally:
-                connx.close()
-
-            body_text = ""
-            p_txt = Path(body_text_path) if body_text_path else None
-            p_html = Path(body_html_path) if body_html_path else None
-            if p_txt and p_txt.exists():
-                body_text = p_txt.read_text(encoding="utf-8", errors="replace")
-            elif p_html and p_html.exists():
-                raw_html = p_html.read_text(encoding="utf-8", errors="replace")
-                body_text = html_to_visible_text(raw_html)
+                repo.add_event(conn_main, job_id=job_id, level="info", text="no targets")
+                return
 
-            body_text = prepare_body_for_llm(body_text)
-
-            connw = get_conn(db_path)
-            try:
-                repo.update_progress(
-                    connw,
-                    job_id=job_id,
-                    current=i - 0.95,
-                    total=max(len(targets), 1),
-                    message=_item_message(
-                        display_date,
-                        display_sub,
-                        i,
-                        len(targets),
-                        llm=True,
-                    ),
+            user_profile = {
+                "roles": settings.user_roles,
+                "interests": settings.user_interests,
+            }
+            llm_timeout_s = _llm_timeout_seconds(provider)
+
+            # Cloud calls are network-bound, so the next few items are
+            # summarized ahead on a small pool while this thread records and
+            # exports results in order. The local llama.cpp server handles one
+            # request at a time and stays on the serial path below.
+            prefetched: dict[int, tuple[Future, _AheadItemReporter]] = {}
+            next_prefetch = 1
+            llm_workers = 1
+            if provider.__class__.__name__ == "CloudProvider":
+                llm_workers = _cloud_chunk_size(
+                    settings.cloud_provider, settings.openrouter_model
                 )
-                repo.add_event(
-                    connw,
-                    job_id=job_id,
-                    level="detail",
-                    text=json.dumps(
-                        {"type": "stage", "stage": "llm"}, ensure_ascii=True
-                    ),
+                llm_pool = ThreadPoolExecutor(
+                    max_workers=llm_workers, thread_name_prefix="resummarize-llm"
                 )
-            finally:
-                connw.close()
-
-            frac_lock = threading.Lock()
-            last_fraction = 0.0
-
-            def _set_fraction(v: float) -> None:
-                nonlocal last_fraction
-                with frac_lock:
-                    try:
-                        vv = float(v)
-                    except Exception:
-                        return
-                    vv = max(0.0, min(1.0, vv))
-                    if vv > last_fraction:
-                        last_fraction = vv
+            # The provider's base delay becomes a sustained start rate; a
+            # burst of one call per worker goes out without waiting.
+            cloud_delay_s = _cloud_base_delay_seconds(
+                settings.cloud_provider, settings.openrouter_model
+            )
+            call_bucket = _TokenBucket(
+                1.0 / max(cloud_delay_s, 0.05), capacity=llm_workers
+            )
 
-            def emit_detail(d: dict) -> None:
+            def _check_cancel() -> None:
                 if cancel.is_set():
                     raise _ResummarizeCancelled()
-                conn_d = get_conn(db_path)
-                try:
-                    repo.add_event(
-                        conn_d,
-                        job_id=job_id,
-                        level="detail",
-                        text=json.dumps(d, ensure_ascii=True),
-                    )
-                finally:
-                    conn_d.close()
 
-            def update_sub_progress(fraction: float) -> None:
-                if cancel.is_set():
-                    raise _ResummarizeCancelled()
-                _set_fraction(fraction)
-                conn_p = get_conn(db_path)
-                try:
-                    repo.update_progress(
-                        conn_p,
+            def _summarize_ahead(
+                row: ResummarizeRow, reporter: _AheadItemReporter
+            ) -> tuple[LlmResult, float]:
+                call_bucket.acquire()
+                _check_cancel()
+                body = _load_body_for_llm(row)
+                t0 = time.monotonic()
+                res = summarize_email_long_aware(
+                    provider,
+                    subject=sanitize_text_for_llm(row.subject or "(no subject)"),
+                    body=sanitize_text_for_llm(body),
+                    on_detail=reporter.on_detail,
+                    on_progress=reporter.on_progress,
+                    user_profile=user_profile,
+                )
+                return res, time.monotonic() - t0
+
+            def _await_prefetched(
+                pool: ThreadPoolExecutor,
+                index: int,
+                *,
+                item_message: str,
+                item_llm_message: str,
+            ) -> tuple[LlmResult, float]:
+                nonlocal next_prefetch
+                while next_prefetch <= min(n_targets, index + llm_workers - 1):
+                    reporter = _AheadItemReporter(
+                        db_path=db_path,
                         job_id=job_id,
-                        current=i - 1 + fraction,
-                        total=max(len(targets), 1),
-                        message=_item_message(
-                            display_date,
-                            display_sub,
-                            i,
-                            len(targets),
-                        ),
+                        index=next_prefetch,
+                        total=progress_total,
+                        check_cancel=_check_cancel,
                     )
-                finally:
-                    conn_p.close()
-
-            t0 = time.monotonic()
-            if provider.__class__.__name__ == "CloudProvider":
-                time.sleep(
-                    _cloud_base_delay_seconds(
-                        settings.cloud_provider,
-                        settings.openrouter_model,
+                    prefetched[next_prefetch] = (
+                        pool.submit(
+                            _summarize_ahead, targets[next_prefetch - 1], reporter
+                        ),
+                        reporter,
                     )
-                )
-
-            user_profile = {
-                "roles": settings.user_roles,
-                "interests": settings.user_interests,
-            }
-            llm_done = threading.Event()
-            llm_result_box: dict[str, LlmResult] = {}
-            llm_err_box: dict[str, Exception] = {}
-
-            def _run_llm_call() -> None:
+                    next_prefetch += 1
+                fut, reporter = prefetched.pop(index)
+                reporter.go_live(conn_main, message=item_message)
                 try:
-                    llm_result_box["res"] = summarize_email_long_aware(
-                        provider,
-                        subject=sanitize_text_for_llm(subject),
-                        body=sanitize_text_for_llm(body_text),
-                        on_detail=emit_detail,
-                        on_progress=update_sub_progress,
-                        user_profile=user_profile,
+                    return _wait_prefetched(
+                        fut,
+                        reporter,
+                        index=index,
+                        item_llm_message=item_llm_message,
                     )
-                except _ResummarizeCancelled as ex:
-                    llm_err_box["err"] = ex
-                except Exception as ex:
-                    llm_err_box["err"] = ex
                 finally:
-                    llm_done.set()
-
-            llm_t = threading.Thread(target=_run_llm_call, daemon=True)
-            llm_t.start()
-
-            hb_stop = threading.Event()
-
-            def _llm_heartbeat() -> None:
+                    reporter.finish()
+
+            def _wait_prefetched(
+                fut: Future,
+                reporter: _AheadItemReporter,
+                *,
+                index: int,
+                item_llm_message: str,
+            ) -> tuple[LlmResult, float]:
                 started = time.monotonic()
-                while (
-                    not hb_stop.is_set()
-                    and not llm_done.is_set()
-                    and not cancel.is_set()
-                ):
-                    time.sleep(2.0)
-                    if hb_stop.is_set() or llm_done.is_set() or cancel.is_set():
-                        break
-                    dt_s = max(0.0, time.monotonic() - started)
-                    mm = int(dt_s // 60)
-                    ss = int(dt_s % 60)
-                    with frac_lock:
-                        frac = float(last_fraction)
-                    cur = max(i - 0.95, (i - 1) + frac)
-                    conn_hb = get_conn(db_path)
+                deadline = started + llm_timeout_s
+                last_beat = started
+                while not cancel.is_set():
                     try:
-                        repo.update_progress(
-                            conn_hb,
+                        return fut.result(timeout=1.0)
+                    except FutureTimeout:
+                        now = time.monotonic()
+                        if now < deadline:
+                            # Same heartbeat the serial path runs on its
+                            # own thread: elapsed time plus the item's
+                            # latest sub-progress.
+                            if now - last_beat >= 2.0:
+                                last_beat = now
+                                waited = int(now - started)
+                                repo.update_progress(
+                                    conn_main,
+                                    job_id=job_id,
+                                    current=max(
+                                        index - 0.95, index - 1 + reporter.fraction
+                                    ),
+                                    total=progress_total,
+                                    message=(
+                                        f"{item_llm_message} "
+                                        f"(경과 {waited // 60:02d}:{waited % 60:02d})"
+                                    ),
+                                )
+                            continue
+                        fut.cancel()
+                        repo.add_event(
+                            conn_main,
                             job_id=job_id,
-                            current=cur,
-                            total=max(len(targets), 1),
-                            message=_item_message(
-                                display_date,
-                                display_sub,
-                                i,
-                                len(targets),
-                                llm=True,
-                                elapsed=f"(경과 {mm:02d}:{ss:02d})",
-                            ),
+                            level="warn",
+                            text=f"LLM timeout: {llm_timeout_s:.0f}s (item {index}/{n_targets})",
                         )
-                    finally:
-                        conn_hb.close()
-
-            hb_t = threading.Thread(target=_llm_heartbeat, daemon=True)
-            hb_t.start()
-
-            tier = getattr(provider, "tier", "standard")
-            if tier == "cloud":
-                llm_timeout_s = 420.0
-            elif tier == "fast":
-                llm_timeout_s = 240.0
-            else:
-                llm_timeout_s = 360.0
+                        res = LlmResult(
+                            summary="(LLM timeout)", tags=[], backlinks=[], personal=False
+                        )
+                    except _ResummarizeCancelled:
+                        cancel.set()
+                        break
+                    except Exception as ex:
+                        repo.add_event(
+                            conn_main,
+                            job_id=job_id,
+                            level="warn",
+                            text=f"LLM exception: {str(ex)[:180]}",
+                        )
+                        res = LlmResult(
+                            summary="(LLM unavailable)",
+                            tags=[],
+                            backlinks=[],
+                            personal=False,
+                        )
+                    return res, time.monotonic() - started
+                return LlmResult(summary="", tags=[], backlinks=[], personal=False), 0.0
 
-            if not llm_done.wait(llm_timeout_s):
-                hb_stop.set()
+            for i, r in enumerate(targets, start=1):
+                if cancel.is_set():
+                    break
+
+                msg_id = r.id
+                account_id = r.account_id
+                uidvalidity = r.uidvalidity
+                uid = r.uid
+                subject = r.subject or "(no subject)"
+                from_addr = r.from_addr or settings.sender_filter or ""
+                internal_date = r.internal_date
+                raw_eml_path = r.raw_eml_path
+
+                old_topics: list[str] = []
                 try:
-                    hb_t.join(timeout=1.0)
+                    old_topics = json.loads(r.topics_json) or []
                 except Exception:
-                    pass
-                conn_to = get_conn(db_path)
-                try:
-                    repo.add_event(
-                        conn_to,
+                    old_topics = []
+
+                display_date = internal_date[:10] if len(internal_date) >= 10 else single_day_key
+                display_sub = (subject[:30] + "...") if len(subject) > 30 else subject
+                # Built once per item; every progress write below reuses them.
+                item_message = _item_message(display_date, display_sub, i, n_targets)
+                item_llm_message = _item_message(
+                    display_date, display_sub, i, n_targets, llm=True
+                )
+
+                # Each stage's progress and events go out as one commit.
+                with write_batch(conn_main):
+                    repo.update_progress(
+                        conn_main,
                         job_id=job_id,
-                        level="warn",
-                        text=f"LLM timeout: {llm_timeout_s:.0f}s (item {i}/{len(targets)})",
+                        current=i - 0.99,
+                        total=progress_total,
+                        message=item_message,
+                    )
+                    repo.add_events(
+                        conn_main,
+                        job_id=job_id,
+                        events=[
+                            ("info", f"item {i}/{n_targets}: {subject}"),
+                            (
+                                "detail",
+                                _dumps(
+                                    {
+                                        "type": "email",
+                                        "message_id": msg_id,
+                                        "index": i,
+                                        "total": n_targets,
+                                        "subject": subject,
+                                    }
+                                ),
+                            ),
+                            ("detail", _STAGE_READ),
+                        ],
                     )
-                finally:
-                    conn_to.close()
-                llm_done.set()
-                try:
-                    stop_done = threading.Event()
 
-                    def _stop_local_server() -> None:
-                        try:
-                            from webmail_summary.llm.llamacpp_server import stop_server
+                if llm_pool is None:
+                    body_text = _load_body_for_llm(r)
+                if cancel.is_set():
+                    break
 
-                            stop_server(force=True)
-                        finally:
-                            stop_done.set()
+                with write_batch(conn_main):
+                    repo.update_progress(
+                        conn_main,
+                        job_id=job_id,
+                        current=i - 0.95,
+                        total=progress_total,
+                        message=item_llm_message,
+                    )
+                    repo.add_event(
+                        conn_main, job_id=job_id, level="detail", text=_STAGE_LLM
+                    )
 
-                    threading.Thread(target=_stop_local_server, daemon=True).start()
-                    stop_done.wait(2.5)
-                except Exception:
-                    pass
-                try:
-                    llm_t.join(timeout=0.2)
-                except Exception:
-                    pass
-                llm_res = LlmResult(
-                    summary="(LLM timeout)", tags=[], backlinks=[], personal=False
-                )
-            else:
-                hb_stop.set()
-                try:
-                    hb_t.join(timeout=1.0)
-                except Exception:
-                    pass
-                llm_res = llm_result_box.get("res")
-                if llm_res is None:
-                    if "err" in llm_err_box:
-                        if isinstance(llm_err_box["err"], _ResummarizeCancelled):
-                            cancel.set()
-                            break
-                        conn_er = get_conn(db_path)
+                if llm_pool is not None:
+                    llm_res, dt_s = _await_prefetched(
+                        llm_pool,
+                        i,
+                        item_message=item_message,
+                        item_llm_message=item_llm_message,
+                    )
+                    if cancel.is_set():
+                        break
+                else:
+                    frac_lock = threading.Lock()
+                    last_fraction = 0.0
+                    last_sub_progress_at = 0.0
+
+                    def _set_fraction(v: float) -> None:
+                        nonlocal last_fraction
+                        with frac_lock:
+                            try:
+                                vv = float(v)
+                            except Exception:
+                                return
+                            vv = max(0.0, min(1.0, vv))
+                            if vv > last_fraction:
+                                last_fraction = vv
+
+                    def emit_detail(d: dict) -> None:
+                        if cancel.is_set():
+                            raise _ResummarizeCancelled()
+                        conn_d = get_conn(db_path)
                         try:
                             repo.add_event(
-                                conn_er,
+                                conn_d,
                                 job_id=job_id,
-                                level="warn",
-                                text=f"LLM exception: {str(llm_err_box['err'])[:180]}",
+                                level="detail",
+                                text=_dumps(d),
                             )
                         finally:
-                            conn_er.close()
-                    llm_res = LlmResult(
-                        summary="(LLM unavailable)",
-                        tags=[],
-                        backlinks=[],
-                        personal=False,
-                    )
-                try:
-                    llm_t.join(timeout=0.2)
-                except Exception:
-                    pass
+                            conn_d.close()
+
+                    def update_sub_progress(fraction: float) -> None:
+                        nonlocal last_sub_progress_at
+                        if cancel.is_set():
+                            raise _ResummarizeCancelled()
+                        _set_fraction(fraction)
+                        # Chunked summaries report many small steps; the
+                        # heartbeat picks up whatever fraction gets skipped.
+                        now = time.monotonic()
+                        if (
+                            fraction < 1.0
+                            and now - last_sub_progress_at < _PROGRESS_MIN_INTERVAL_S
+                        ):
+                            return
+                        last_sub_progress_at = now
+                        conn_p = get_conn(db_path)
+                        try:
+                            repo.update_progress(
+                                conn_p,
+                                job_id=job_id,
+                                current=i - 1 + fraction,
+                                total=progress_total,
+                                message=item_message,
+                            )
+                        finally:
+                            conn_p.close()
 
-            if cancel.is_set() or isinstance(
-                llm_err_box.get("err"), _ResummarizeCancelled
-            ):
-                cancel.set()
-                break
+                    t0 = time.monotonic()
 
-            dt_s = time.monotonic() - t0
-            topics = llm_res.backlinks
+                    llm_done = threading.Event()
+                    llm_result_box: dict[str, LlmResult] = {}
+                    llm_err_box: dict[str, Exception] = {}
 
-            connw3 = get_conn(db_path)
-            try:
-                repo.add_event(
-                    connw3,
-                    job_id=job_id,
-                    level="detail",
-                    text=json.dumps(
-                        {"type": "stage", "stage": "save"}, ensure_ascii=True
-                    ),
-                )
-            finally:
-                connw3.close()
+                    def _run_llm_call() -> None:
+                        try:
+                            llm_result_box["res"] = summarize_email_long_aware(
+                                provider,
+                                subject=sanitize_text_for_llm(subject),
+                                body=sanitize_text_for_llm(body_text),
+                                on_detail=emit_detail,
+                                on_progress=update_sub_progress,
+                                user_profile=user_profile,
+                            )
+                        except _ResummarizeCancelled as ex:
+                            llm_err_box["err"] = ex
+                        except Exception as ex:
+                            llm_err_box["err"] = ex
+                        finally:
+                            llm_done.set()
+
+                    llm_t = threading.Thread(target=_run_llm_call, daemon=True)
+                    llm_t.start()
+
+                    hb_stop = threading.Event()
+
+                    def _llm_heartbeat() -> None:
+                        started = time.monotonic()
+                        while (
+                            not hb_stop.is_set()
+                            and not llm_done.is_set()
+                            and not cancel.is_set()
+                        ):
+                            time.sleep(2.0)
+                            if hb_stop.is_set() or llm_done.is_set() or cancel.is_set():
+                                break
+                            dt_s = max(0.0, time.monotonic() - started)
+                            mm = int(dt_s // 60)
+                            ss = int(dt_s % 60)
+                            with frac_lock:
+                                frac = float(last_fraction)
+                            cur = max(i - 0.95, (i - 1) + frac)
+                            conn_hb = get_conn(db_path)
+                            try:
+                                repo.update_progress(
+                                    conn_hb,
+                                    job_id=job_id,
+                                    current=cur,
+                                    total=progress_total,
+                                    message=f"{item_llm_message} (경과 {mm:02d}:{ss:02d})",
+                                )
+                            finally:
+                                conn_hb.close()
+
+                    hb_t = threading.Thread(target=_llm_heartbeat, daemon=True)
+                    hb_t.start()
+
+                    if not llm_done.wait(llm_timeout_s):
+                        hb_stop.set()
+                        try:
+                            hb_t.join(timeout=1.0)
+                        except Exception:
+                            pass
+                        repo.add_event(
+                            conn_main,
+                            job_id=job_id,
+                            level="warn",
+                            text=f"LLM timeout: {llm_timeout_s:.0f}s (item {i}/{n_targets})",
+                        )
+                        llm_done.set()
+                        try:
+                            stop_done = threading.Event()
 
-            connw2 = get_conn(db_path)
-            try:
+                            def _stop_local_server() -> None:
+                                try:
+                                    from webmail_summary.llm.llamacpp_server import stop_server
+
+                                    stop_server(force=True)
+                                finally:
+                                    stop_done.set()
+
+                            threading.Thread(target=_stop_local_server, daemon=True).start()
+                            stop_done.wait(2.5)
+                        except Exception:
+                            pass
+                        try:
+                            llm_t.join(timeout=0.2)
+                        except Exception:
+                            pass
+                        llm_res = LlmResult(
+                            summary="(LLM timeout)", tags=[], backlinks=[], personal=False
+                        )
+                    else:
+                        hb_stop.set()
+                        try:
+                            hb_t.join(timeout=1.0)
+                        except Exception:
+                            pass
+                        llm_res = llm_result_box.get("res")
+                        if llm_res is None:
+                            if "err" in llm_err_box:
+                                if isinstance(llm_err_box["err"], _ResummarizeCancelled):
+                                    cancel.set()
+                                    break
+                                repo.add_event(
+                                    conn_main,
+                                    job_id=job_id,
+                                    level="warn",
+                                    text=f"LLM exception: {str(llm_err_box['err'])[:180]}",
+                                )
+                            llm_res = LlmResult(
+                                summary="(LLM unavailable)",
+                                tags=[],
+                                backlinks=[],
+                                personal=False,
+                            )
+                        try:
+                            llm_t.join(timeout=0.2)
+                        except Exception:
+                            pass
+
+                    if cancel.is_set() or isinstance(
+                        llm_err_box.get("err"), _ResummarizeCancelled
+                    ):
+                        cancel.set()
+                        break
+
+                    dt_s = time.monotonic() - t0
+                topics = llm_res.backlinks
+
+                item_tag = f"(item {i}/{n_targets})"
                 if dt_s > 60:
-                    repo.add_event(
-                        connw2,
+                    timing = ("warn", f"LLM 경고: {dt_s:.1f}s {item_tag}")
+                else:
+                    timing = ("info", f"LLM 완료: {dt_s:.1f}s {item_tag}")
+
+                # The save stage, its timing, the summary, the message_updated
+                # event the UI swaps it in from, and the item's progress all
+                # commit together: one WAL sync per item instead of three.
+                with write_batch(conn_main):
+                    set_analysis(
+                        conn_main,
+                        message_fk=msg_id,
+                        summary=llm_res.summary,
+                        tags=llm_res.tags,
+                        topics=topics,
+                        personal=llm_res.personal,
+                        summarize_ms=int(max(0.0, dt_s) * 1000.0),
+                    )
+                    repo.add_events(
+                        conn_main,
                         job_id=job_id,
-                        level="warn",
-                        text=f"LLM 경고: {dt_s:.1f}s (item {i}/{len(targets)})",
+                        events=[
+                            ("detail", _STAGE_SAVE),
+                            timing,
+                            (
+                                "message_updated",
+                                _dumps(
+                                    {"message_id": msg_id, "summary": llm_res.summary}
+                                ),
+                            ),
+                            ("detail", _STAGE_EXPORT),
+                        ],
                     )
-                else:
-                    repo.add_event(
-                        connw2,
+                    repo.update_progress(
+                        conn_main,
                         job_id=job_id,
-                        level="info",
-                        text=f"LLM 완료: {dt_s:.1f}s (item {i}/{len(targets)})",
+                        current=i,
+                        total=progress_total,
+                        message=item_message,
                     )
-            finally:
-                connw2.close()
-
-            connu = get_conn(db_path)
-            try:
-                set_analysis(
-                    connu,
-                    message_fk=msg_id,
-                    summary=llm_res.summary,
-                    tags=llm_res.tags,
-                    topics=topics,
-                    personal=llm_res.personal,
-                    summarize_ms=int(max(0.0, dt_s) * 1000.0),
-                )
-                connu.commit()
-            finally:
-                connu.close()
-
-            if display_date:
-                touched_day_keys.add(display_date)
-            processed_count = i
 
-            conne = get_conn(db_path)
-            try:
-                repo.add_event(
-                    conne,
-                    job_id=job_id,
-                    level="message_updated",
-                    text=json.dumps(
-                        {"message_id": msg_id, "summary": llm_res.summary},
-                        ensure_ascii=True,
-                    ),
-                )
-            finally:
-                conne.close()
-
-            connw4 = get_conn(db_path)
-            try:
-                repo.add_event(
-                    connw4,
-                    job_id=job_id,
-                    level="detail",
-                    text=json.dumps(
-                        {"type": "stage", "stage": "export"}, ensure_ascii=True
-                    ),
-                )
-            finally:
-                connw4.close()
+                if display_date:
+                    touched_day_keys.add(display_date)
+                if day_summaries is not None:
+                    day_summaries[internal_date[:10]][msg_id] = llm_res.summary
+                processed_count = i
 
-            try:
                 archive_dir = Path(raw_eml_path).parent if raw_eml_path else data_dir
                 try:
                     email_dt = dt.datetime.fromisoformat(internal_date).date()
                 except Exception:
                     email_dt = single_day or _parse_date_key(day_keys[0])
 
-                note_path = export_email_note(
-                    vault_root=vault_root,
-                    inp=MessageExportInput(
-                        message_key=f"{account_id}-{uidvalidity}-{uid}",
-                        date=email_dt,
-                        sender=from_addr,
-                        subject=subject,
-                        summary=llm_res.summary,
-                        tags=llm_res.tags,
-                        topics=topics,
-                        archive_dir=archive_dir,
-                    ),
+                # The note is written on the export thread while this one
+                # moves on to the next item's LLM call.
+                exports.append(
+                    (
+                        display_date,
+                        topics,
+                        old_topics,
+                        export_pool.submit(
+                            export_email_note,
+                            vault_root=vault_root,
+                            inp=MessageExportInput(
+                                message_key=f"{account_id}-{uidvalidity}-{uid}",
+                                date=email_dt,
+                                sender=from_addr,
+                                subject=subject,
+                                summary=llm_res.summary,
+                                tags=llm_res.tags,
+                                topics=topics,
+                                archive_dir=archive_dir,
+                            ),
+                        ),
+                    )
                 )
+
+            for display_date, topics, old_topics, exported in exports:
+                try:
+                    note_path = exported.result()
+                except Exception:
+                    continue
                 processed_notes_by_day.setdefault(display_date, []).append(note_path)
                 for t in topics:
                     all_topics.setdefault(t, []).append(note_path)
                 for t in old_topics:
                     if t not in all_topics:
                         all_topics[t] = []
-            except Exception:
-                continue
 
-        if cancel.is_set():
-            connc = get_conn(db_path)
-            try:
+            if cancel.is_set():
                 repo.update_progress(
-                    connc,
+                    conn_main,
                     job_id=job_id,
                     current=float(processed_count),
-                    total=max(len(targets), 1),
+                    total=progress_total,
                     message=cancelled_message,
                 )
-                repo.add_event(connc, job_id=job_id, level="info", text="cancelled")
-            finally:
-                connc.close()
-            return
+                repo.add_event(conn_main, job_id=job_id, level="info", text="cancelled")
+                return
 
-        try:
-            for day_key, processed_notes in processed_notes_by_day.items():
-                if not processed_notes:
-                    continue
-                daily_summary = "\n".join(f"- {p.stem}" for p in processed_notes)
-                export_daily_note(
-                    vault_root=vault_root,
-                    date=_parse_date_key(day_key),
-                    message_notes=processed_notes,
-                    daily_summary=daily_summary,
-                )
+            try:
+                for day_key, processed_notes in processed_notes_by_day.items():
+                    if not processed_notes:
+                        continue
+                    daily_summary = "\n".join(f"- {p.stem}" for p in processed_notes)
+                    export_daily_note(
+                        vault_root=vault_root,
+                        date=_parse_date_key(day_key),
+                        message_notes=processed_notes,
+                        daily_summary=daily_summary,
+                    )
 
-            if touched_day_keys:
-                refresh_overviews_for_dates(
-                    db_path=db_path,
-                    provider=provider,
-                    settings=settings,
-                    date_keys=sorted(touched_day_keys),
-                    force_refresh=True,
-                    job_id=job_id,
-                )
+                if touched_day_keys:
+                    overview_inputs = None
+                    if day_summaries is not None:
+                        # force_refresh skips the timestamp checks, so only
+                        # the summaries are needed.
+                        overview_inputs = _DayInputs(
+                            max_summarized_at={},
+                            overview_updated_at={},
+                            summaries={
+                                day: [t for t in sums.values() if t.strip()]
+                                for day, sums in day_summaries.items()
+                            },
+                        )
+                    refresh_overviews_for_dates(
+                        db_path=db_path,
+                        provider=provider,
+                        settings=settings,
+                        date_keys=sorted(touched_day_keys),
+                        force_refresh=True,
+                        job_id=job_id,
+                        inputs=overview_inputs,
+                        cancel=cancel,
+                    )
 
-            for topic in all_topics:
-                try:
-                    conn_topic = get_conn(db_path)
+                for topic in all_topics:
                     try:
-                        remaining = get_message_ids_by_topic(conn_topic, topic=topic)
-                    finally:
-                        conn_topic.close()
-
-                    if not remaining:
-                        topic_file = vault_root / "Topic" / f"{safe_topic_name(topic)}.md"
-                        if topic_file.exists():
-                            topic_file.unlink(missing_ok=True)
-                        continue
+                        remaining = get_message_ids_by_topic(conn_main, topic=topic)
 
-                    topic_notes: list[Path] = []
-                    conn_notes = get_conn(db_path)
-                    try:
+                        if not remaining:
+                            topic_file = vault_root / "Topic" / f"{safe_topic_name(topic)}.md"
+                            if topic_file.exists():
+                                topic_file.unlink(missing_ok=True)
+                            continue
+
+                        topic_notes: list[Path] = []
                         for mid in remaining:
-                            row = conn_notes.execute(
+                            row = conn_main.execute(
                                 "SELECT account_id, uidvalidity, uid, subject, internal_date "
                                 "FROM messages WHERE id=?",
                                 (mid,),
@@ -773,30 +1054,29 @@ def resummarize_day_task(
                             note_path = vault_root / "Mail" / f"{m_date:%Y-%m}" / fname
                             if note_path.exists():
                                 topic_notes.append(note_path)
-                    finally:
-                        conn_notes.close()
 
-                    export_topic_note(
-                        vault_root=vault_root,
-                        topic=topic,
-                        message_notes=topic_notes,
-                        replace=True,
-                    )
-                except Exception:
-                    pass
-        except Exception:
-            pass
+                        export_topic_note(
+                            vault_root=vault_root,
+                            topic=topic,
+                            message_notes=topic_notes,
+                            replace=True,
+                        )
+                    except Exception:
+                        pass
+            except Exception:
+                pass
 
-        connf = get_conn(db_path)
-        try:
             repo.update_progress(
-                connf,
+                conn_main,
                 job_id=job_id,
-                current=len(targets),
-                total=max(len(targets), 1),
+                current=n_targets,
+                total=progress_total,
                 message=completed_message,
             )
         finally:
-            connf.close()
+            if llm_pool is not None:
+                llm_pool.shutdown(wait=False, cancel_futures=True)
+            export_pool.shutdown(wait=True)
+            conn_main.close()
 
     return run
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import threading
 import time
+from collections import deque
 from collections.abc import Callable, Iterable, Iterator
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
 from email import policy
 from email.parser import BytesParser
 from pathlib import Path
@@ -12,9 +13,9 @@ from pathlib import Path
 import keyring
 from PIL import Image
 
-from webmail_summary.archive.paths import get_message_paths
+from webmail_summary.archive.paths import MessagePaths, get_message_paths
 from webmail_summary.util.timefmt import KST as _KST
-from webmail_summary.archive.pipeline import archive_message
+from webmail_summary.archive.pipeline import ArchiveResult, archive_message
 from webmail_summary.archive.html_rewrite import ExternalAsset
 from webmail_summary.archive.mime_parts import SavedAttachment
 from webmail_summary.export.obsidian.exporter import (
@@ -24,7 +25,7 @@ from webmail_summary.export.obsidian.exporter import (
     export_topic_note,
 )
 from webmail_summary.imap_client import ImapSession
-from webmail_summary.index.db import get_conn
+from webmail_summary.index.db import get_conn, write_batch
 from webmail_summary.index.mail_repo import (
     get_max_uid,
     get_incomplete_uids,
@@ -43,7 +44,6 @@ from webmail_summary.llm.provider import LlmNotReady, get_llm_provider
 from webmail_summary.llm.long_summarize import summarize_email_long_aware
 from webmail_summary.util.app_data import default_obsidian_root, get_app_data_dir
 from webmail_summary.util.text_sanitize import (
-    html_to_visible_text,
     prepare_body_for_llm,
     sanitize_text_for_llm,
 )
@@ -72,6 +72,10 @@ def _email_date(internal_date: datetime | None) -> str:
     return internal_date.astimezone(_KST).isoformat()
 
 
+# Messages archived concurrently ahead of the index/summarize loop.
+_ARCHIVE_WORKERS = 4
+
+
 def _cloud_base_delay_seconds(cloud_provider: str, model: str) -> float:
     provider = str(cloud_provider or "").strip().lower()
     model_name = str(model or "").strip().lower()
@@ -136,6 +140,50 @@ def _add_job_event(*, db_path: Path, job_id: str, level: str, text: str) -> None
         conn.close()
 
 
+def _slow_summary_events(dt2_s: float) -> list[tuple[str, str]]:
+    if dt2_s > 60:
+        return [("warn", f"요약이 느립니다 ({dt2_s:.1f}초)")]
+    return []
+
+
+def _save_message_outcome(
+    *,
+    db_path: Path,
+    job_id: str,
+    message_fk: int,
+    llm_res: LlmResult | None = None,
+    summarize_ms: int = 0,
+    exported: bool = False,
+    seen_marked: bool = False,
+    events: Iterable[tuple[str, str]] = (),
+    progress: dict | None = None,
+) -> None:
+    """Write one phase-3 step for a message (analysis and/or exported/seen
+    marks, with its events and progress) as a single commit."""
+    conn = get_conn(db_path)
+    try:
+        with write_batch(conn):
+            if llm_res is not None:
+                set_analysis(
+                    conn,
+                    message_fk=message_fk,
+                    summary=llm_res.summary,
+                    tags=llm_res.tags,
+                    topics=llm_res.backlinks,
+                    personal=llm_res.personal,
+                    summarize_ms=summarize_ms,
+                )
+            if exported:
+                set_exported(conn, message_fk=message_fk)
+            if seen_marked:
+                set_seen_marked(conn, message_fk=message_fk)
+            repo.add_events(conn, job_id=job_id, events=events)
+            if progress is not None:
+                repo.update_progress(conn, job_id=job_id, **progress)
+    finally:
+        conn.close()
+
+
 def _update_job_progress(
     *, db_path: Path, job_id: str, current: float, total: float, message: str
 ) -> None:
@@ -152,15 +200,12 @@ def _update_job_progress(
         conn.close()
 
 
-def _load_body_text_for_llm(
-    *, body_text_path: str | None, body_html_path: str | None
-) -> str:
+def _load_body_text_for_llm(*, body_text_path: str | None) -> str:
+    # archive_message writes body.txt for HTML-only mail too (visible text of
+    # the original HTML), so rendered.html is never reread here.
     body_text = ""
     if body_text_path and Path(body_text_path).exists():
         body_text = Path(body_text_path).read_text(encoding="utf-8", errors="replace")
-    elif body_html_path and Path(body_html_path).exists():
-        raw_html = Path(body_html_path).read_text(encoding="utf-8", errors="replace")
-        body_text = html_to_visible_text(raw_html)
     return prepare_body_for_llm(body_text)
 
 
@@ -458,6 +503,23 @@ def _chunked(iterable: Iterable, n: int) -> Iterator[list]:
         yield chunk
 
 
+def _prefetched(
+    iterable: Iterable, submit: Callable[[object], Future], depth: int
+) -> Iterator[tuple[object, Future]]:
+    """Yield (item, future) pairs, keeping up to `depth` submissions ahead.
+
+    Lets the next messages archive in the background while the current one
+    is being indexed/summarized, without materializing the whole iterable.
+    """
+    pending: deque[tuple[object, Future]] = deque()
+    for item in iterable:
+        pending.append((item, submit(item)))
+        if len(pending) > max(0, int(depth)):
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
 def _group_processed_notes(
     processed_notes: list[tuple[str, Path, list[str]]],
 ) -> tuple[dict[str, list[Path]], dict[str, list[Path]]]:
@@ -517,7 +579,7 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
         to_revert: list[int] = []
 
         with ImapSession(s.imap_host, s.imap_port, s.imap_user, pw) as imap:
-            # Fetch uses BODY.PEEK[] (see ImapSession.fetch_messages) to avoid implicit \Seen changes.
+            # Fetch uses BODY.PEEK[] (see ImapSession.iter_messages) to avoid implicit \Seen changes.
             imap.select_folder(s.imap_folder, readonly=False)
             uidvalidity = imap.get_uidvalidity_for(s.imap_folder)
 
@@ -580,9 +642,7 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                     message=f"메일 가져오는 중 ({int(fetched)}/{max(int(total), 1)})",
                 )
 
-            msg_iter = imap.iter_messages(
-                uids, chunk_size=20, on_progress=_on_fetch_progress
-            )
+            msg_iter = imap.iter_messages(uids, on_progress=_on_fetch_progress)
             processed_notes: list[
                 tuple[str, Path, list[str]]
             ] = []  # date_prefix, note_path, topics
@@ -633,8 +693,29 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                     ),
                 )
 
-            def _archive_and_index_one(i_global: int, m):
-                """Archive + DB upsert + body/multimodal prep. Serial per mail."""
+            def _archive_one(m) -> tuple[MessagePaths, ArchiveResult, float]:
+                """Archive a single message; runs on the archive pool."""
+                paths = get_message_paths(
+                    data_root=data_dir,
+                    account_id=account_id,
+                    mailbox=s.imap_folder,
+                    uidvalidity=uidvalidity,
+                    uid=m.uid,
+                )
+                t0 = time.monotonic()
+                ar = archive_message(
+                    raw_rfc822=m.rfc822,
+                    paths=paths,
+                    external_max_bytes=s.external_max_bytes,
+                )
+                return paths, ar, time.monotonic() - t0
+
+            def _archive_and_index_one(i_global: int, m, archived: Future):
+                """Wait for archive, then DB upsert + body/multimodal prep.
+
+                Archiving itself runs ahead on the archive pool; the DB writes
+                stay serial and in message order.
+                """
                 hdr = _parse_headers(m.rfc822)
                 internal_date_str = _email_date(m.internaldate)
                 subject = hdr.get("subject") or "(no subject)"
@@ -654,20 +735,7 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                     text="아카이브 시작",
                 )
 
-                t0 = time.monotonic()
-                paths = get_message_paths(
-                    data_root=data_dir,
-                    account_id=account_id,
-                    mailbox=s.imap_folder,
-                    uidvalidity=uidvalidity,
-                    uid=m.uid,
-                )
-                ar = archive_message(
-                    raw_rfc822=m.rfc822,
-                    paths=paths,
-                    external_max_bytes=s.external_max_bytes,
-                )
-                dt_s = time.monotonic() - t0
+                paths, ar, dt_s = archived.result()
                 if dt_s > 15:
                     _add_job_event(
                         db_path=db_path,
@@ -683,59 +751,61 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                     stage="index",
                 )
                 conn1 = get_conn(db_path)
+                indexed_ts = datetime.now(timezone.utc).isoformat()
                 try:
-                    msg_fk = upsert_message(
-                        conn1,
-                        account_id=account_id,
-                        mailbox=s.imap_folder,
-                        uidvalidity=uidvalidity,
-                        uid=m.uid,
-                        message_id=hdr.get("message_id"),
-                        internal_date=internal_date_str,
-                        from_addr=hdr.get("from"),
-                        to_addr=hdr.get("to"),
-                        subject=subject,
-                        raw_eml_path=str(ar.raw_eml_path),
-                        body_html_path=str(ar.body_html_path)
-                        if ar.body_html_path
-                        else None,
-                        body_text_path=str(ar.body_text_path)
-                        if ar.body_text_path
-                        else None,
-                        rendered_html_path=str(ar.rendered_html_path)
-                        if ar.rendered_html_path
-                        else None,
-                    )
-                    replace_attachments(
-                        conn1,
-                        message_fk=msg_fk,
-                        items=[
-                            {
-                                "filename": a.filename,
-                                "mime_type": a.mime_type,
-                                "size_bytes": a.size_bytes,
-                                "rel_path": a.rel_path,
-                                "content_id": a.content_id,
-                                "is_inline": a.is_inline,
-                            }
-                            for a in ar.attachments
-                        ],
-                    )
-                    replace_external_assets(
-                        conn1,
-                        message_fk=msg_fk,
-                        items=[
-                            {
-                                "original_url": a.original_url,
-                                "rel_path": a.rel_path,
-                                "mime_type": a.mime_type,
-                                "size_bytes": a.size_bytes,
-                                "status": a.status,
-                            }
-                            for a in ar.external_assets
-                        ],
-                    )
-                    conn1.commit()
+                    with write_batch(conn1):
+                        msg_fk = upsert_message(
+                            conn1,
+                            account_id=account_id,
+                            mailbox=s.imap_folder,
+                            uidvalidity=uidvalidity,
+                            uid=m.uid,
+                            message_id=hdr.get("message_id"),
+                            internal_date=internal_date_str,
+                            from_addr=hdr.get("from"),
+                            to_addr=hdr.get("to"),
+                            subject=subject,
+                            raw_eml_path=str(ar.raw_eml_path),
+                            body_html_path=None,
+                            body_text_path=str(ar.body_text_path)
+                            if ar.body_text_path
+                            else None,
+                            rendered_html_path=str(ar.rendered_html_path)
+                            if ar.rendered_html_path
+                            else None,
+                            ts=indexed_ts,
+                        )
+                        replace_attachments(
+                            conn1,
+                            message_fk=msg_fk,
+                            ts=indexed_ts,
+                            items=[
+                                {
+                                    "filename": a.filename,
+                                    "mime_type": a.mime_type,
+                                    "size_bytes": a.size_bytes,
+                                    "rel_path": a.rel_path,
+                                    "content_id": a.content_id,
+                                    "is_inline": a.is_inline,
+                                }
+                                for a in ar.attachments
+                            ],
+                        )
+                        replace_external_assets(
+                            conn1,
+                            message_fk=msg_fk,
+                            ts=indexed_ts,
+                            items=[
+                                {
+                                    "original_url": a.original_url,
+                                    "rel_path": a.rel_path,
+                                    "mime_type": a.mime_type,
+                                    "size_bytes": a.size_bytes,
+                                    "status": a.status,
+                                }
+                                for a in ar.external_assets
+                            ],
+                        )
                 finally:
                     conn1.close()
 
@@ -743,9 +813,6 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                     body_text_path=str(ar.body_text_path)
                     if ar.body_text_path
                     else None,
-                    body_html_path=str(ar.body_html_path)
-                    if ar.body_html_path
-                    else None,
                 )
                 multimodal_inputs: list[LlmImageInput] | None = None
                 if provider.supports_multimodal_inputs() and bool(
@@ -863,31 +930,26 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                 get_incomplete_uids (seen_marked_at IS NULL).
                 """
                 i_global = ctx["i_global"]
-                msg_fk = ctx["msg_fk"]
-                conn_fb = get_conn(db_path)
-                try:
-                    set_analysis(
-                        conn_fb,
-                        message_fk=msg_fk,
+                _save_message_outcome(
+                    db_path=db_path,
+                    job_id=job_id,
+                    message_fk=ctx["msg_fk"],
+                    llm_res=LlmResult(
                         summary=llm_res.summary,
                         tags=[],
-                        topics=[],
+                        backlinks=[],
                         personal=False,
-                        summarize_ms=int(max(0.0, dt2_s) * 1000.0),
-                    )
-                    conn_fb.commit()
-                finally:
-                    conn_fb.close()
-                _add_job_event(
-                    db_path=db_path,
-                    job_id=job_id,
-                    level="warn",
-                    text=(
-                        f"LLM 실패 메일 ({i_global}/{msg_total}): 다음 sync 때 자동 재시도합니다"
                     ),
+                    summarize_ms=int(max(0.0, dt2_s) * 1000.0),
+                    events=[
+                        (
+                            "warn",
+                            f"LLM 실패 메일 ({i_global}/{msg_total}): 다음 sync 때 자동 재시도합니다",
+                        )
+                    ],
                 )
 
-            def _persist_and_export_one(
+            def _export_one(
                 *,
                 ctx: dict,
                 llm_res: LlmResult,
@@ -896,8 +958,10 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
             ) -> Path | None:
                 """Save analysis, export Obsidian note. Returns note_path or None.
 
-                B 3.1 최소 침습 conn pool: set_analysis + set_exported 를
-                conn2 1개로 묶어서 phase 3 conn 3회 → 2회 (export 실패 시 1회).
+                The analysis is committed before the export so a finished
+                summary survives an export failure or a killed job (the day
+                list shows it and the next sync does not re-summarize).
+                exported/seen marks follow in one commit after _mark_one.
                 C P1-2 깜빡임 완화: suppress_stage_update=True 면 메일별
                 _set_stage_for("export") skip (chunk_size>1 분기에서만 True).
                 """
@@ -906,19 +970,17 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                 subject = ctx["subject"]
                 display_date = ctx["display_date"]
                 display_sub = ctx["display_sub"]
-                msg_fk = ctx["msg_fk"]
                 paths = ctx["paths"]
                 hdr = ctx["hdr"]
-                topics = llm_res.backlinks
-
-                if dt2_s > 60:
-                    _add_job_event(
-                        db_path=db_path,
-                        job_id=job_id,
-                        level="warn",
-                        text=f"요약이 느립니다 ({dt2_s:.1f}초)",
-                    )
 
+                _save_message_outcome(
+                    db_path=db_path,
+                    job_id=job_id,
+                    message_fk=ctx["msg_fk"],
+                    llm_res=llm_res,
+                    summarize_ms=int(max(0.0, dt2_s) * 1000.0),
+                    events=_slow_summary_events(dt2_s),
+                )
                 if not suppress_stage_update:
                     _set_stage_for(
                         i_global=i_global,
@@ -930,114 +992,84 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                     m.internaldate.date() if m.internaldate else dt.date.today()
                 )
 
-                conn2 = get_conn(db_path)
                 try:
-                    # set_analysis 먼저: export 실패해도 사용자가 요약 결과를
-                    # day list 에서 볼 수 있도록 함.
-                    set_analysis(
-                        conn2,
-                        message_fk=msg_fk,
-                        summary=llm_res.summary,
-                        tags=llm_res.tags,
-                        topics=topics,
-                        personal=llm_res.personal,
-                        summarize_ms=int(max(0.0, dt2_s) * 1000.0),
+                    return export_email_note(
+                        vault_root=vault_root,
+                        inp=MessageExportInput(
+                            message_key=f"{account_id}-{uidvalidity}-{m.uid}",
+                            date=email_dt,
+                            sender=str(hdr.get("from") or "(unknown)"),
+                            subject=str(subject),
+                            summary=llm_res.summary,
+                            tags=llm_res.tags,
+                            topics=llm_res.backlinks,
+                            archive_dir=paths.base_dir,
+                        ),
                     )
-                    conn2.commit()
-                    try:
-                        note_path = export_email_note(
-                            vault_root=vault_root,
-                            inp=MessageExportInput(
-                                message_key=f"{account_id}-{uidvalidity}-{m.uid}",
-                                date=email_dt,
-                                sender=str(hdr.get("from") or "(unknown)"),
-                                subject=str(subject),
-                                summary=llm_res.summary,
-                                tags=llm_res.tags,
-                                topics=topics,
-                                archive_dir=paths.base_dir,
-                            ),
-                        )
-                    except Exception as e:
-                        _add_job_event(
-                            db_path=db_path,
-                            job_id=job_id,
-                            level="error",
-                            text=f"Obsidian export failed (continuing): {e}",
-                        )
-                        _update_job_progress(
-                            db_path=db_path,
-                            job_id=job_id,
-                            current=i_global,
-                            total=max(msg_total, 1),
-                            message=f"[{display_date}] Obsidian 내보내기 실패 (계속): {display_sub} ({i_global}/{msg_total})",
-                        )
-                        return None
-
-                    # 같은 conn 으로 set_exported 까지 묶음 (conn 2개 → 1개).
-                    set_exported(conn2, message_fk=msg_fk)
-                    conn2.commit()
-                finally:
-                    conn2.close()
-                return note_path
+                except Exception as e:
+                    _save_message_outcome(
+                        db_path=db_path,
+                        job_id=job_id,
+                        message_fk=ctx["msg_fk"],
+                        events=[("error", f"Obsidian export failed (continuing): {e}")],
+                        progress={
+                            "current": i_global,
+                            "total": max(msg_total, 1),
+                            "message": f"[{display_date}] Obsidian 내보내기 실패 (계속): {display_sub} ({i_global}/{msg_total})",
+                        },
+                    )
+                    return None
 
             def _mark_one(
                 *, ctx: dict, suppress_stage_update: bool = False
-            ) -> None:
-                """IMAP \\Seen 플래그 마킹 + DB seen_marked_at 갱신.
+            ) -> Exception | None:
+                """IMAP \\Seen 플래그 마킹. Returns the error, if any; the DB
+                seen_marked_at write goes into _save_message_outcome.
 
                 C P1-3 깜빡임 완화: suppress_stage_update=True 면 메일별
                 _set_stage_for("mark") skip (chunk_size>1 분기에서만 True).
                 """
-                i_global = ctx["i_global"]
                 m = ctx["m"]
-                subject = ctx["subject"]
-                display_date = ctx["display_date"]
-                msg_fk = ctx["msg_fk"]
-                originally_seen = ctx["originally_seen"]
-
                 if not suppress_stage_update:
                     _set_stage_for(
-                        i_global=i_global,
-                        display_date=display_date,
-                        subject=subject,
+                        i_global=ctx["i_global"],
+                        display_date=ctx["display_date"],
+                        subject=ctx["subject"],
                         stage="mark",
                     )
                 try:
                     _mark_seen_retry(m.uid)
-                    if revert_seen and not originally_seen:
-                        to_revert.append(int(m.uid))
-                    connm = get_conn(db_path)
-                    try:
-                        set_seen_marked(connm, message_fk=msg_fk)
-                        connm.commit()
-                    finally:
-                        connm.close()
                 except Exception as e:
-                    connm2 = get_conn(db_path)
-                    try:
-                        repo.add_event(
-                            connm2,
-                            job_id=job_id,
-                            level="warn",
-                            text=f"읽음 처리 실패: {e}",
-                        )
-                    finally:
-                        connm2.close()
-
+                    return e
+                if revert_seen and not ctx["originally_seen"]:
+                    to_revert.append(int(m.uid))
+                return None
+
+            # Archiving (MIME split, HTML rewrite, asset downloads, atomic
+            # writes) is independent per message, so it runs ahead of the
+            # serial index/LLM loop on a small thread pool.
+            archive_pool = ThreadPoolExecutor(
+                max_workers=_ARCHIVE_WORKERS, thread_name_prefix="archive"
+            )
             try:
                 global_counter = 0
-                for chunk in _chunked(msg_iter, chunk_size):
+                archived_iter = _prefetched(
+                    msg_iter,
+                    lambda m: archive_pool.submit(_archive_one, m),
+                    _ARCHIVE_WORKERS,
+                )
+                for chunk in _chunked(archived_iter, chunk_size):
                     if cancel.is_set():
                         break
 
-                    # Phase 1: Archive + index sequentially (DB / FS safety).
+                    # Phase 1: Index sequentially (DB safety); archives were
+                    # already submitted to the pool.
                     chunk_ctxs: list[dict] = []
-                    for m in chunk:
+                    for m, archived in chunk:
                         if cancel.is_set():
                             break
                         global_counter += 1
-                        ctx = _archive_and_index_one(global_counter, m)
+                        ctx = _archive_and_index_one(global_counter, m, archived)
                         chunk_ctxs.append(ctx)
 
                     if not chunk_ctxs:
@@ -1263,7 +1295,7 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                                 ctx=ctx, llm_res=llm_res, dt2_s=dt2_s
                             )
                             continue
-                        note_path = _persist_and_export_one(
+                        note_path = _export_one(
                             ctx=ctx,
                             llm_res=llm_res,
                             dt2_s=dt2_s,
@@ -1271,9 +1303,21 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                         )
                         if note_path is None:
                             continue
-                        _mark_one(
+                        mark_err = _mark_one(
                             ctx=ctx, suppress_stage_update=suppress_stage
                         )
+                        # exported + seen marks (or the mark failure) go out
+                        # as one commit; the analysis was saved before export.
+                        _save_message_outcome(
+                            db_path=db_path,
+                            job_id=job_id,
+                            message_fk=ctx["msg_fk"],
+                            exported=True,
+                            seen_marked=mark_err is None,
+                            events=[]
+                            if mark_err is None
+                            else [("warn", f"읽음 처리 실패: {mark_err}")],
+                        )
 
                         m = ctx["m"]
                         date_prefix = (
@@ -1327,6 +1371,7 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                             date_keys=list(by_date.keys()),
                             force_refresh=True,
                             job_id=job_id,
+                            cancel=cancel,
                         )
                         if refreshed_days:
                             _add_job_event(
@@ -1345,6 +1390,10 @@ def sync_mailbox_task() -> Callable[[str, threading.Event], None]:
                         )
 
             finally:
+                # Don't wait for in-flight archives: each may spend its whole
+                # asset download budget, which would stall cancel for minutes.
+                # Their writes are atomic and their results are discarded.
+                archive_pool.shutdown(wait=False, cancel_futures=True)
                 if revert_seen and to_revert:
                     # Best-effort revert for smoke tests.
                     for uid in to_revert:
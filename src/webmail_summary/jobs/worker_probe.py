@@ -1,9 +1,24 @@
 from __future__ import annotations
 
+import threading
 from typing import Iterable
 
 import psutil
 
+# Jobs handed to the long-lived sync worker; its cmdline names no job id.
+_served_lock = threading.Lock()
+_served_jobs: dict[str, int] = {}
+
+
+def register_served_job(*, job_id: str, pid: int) -> None:
+    with _served_lock:
+        _served_jobs[str(job_id)] = int(pid)
+
+
+def unregister_served_job(*, job_id: str) -> None:
+    with _served_lock:
+        _served_jobs.pop(str(job_id), None)
+
 
 def _cmdline_contains(cmdline: Iterable[str] | None, needle: str) -> bool:
     if not cmdline:
@@ -21,10 +36,15 @@ def find_sync_worker_pids(*, job_id: str) -> list[int]:
     Supports both launch styles:
     - python -m webmail_summary.jobs.worker_sync --job-id <id>
     - webmail-summary(.exe) sync-worker --job-id <id>
+    plus the long-lived ``--serve`` worker while it runs the job.
     """
 
     jid = str(job_id)
     out: list[int] = []
+    with _served_lock:
+        served_pid = _served_jobs.get(jid)
+    if served_pid is not None and psutil.pid_exists(served_pid):
+        out.append(served_pid)
     for p in psutil.process_iter(attrs=["pid", "cmdline"]):
         try:
             cmd = p.info.get("cmdline")
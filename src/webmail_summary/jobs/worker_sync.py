@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import sys
 import threading
 
 from collections.abc import Sequence
+from typing import TextIO
 
 from webmail_summary.index.db import get_conn
 from webmail_summary.jobs import repo
@@ -63,10 +65,42 @@ def run_worker(job_id: str) -> None:
             conn3.close()
 
 
+def serve_worker(requests: TextIO, replies: TextIO) -> None:
+    """Run one sync job per job id line until requests reaches EOF.
+
+    Each job is answered with ``OK <job_id>`` or ``ERR <job_id> <message>`` so
+    the runner can reuse this process instead of spawning one per sync.
+    """
+    for line in requests:
+        job_id = line.strip()
+        if not job_id:
+            continue
+        try:
+            run_worker(job_id)
+        except Exception as e:
+            msg = " ".join(str(e).split())
+            replies.write(f"ERR {job_id} {msg}\n")
+        else:
+            replies.write(f"OK {job_id}\n")
+        replies.flush()
+
+
+def serve_stdio() -> None:
+    replies = sys.stdout
+    # Stray prints from sync code must not land on the reply pipe.
+    sys.stdout = sys.stderr
+    serve_worker(sys.stdin, replies)
+
+
 def main(argv: Sequence[str] | None = None) -> None:
     p = argparse.ArgumentParser(prog="webmail-summary-sync-worker")
-    p.add_argument("--job-id", required=True)
+    mode = p.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--job-id")
+    mode.add_argument("--serve", action="store_true")
     args = p.parse_args(argv)
+    if args.serve:
+        serve_stdio()
+        return
     run_worker(str(args.job_id))
 
 
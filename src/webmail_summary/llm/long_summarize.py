@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
 
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
 from webmail_summary.llm.base import LlmImageInput, LlmProvider, LlmResult
 import re
@@ -1363,11 +1364,12 @@ def synthesize_daily_overview(
     provider: LlmProvider,
     *,
     day: str,
-    summaries: list[str],
+    summaries: Iterable[str],
     user_profile: dict | None = None,
+    stop: threading.Event | None = None,
 ) -> str:
-    if not summaries:
-        return ""
+    # summaries may be a lazy iterable; it is consumed only until the
+    # item/char budget below is full.
 
     # Performance guardrails for day-level synthesis.
     max_items = 24
@@ -1461,6 +1463,10 @@ def synthesize_daily_overview(
         + "\n".join([f"- {s}" for s in compact_summaries])
     )
 
+    # The provider call is the slow part and can't be interrupted once sent.
+    if stop is not None and stop.is_set():
+        return ""
+
     try:
         res = provider.summarize(subject=f"{day} Daily Overview", body=body)
         bullets = _dedupe_keep_order(_extract_bullets(res.summary))
@@ -25,7 +25,7 @@ def day_view(request: Request, date_key: str):
     if len(dk) != 10 or dk[4] != "-" or dk[7] != "-":
         return RedirectResponse("/", status_code=302)
 
-    conn = get_conn(db_path())
+    conn = get_conn(db_path(), readonly=True)
     try:
         settings = load_settings(conn)
         rows = list_messages_by_date(conn, date_prefix=dk)
@@ -87,7 +87,7 @@ def day_view(request: Request, date_key: str):
 def message_detail(request: Request, message_id: int):
     from webmail_summary.index.db import get_conn
 
-    conn = get_conn(db_path())
+    conn = get_conn(db_path(), readonly=True)
     try:
         settings = load_settings(conn)
         row = get_message_detail(conn, int(message_id))
@@ -158,7 +158,7 @@ def message_detail(request: Request, message_id: int):
 def message_original(request: Request, message_id: int):
     from webmail_summary.index.db import get_conn
 
-    conn = get_conn(db_path())
+    conn = get_conn(db_path(), readonly=True)
     try:
         settings = load_settings(conn)
         row = get_message_detail(conn, int(message_id))
@@ -206,7 +206,7 @@ def serve_message_file(request: Request, message_id: int, path: str):
     from fastapi.responses import FileResponse
     from webmail_summary.index.db import get_conn
 
-    conn = get_conn(db_path())
+    conn = get_conn(db_path(), readonly=True)
     try:
         row = conn.execute(
             "SELECT rendered_html_path FROM messages WHERE id = ?", (int(message_id),)
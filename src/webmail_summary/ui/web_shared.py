@@ -31,6 +31,12 @@ def fmt_summarize_ms(ms: int | None) -> str:
     return f"{v / 1000.0:.1f}s"
 
 
+# asset name -> (mtime_ns, size, content hash). Templates ask for the asset
+# version on every page render, so avoid re-reading and re-hashing files whose
+# stat() has not changed since the last call.
+_asset_hash_cache: dict[str, tuple[int, int, str]] = {}
+
+
 def static_asset_version(asset_name: str) -> str:
     try:
         name = str(asset_name or "").strip().lstrip("/")
@@ -40,10 +46,15 @@ def static_asset_version(asset_name: str) -> str:
         p = (static_dir / name).resolve()
         if static_dir not in p.parents and p != static_dir:
             return _get_app_version()
-        if not p.exists() or not p.is_file():
+        if not p.is_file():
             return _get_app_version()
-        data = p.read_bytes()
-        h = hashlib.sha1(data).hexdigest()[:10]
+        st = p.stat()
+        cached = _asset_hash_cache.get(name)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            h = cached[2]
+        else:
+            h = hashlib.sha1(p.read_bytes()).hexdigest()[:10]
+            _asset_hash_cache[name] = (st.st_mtime_ns, st.st_size, h)
         return f"{_get_app_version()}-{h}"
     except Exception:
         return _get_app_version()
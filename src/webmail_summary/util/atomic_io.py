@@ -1,27 +1,52 @@
 from __future__ import annotations
 
+import codecs
 import os
 import tempfile
+from collections.abc import Callable
 from pathlib import Path
+from typing import BinaryIO
 
 
-def atomic_write_bytes(path: Path, data: bytes) -> None:
+_WRITE_BUFFER_BYTES = 1 << 20
+# Text is encoded in slices of this many characters, so a large body never
+# needs a second full-size bytes copy next to the str.
+_ENCODE_CHUNK_CHARS = 1 << 18
+
+
+def _atomic_write(path: Path, write: Callable[[BinaryIO], object]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     fd, tmp = tempfile.mkstemp(prefix=path.name + ".", dir=str(path.parent))
     tmp_path = Path(tmp)
     try:
-        with os.fdopen(fd, "wb") as f:
-            f.write(data)
+        with os.fdopen(fd, "wb", buffering=_WRITE_BUFFER_BYTES) as f:
+            write(f)
             f.flush()
             os.fsync(f.fileno())
         tmp_path.replace(path)
-    finally:
+    except BaseException:
         try:
-            if tmp_path.exists():
-                tmp_path.unlink()
+            tmp_path.unlink(missing_ok=True)
         except Exception:
             pass
+        raise
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    _atomic_write(path, lambda f: f.write(data))
 
 
 def atomic_write_text(path: Path, text: str, *, encoding: str = "utf-8") -> None:
-    atomic_write_bytes(path, text.encode(encoding, errors="replace"))
+    if len(text) <= _ENCODE_CHUNK_CHARS:
+        atomic_write_bytes(path, text.encode(encoding, errors="replace"))
+        return
+
+    def write(f: BinaryIO) -> None:
+        # Incremental encoder keeps BOM/stateful encodings correct across
+        # slice boundaries.
+        enc = codecs.getincrementalencoder(encoding)(errors="replace")
+        for i in range(0, len(text), _ENCODE_CHUNK_CHARS):
+            f.write(enc.encode(text[i : i + _ENCODE_CHUNK_CHARS]))
+        f.write(enc.encode("", final=True))
+
+    _atomic_write(path, write)
@@ -83,6 +83,32 @@ def _validate_public_host(url: str) -> None:
             raise DownloadBlocked("private ip blocked")
 
 
+def _read_into(
+    r: requests.Response,
+    buffer: bytearray,
+    *,
+    max_bytes: int,
+    deadline_monotonic: float | None,
+) -> Iterator[memoryview]:
+    raw = r.raw
+    # Same transfer decoding (gzip/deflate) as iter_content().
+    raw.decode_content = True
+    view = memoryview(buffer)
+    total = 0
+    while True:
+        n = raw.readinto(view)
+        if not n:
+            return
+        if deadline_monotonic is not None and time.monotonic() > float(
+            deadline_monotonic
+        ):
+            raise DownloadBlocked("time budget exceeded")
+        total += n
+        if total > max_bytes:
+            raise DownloadBlocked("download exceeds max_bytes")
+        yield view[:n]
+
+
 def stream_download(
     *,
     url: str,
@@ -90,7 +116,14 @@ def stream_download(
     max_bytes: int,
     user_agent: str,
     deadline_monotonic: float | None = None,
-) -> Iterator[bytes]:
+    buffer: bytearray | None = None,
+) -> Iterator[bytes | memoryview]:
+    """Yield the body of ``url`` in chunks, enforcing size and time budgets.
+
+    When ``buffer`` is given, the body is read into it and each chunk is a
+    memoryview over that buffer, valid only until the next iteration. This
+    lets callers that copy chunks straight to a file reuse one allocation.
+    """
     p = urlparse(url)
     if p.scheme not in {"http", "https"}:
         raise DownloadBlocked(f"scheme not allowed: {p.scheme}")
@@ -111,6 +144,11 @@ def stream_download(
     ) as r:
         r.raise_for_status()
         total = 0
+        if buffer is not None:
+            yield from _read_into(
+                r, buffer, max_bytes=max_bytes, deadline_monotonic=deadline_monotonic
+            )
+            return
         for chunk in r.iter_content(chunk_size=1024 * 128):
             if deadline_monotonic is not None and time.monotonic() > float(
                 deadline_monotonic
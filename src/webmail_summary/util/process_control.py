@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import select
 import signal
 import subprocess
 
@@ -48,6 +49,21 @@ def hidden_subprocess_kwargs() -> dict:
     }
 
 
+def process_group_subprocess_kwargs() -> dict:
+    """Hidden-window kwargs that also start the child as a process group leader.
+
+    terminate_process_tree can then signal the whole group at once on POSIX.
+    """
+    kwargs = hidden_subprocess_kwargs()
+    if is_windows():
+        kwargs["creationflags"] = int(kwargs.get("creationflags", 0)) | int(
+            getattr(subprocess, "CREATE_NEW_PROCESS_GROUP", 0)
+        )
+    else:
+        kwargs["start_new_session"] = True
+    return kwargs
+
+
 def detached_subprocess_kwargs() -> dict:
     if not is_windows():
         return {}
@@ -74,4 +90,31 @@ def terminate_process_tree(pid: int) -> None:
     if is_windows():
         run_quiet_command(["taskkill", "/PID", str(int(pid)), "/T", "/F"], check=False)
         return
-    os.kill(int(pid), signal.SIGTERM)
+    pid = int(pid)
+    # Only signal a group the child leads; otherwise we could hit our own.
+    if os.getpgid(pid) == pid:
+        os.killpg(pid, signal.SIGTERM)
+        return
+    os.kill(pid, signal.SIGTERM)
+
+
+def open_pidfd(pid: int) -> int | None:
+    """Return a pidfd for pid on Linux, or None where pidfds are unavailable."""
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is None:
+        return None
+    try:
+        return int(pidfd_open(int(pid)))
+    except OSError:
+        return None
+
+
+def wait_pidfd(pidfd: int, timeout: float | None) -> bool:
+    """Block until the pidfd's process exits; False if timeout elapsed first."""
+    ready, _, _ = select.select([pidfd], [], [], timeout)
+    return bool(ready)
+
+
+def kill_pidfd(pidfd: int) -> None:
+    # The pidfd pins the process, so a recycled pid can never be signalled.
+    signal.pidfd_send_signal(pidfd, signal.SIGKILL)
@@ -1,6 +1,33 @@
 from __future__ import annotations
 
 import re
+from pathlib import Path
+
+import lxml.etree as etree
+
+# Same C parser as archive.html_rewrite, driven as a push parser with a
+# target so no tree is built: bodies can be several MB of markup.
+_FEED_CHARS = 64 * 1024
+
+# Subtrees that never hold visible mail text.
+_DROP_TAGS = frozenset(
+    {"script", "style", "noscript", "head", "title", "meta", "blockquote"}
+)
+_QUOTE_CLASSES = frozenset({"gmail_quote", "protonmail_quote", "yahoo_quoted"})
+_HIDDEN_STYLES = (
+    "display:none",
+    "display: none",
+    "visibility:hidden",
+    "visibility: hidden",
+)
+# bs4 get_text("\n") rules, kept so the output matches a BeautifulSoup tree
+# built with the lxml parser: whitespace-only strings collapse to one
+# space/newline outside pre/textarea, and strings under rt/rp/template are
+# not text. The original html.parser tree can differ on malformed markup
+# (libxml2 closes and nests tags its own way).
+_PRESERVE_WS_TAGS = frozenset({"pre", "textarea"})
+_NON_TEXT_TAGS = frozenset({"rt", "rp", "template"})
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
 
 
 _HARD_REPLY_SPLIT_PATTERNS = [
@@ -14,19 +41,103 @@ _HEADER_BLOCK_PATTERNS = [
 ]
 
 
+def _is_hidden(tag: str, attrib) -> bool:
+    if tag in _DROP_TAGS:
+        return True
+    if _QUOTE_CLASSES.intersection(str(attrib.get("class") or "").split()):
+        return True
+    style = str(attrib.get("style") or "")
+    return any(s in style for s in _HIDDEN_STYLES)
+
+
+class _VisibleTextTarget:
+    """lxml parser target that keeps the text strings outside hidden subtrees."""
+
+    def __init__(self) -> None:
+        self.parts: list[str] = []
+        self._pending: list[str] = []
+        self._hidden_depth = 0
+        self._preserve_depth = 0
+        self._non_text_depth = 0
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        if not self._preserve_depth and not text.strip(_ASCII_SPACES):
+            text = "\n" if "\n" in text else " "
+        if not self._non_text_depth:
+            self.parts.append(text)
+
+    def start(self, tag, attrib, nsmap=None) -> None:
+        self._flush()
+        if self._hidden_depth or _is_hidden(tag, attrib):
+            self._hidden_depth += 1
+            return
+        if tag in _PRESERVE_WS_TAGS:
+            self._preserve_depth += 1
+        if tag in _NON_TEXT_TAGS:
+            self._non_text_depth += 1
+
+    def end(self, tag) -> None:
+        self._flush()
+        if self._hidden_depth:
+            self._hidden_depth -= 1
+            return
+        if tag in _PRESERVE_WS_TAGS:
+            self._preserve_depth -= 1
+        if tag in _NON_TEXT_TAGS:
+            self._non_text_depth -= 1
+
+    def data(self, data) -> None:
+        if not self._hidden_depth:
+            self._pending.append(data)
+
+    # Comments, processing instructions and doctypes are not text, but
+    # they still end the string before them.
+    def comment(self, text) -> None:
+        self._flush()
+
+    def pi(self, target, data=None) -> None:
+        self._flush()
+
+    def doctype(self, *args) -> None:
+        self._flush()
+
+    def close(self) -> str:
+        self._flush()
+        return "\n".join(self.parts)
+
+
+def _visible_text_from_chunks(chunks) -> str:
+    parser = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if parser is None:
+            if chunk[0] == "\ufeff":
+                chunk = chunk[1:]
+                if not chunk:
+                    continue
+            parser = etree.HTMLParser(target=_VisibleTextTarget(), recover=True)
+        parser.feed(chunk)
+    if parser is None:
+        return ""
+    return parser.close()
+
+
 def html_to_visible_text(html: str) -> str:
-    from bs4 import BeautifulSoup
+    text = str(html or "")
+    return _visible_text_from_chunks(
+        text[i : i + _FEED_CHARS] for i in range(0, len(text), _FEED_CHARS)
+    )
+
 
-    soup = BeautifulSoup(str(html or ""), "html.parser")
-    for tag in soup(["script", "style", "noscript", "head", "title", "meta"]):
-        tag.decompose()
-    for node in soup.select(
-        "blockquote, .gmail_quote, .protonmail_quote, .yahoo_quoted, "
-        "[style*='display:none'], [style*='display: none'], "
-        "[style*='visibility:hidden'], [style*='visibility: hidden']"
-    ):
-        node.decompose()
-    return soup.get_text("\n")
+def html_file_to_visible_text(path: str | Path) -> str:
+    """html_to_visible_text for a file, fed in chunks instead of read whole."""
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        return _visible_text_from_chunks(iter(lambda: f.read(_FEED_CHARS), ""))
 
 
 def prepare_body_for_llm(body: str, *, max_chars: int = 7000) -> str:
@@ -96,6 +207,9 @@ def sanitize_text_for_llm(text: str) -> str:
     s = str(text or "")
     if "\x00" in s:
         s = s.replace("\x00", " ")
+    if s.isascii():
+        # Surrogates are never ASCII; skip the two full-length copies below.
+        return s
     # Force a valid UTF-8 roundtrip to eliminate lone surrogates.
     try:
         s = s.encode("utf-8", errors="replace").decode("utf-8", errors="replace")
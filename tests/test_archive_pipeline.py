@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from email.message import EmailMessage
+
+from webmail_summary.archive.paths import get_message_paths
+from webmail_summary.archive.pipeline import _archive_walk, archive_message
+
+
+def test_archive_walk_ignores_text_attachments_for_body(tmp_path):
+    msg = EmailMessage()
+    msg.set_content("plain body")
+    msg.add_alternative("<p>html body</p>", subtype="html")
+    msg.add_attachment("attached notes", subtype="plain", filename="notes.txt")
+
+    attachments, _cid_map, html, text = _archive_walk(msg, tmp_path)
+
+    assert html is not None and "html body" in html
+    assert text is not None and text.strip() == "plain body"
+    assert [a.filename for a in attachments] == ["notes.txt"]
+
+
+def test_archive_walk_skips_attachment_when_no_inline_text(tmp_path):
+    msg = EmailMessage()
+    msg.set_content("<p>only html</p>", subtype="html")
+    msg.add_attachment("attached notes", subtype="plain", filename="notes.txt")
+
+    _attachments, _cid_map, html, text = _archive_walk(msg, tmp_path)
+
+    assert html is not None and "only html" in html
+    assert text is None
+
+
+def _html_mail_bytes() -> bytes:
+    msg = EmailMessage()
+    msg["Subject"] = "hi"
+    msg.set_content("<p>only html</p>", subtype="html")
+    return msg.as_bytes()
+
+
+def test_archive_message_writes_rendered_html_only(tmp_path):
+    paths = get_message_paths(
+        data_root=tmp_path, account_id="a", mailbox="INBOX", uidvalidity=1, uid=7
+    )
+    ar = archive_message(
+        raw_rfc822=_html_mail_bytes(), paths=paths, external_max_bytes=1024
+    )
+
+    assert not paths.body_html.exists()
+    assert ar.rendered_html_path is not None
+    assert "only html" in ar.rendered_html_path.read_text(encoding="utf-8")
+
+
+def test_archive_message_stores_visible_text_of_original_html(tmp_path):
+    msg = EmailMessage()
+    msg["Subject"] = "hi"
+    msg.set_content(
+        "<html><head><title>Weekly Newsletter from ACME</title></head><body>"
+        '<div style="display:none">Preheader hidden text here</div>'
+        "<p>Hello world</p></body></html>",
+        subtype="html",
+    )
+    paths = get_message_paths(
+        data_root=tmp_path, account_id="a", mailbox="INBOX", uidvalidity=1, uid=7
+    )
+    ar = archive_message(
+        raw_rfc822=msg.as_bytes(), paths=paths, external_max_bytes=1024
+    )
+
+    assert ar.body_text_path == paths.body_text
+    assert paths.body_text.read_text(encoding="utf-8").strip() == "Hello world"
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from webmail_summary.util import atomic_io
+
+
+def test_atomic_write_text_large_payload_matches_encode(tmp_path, monkeypatch):
+    monkeypatch.setattr(atomic_io, "_ENCODE_CHUNK_CHARS", 7)
+    text = "안녕하세요 hello " * 50
+    path = tmp_path / "out" / "note.md"
+
+    atomic_io.atomic_write_text(path, text)
+
+    assert path.read_bytes() == text.encode("utf-8")
+    assert [p.name for p in path.parent.iterdir()] == ["note.md"]
+
+
+def test_atomic_write_text_utf16_has_single_bom(tmp_path, monkeypatch):
+    monkeypatch.setattr(atomic_io, "_ENCODE_CHUNK_CHARS", 3)
+    path = tmp_path / "u16.txt"
+
+    atomic_io.atomic_write_text(path, "abcdefgh", encoding="utf-16")
+
+    assert path.read_bytes() == "abcdefgh".encode("utf-16")
+
+
+def test_atomic_write_bytes_leaves_no_temp_file_on_failure(tmp_path):
+    path = tmp_path / "x.bin"
+
+    try:
+        atomic_io.atomic_write_bytes(path, "not bytes")  # type: ignore[arg-type]
+    except TypeError:
+        pass
+
+    assert list(tmp_path.iterdir()) == []
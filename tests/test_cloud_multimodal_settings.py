@@ -29,3 +29,39 @@ def test_load_settings_reads_cloud_multimodal_enabled():
         assert s.cloud_multimodal_enabled is True
     finally:
         conn.close()
+
+
+def test_load_settings_reads_all_keys_in_one_query():
+    conn = _mk_conn()
+    try:
+        set_setting(conn, "imap_port", "143")
+        set_setting(conn, "ui_theme", "trust")
+        conn.commit()
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+
+        s = load_settings(conn)
+
+        assert (s.imap_port, s.ui_theme) == (143, "bento")
+        assert len([q for q in statements if "FROM settings" in q]) == 1
+    finally:
+        conn.close()
+
+
+def test_load_settings_parses_bools_and_returns_independent_role_lists():
+    conn = _mk_conn()
+    try:
+        set_setting(conn, "revert_seen_after_sync", " TRUE ")
+        set_setting(conn, "update_auto_check_enabled", "off")
+        set_setting(conn, "user_roles", '["dev", "pm"]')
+        conn.commit()
+
+        first = load_settings(conn)
+        first.user_roles.append("mutated")
+        second = load_settings(conn)
+
+        assert first.revert_seen_after_sync is True
+        assert first.update_auto_check_enabled is False
+        assert second.user_roles == ["dev", "pm"]
+    finally:
+        conn.close()
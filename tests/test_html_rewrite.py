@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from webmail_summary.archive import html_rewrite
+
+
+def test_rewrite_maps_cid_references_in_attrs_and_css(tmp_path):
+    html = (
+        "<html><head><style>.a{background:url(cid:bg@x)}</style></head>"
+        '<body><img src="cid:<logo@x>"><div style="background:url(\'cid:bg@x\')">'
+        "hi</div></body></html>"
+    )
+    out, assets = html_rewrite.rewrite_html_and_download_assets(
+        html=html,
+        external_dir=tmp_path / "external",
+        cid_map={"logo@x": "attachments/logo.png", "bg@x": "attachments/bg.png"},
+        max_total_bytes=1024,
+    )
+
+    assert assets == []
+    assert 'src="attachments/logo.png"' in out
+    assert "url(attachments/bg.png)" in out
+    assert "cid:" not in out
+
+
+def test_rewrite_returns_input_untouched_without_rewritable_refs(tmp_path):
+    html = "<p>plain <b>body</b> with a relative <img src='a.png'></p>"
+    out, assets = html_rewrite.rewrite_html_and_download_assets(
+        html=html,
+        external_dir=tmp_path / "external",
+        cid_map={},
+        max_total_bytes=1024,
+    )
+
+    assert out == html
+    assert assets == []
+
+
+def test_rewrite_streams_downloads_to_disk(tmp_path, monkeypatch):
+    def fake_stream_download(*, url, **_kw):
+        yield b"abc"
+        yield b"def"
+
+    monkeypatch.setattr(html_rewrite, "stream_download", fake_stream_download)
+    out, assets = html_rewrite.rewrite_html_and_download_assets(
+        html='<img src="https://example.com/a.png">',
+        external_dir=tmp_path / "external",
+        cid_map={},
+        max_total_bytes=1024,
+    )
+
+    assert len(assets) == 1
+    asset = assets[0]
+    assert asset.status == "downloaded"
+    assert asset.size_bytes == 6
+    assert asset.rel_path and asset.rel_path in out
+    assert (tmp_path / asset.rel_path).read_bytes() == b"abcdef"
+
+
+def test_rewrite_removes_partial_file_on_failed_download(tmp_path, monkeypatch):
+    def fake_stream_download(*, url, **_kw):
+        yield b"abc"
+        raise html_rewrite.DownloadBlocked("download exceeds max_bytes")
+
+    monkeypatch.setattr(html_rewrite, "stream_download", fake_stream_download)
+    _out, assets = html_rewrite.rewrite_html_and_download_assets(
+        html='<img src="https://example.com/a.png">',
+        external_dir=tmp_path / "external",
+        cid_map={},
+        max_total_bytes=1024,
+    )
+
+    assert assets[0].status.startswith("blocked:")
+    assert list((tmp_path / "external").iterdir()) == []
+
+
+def test_rewrite_failed_redownload_leaves_hardlinked_copy_intact(tmp_path, monkeypatch):
+    body = [b"old-bytes"]
+
+    def fake_stream_download(*, url, **_kw):
+        yield from body
+        if body[0] == b"PART":
+            raise html_rewrite.DownloadBlocked("download exceeds max_bytes")
+
+    monkeypatch.setattr(html_rewrite, "stream_download", fake_stream_download)
+
+    def run():
+        return html_rewrite.rewrite_html_and_download_assets(
+            html='<img src="https://example.com/a.png">',
+            external_dir=tmp_path / "external",
+            cid_map={},
+            max_total_bytes=1024,
+        )[1]
+
+    rel = run()[0].rel_path
+    assert rel is not None
+    vault_copy = tmp_path / "vault.png"
+    os.link(tmp_path / rel, vault_copy)
+
+    body[0] = b"PART"
+    assert run()[0].status.startswith("blocked:")
+    assert vault_copy.read_bytes() == b"old-bytes"
+    assert sorted(p.name for p in (tmp_path / "external").iterdir()) == [Path(rel).name]
+
+
+def test_rewrite_fetches_each_url_once_and_keeps_document_order(tmp_path, monkeypatch):
+    calls: list[str] = []
+
+    def fake_stream_download(*, url, **_kw):
+        calls.append(url)
+        yield url.encode("ascii")
+
+    monkeypatch.setattr(html_rewrite, "stream_download", fake_stream_download)
+    html = (
+        '<div style="background:url(https://example.com/bg.png)">'
+        '<img src="https://example.com/logo.png">'
+        '<img src="https://EXAMPLE.com/logo.png#top"></div>'
+    )
+    out, assets = html_rewrite.rewrite_html_and_download_assets(
+        html=html,
+        external_dir=tmp_path / "external",
+        cid_map={},
+        max_total_bytes=1024,
+    )
+
+    assert sorted(calls) == ["https://example.com/bg.png", "https://example.com/logo.png"]
+    assert [a.original_url for a in assets] == [
+        "https://example.com/bg.png",
+        "https://example.com/logo.png",
+        "https://EXAMPLE.com/logo.png#top",
+    ]
+    assert [a.status for a in assets] == ["downloaded", "downloaded", "deduped"]
+    assert assets[2].rel_path == assets[1].rel_path
+    assert assets[2].size_bytes is None
+    assert "example.com" not in out.lower()
+
+
+def test_rewrite_marks_urls_past_asset_limit_as_skipped(tmp_path, monkeypatch):
+    def fake_stream_download(*, url, **_kw):
+        yield b"x"
+
+    monkeypatch.setattr(html_rewrite, "stream_download", fake_stream_download)
+    html = "".join(f'<img src="https://example.com/{i}.png">' for i in range(3))
+    _out, assets = html_rewrite.rewrite_html_and_download_assets(
+        html=html,
+        external_dir=tmp_path / "external",
+        cid_map={},
+        max_total_bytes=1024,
+        max_assets=2,
+    )
+
+    assert [a.status for a in assets] == [
+        "downloaded",
+        "downloaded",
+        "skipped_assets_limit",
+    ]
+
+
+def test_guess_ext_prefers_url_suffix_then_content_type():
+    _guess_ext = html_rewrite._guess_ext
+
+    assert _guess_ext(None, "https://x.test/a/logo.PNG?x=1") == ".PNG"
+    assert _guess_ext("image/JPEG", "https://x.test/img") == ".jpg"
+    assert _guess_ext("image/svg+xml", "https://x.test/a.b/") == ".svg"
+    assert _guess_ext(None, "https://x.test/file.toolongext") == ".bin"
+    assert _guess_ext(None, "https://x.test/trailing.") == ".bin"
+
+
+def test_regex_rewriter_handles_entities_and_ignores_comments(tmp_path, monkeypatch):
+    calls: list[str] = []
+
+    def fake_stream_download(*, url, **_kw):
+        calls.append(url)
+        yield b"x"
+
+    monkeypatch.setattr(html_rewrite, "stream_download", fake_stream_download)
+    html = (
+        "<!-- <img src='https://example.com/hidden.png'> -->"
+        '<p title="src=https://example.com/not-an-attr.png">'
+        "<img src='https://example.com/a.png?x=1&amp;y=2'></p>"
+    )
+    out, assets = html_rewrite.rewrite_html_and_download_assets(
+        html=html,
+        external_dir=tmp_path / "external",
+        cid_map={},
+        max_total_bytes=1024,
+    )
+
+    assert calls == ["https://example.com/a.png?x=1&y=2"]
+    assert [a.original_url for a in assets] == calls
+    assert f'src="{assets[0].rel_path}"' in out
+    assert out.startswith("<!-- <img src='https://example.com/hidden.png'> -->")
+
+
+def test_rewrite_falls_back_to_soup_for_malformed_markup(tmp_path, monkeypatch):
+    def fake_stream_download(*, url, **_kw):
+        yield b"x"
+
+    monkeypatch.setattr(html_rewrite, "stream_download", fake_stream_download)
+    html = '<img src="cid:logo@x"><img src="https://example.com/a.png><p>x</p>'
+    assert html_rewrite._scan_with_regex(html, {}) is None
+
+    out, _assets = html_rewrite.rewrite_html_and_download_assets(
+        html=html,
+        external_dir=tmp_path / "external",
+        cid_map={"logo@x": "attachments/logo.png"},
+        max_total_bytes=1024,
+    )
+
+    assert 'src="attachments/logo.png"' in out
+
+
+def test_url_suffix_matches_path_extension():
+    _url_suffix = html_rewrite._url_suffix
+
+    assert _url_suffix("https://x.test/a/logo.png?v=1.2") == ".png"
+    assert _url_suffix("https://x.test/file.tar.gz#part.1") == ".gz"
+    assert _url_suffix("https://cdn.x.test") == ""
+    assert _url_suffix("https://x.test/dir.v2/") == ""
+    assert _url_suffix("https://x.test/.hidden") == ""
@@ -2,6 +2,10 @@ from __future__ import annotations
 
 import datetime as dt
 
+import pytest
+from imapclient.exceptions import IMAPClientError
+
+from webmail_summary import imap_client
 from webmail_summary.imap_client import (
     ImapSession,
     MailSearchFilter,
@@ -29,6 +33,9 @@ class _FakeClient:
         out = {}
         for uid in uid_list:
             payload = dict(self._fetch_payload.get(int(uid), {}))
+            if field_list == ["RFC822.SIZE"]:
+                out[int(uid)] = {b"RFC822.SIZE": payload.get(b"RFC822.SIZE", 100)}
+                continue
             want_body = any(f in {"BODY.PEEK[]", "RFC822"} for f in field_list)
             if "FLAGS" in field_list or "INTERNALDATE" in field_list:
                 out[int(uid)] = {
@@ -209,3 +216,81 @@ def test_iter_messages_reports_fetch_progress_per_chunk():
     assert [m.uid for m in out] == [1, 2, 3]
     assert [m.rfc822 for m in out] == [b"raw-1", b"raw-2", b"raw-3"]
     assert progress == [(2, 3), (3, 3)]
+
+
+def test_iter_messages_fetches_metadata_and_body_in_one_round_trip():
+    fake = _FakeClient(
+        fetch_payload={
+            1: {b"FLAGS": (b"\\Seen",), b"BODY.PEEK[]": b"raw-1"},
+            2: {b"FLAGS": tuple(), b"BODY.PEEK[]": b"raw-2"},
+        }
+    )
+
+    out = list(_session(fake).iter_messages([1, 2], chunk_size=2))
+
+    assert fake.fetch_calls == [
+        ([1, 2], ["RFC822.SIZE"]),
+        ([1, 2], ["FLAGS", "INTERNALDATE", "BODY.PEEK[]"]),
+    ]
+    assert [m.rfc822 for m in out] == [b"raw-1", b"raw-2"]
+    assert out[0].flags == (b"\\Seen",)
+
+
+def test_iter_messages_falls_back_to_split_fetch_when_combined_fails():
+    class _SplitOnlyClient(_FakeClient):
+        def fetch(self, uids, fields):
+            if len(fields) > 2:
+                self.fetch_calls.append(([int(x) for x in uids], list(fields)))
+                raise IMAPClientError("FETCH command error: BAD")
+            return super().fetch(uids, fields)
+
+    fake = _SplitOnlyClient(
+        fetch_payload={
+            1: {b"FLAGS": tuple(), b"BODY.PEEK[]": b"raw-1"},
+            2: {b"FLAGS": tuple(), b"BODY.PEEK[]": b"raw-2"},
+        }
+    )
+
+    out = list(_session(fake).iter_messages([1, 2], chunk_size=1))
+
+    assert [m.rfc822 for m in out] == [b"raw-1", b"raw-2"]
+    # The combined form is only attempted once per run.
+    combined = [c for c in fake.fetch_calls if len(c[1]) > 2]
+    assert len(combined) == 1
+
+
+def test_iter_messages_does_not_fall_back_on_connection_errors():
+    class _DroppingClient(_FakeClient):
+        def fetch(self, uids, fields):
+            if len(fields) > 2:
+                self.fetch_calls.append(([int(x) for x in uids], list(fields)))
+                raise OSError("socket error: connection reset by peer")
+            return super().fetch(uids, fields)
+
+    class _NoReconnectSession(_FakeSession):
+        def reconnect(self):
+            pass
+
+    fake = _DroppingClient()
+
+    with pytest.raises(OSError):
+        list(_NoReconnectSession(fake).iter_messages([1, 2], chunk_size=2))
+    assert not any(c[1] == ["FLAGS", "INTERNALDATE"] for c in fake.fetch_calls)
+
+
+def test_iter_messages_bounds_body_batches_by_size(monkeypatch):
+    monkeypatch.setattr(imap_client, "FETCH_BATCH_MAX_BYTES", 250)
+    fake = _FakeClient(
+        fetch_payload={
+            1: {b"RFC822.SIZE": 100},
+            2: {b"RFC822.SIZE": 100},
+            3: {b"RFC822.SIZE": 400},
+            4: {b"RFC822.SIZE": 10},
+        }
+    )
+
+    out = list(_session(fake).iter_messages([1, 2, 3, 4], chunk_size=10))
+
+    assert [m.uid for m in out] == [1, 2, 3, 4]
+    body_calls = [c[0] for c in fake.fetch_calls if "BODY.PEEK[]" in c[1]]
+    assert body_calls == [[1, 2], [3], [4]]
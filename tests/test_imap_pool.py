@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import cast
+
+import pytest
+
+import webmail_summary.imap_client as imap_client
+
+
+class _FakeClient:
+    instances: list["_FakeClient"] = []
+
+    def __init__(self, host, port=None, ssl=True, ssl_context=None, timeout=None):
+        self.logged_out = False
+        self.noop_ok = True
+        _FakeClient.instances.append(self)
+
+    def login(self, user, password):
+        return None
+
+    def noop(self):
+        if not self.noop_ok:
+            raise OSError("connection reset")
+
+    def logout(self):
+        self.logged_out = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    _FakeClient.instances = []
+    monkeypatch.setattr(imap_client, "IMAPClient", _FakeClient)
+    p = imap_client.ImapConnectionPool(idle_s=60)
+    monkeypatch.setattr(imap_client, "_POOL", p)
+    yield p
+    p.close_all()
+
+
+def _session(password: str = "pw") -> imap_client.ImapSession:
+    return imap_client.ImapSession("imap.example.com", 993, "user", password)
+
+
+def _fake(session: imap_client.ImapSession) -> _FakeClient:
+    return cast(_FakeClient, session.client)
+
+
+def test_session_reuses_pooled_connection(pool):
+    with _session() as s1:
+        first = _fake(s1)
+    with _session() as s2:
+        assert s2.client is first
+
+    assert len(_FakeClient.instances) == 1
+    assert not first.logged_out
+
+
+def test_changed_password_or_failed_session_does_not_reuse(pool):
+    with _session() as s1:
+        first = _fake(s1)
+    with _session("other") as s2:
+        assert s2.client is not first
+
+    with pytest.raises(RuntimeError):
+        with _session() as s3:
+            reused = _fake(s3)
+            raise RuntimeError("boom")
+    assert reused is first and first.logged_out
+
+
+def test_dead_pooled_connection_is_replaced(pool):
+    with _session() as s1:
+        first = _fake(s1)
+    first.noop_ok = False
+
+    with _session() as s2:
+        assert s2.client is not first
+    assert first.logged_out
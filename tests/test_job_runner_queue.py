@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import sys
+import threading
+
+from webmail_summary.index.db import get_conn, init_db
+from webmail_summary.jobs import repo, runner
+
+
+def test_runner_runs_queued_jobs_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "get_app_data_dir", lambda: tmp_path)
+    init_db(tmp_path / "db.sqlite3")
+    order: list[str] = []
+    done = threading.Event()
+
+    def job(name: str, last: bool = False):
+        def fn(job_id: str, cancel: threading.Event) -> None:
+            order.append(name)
+            if last:
+                done.set()
+
+        return fn
+
+    r = runner.JobRunner()
+    ids = [
+        r.enqueue(kind="test", fn=job("a")),
+        r.enqueue(kind="test", fn=job("b")),
+        r.enqueue(kind="test", fn=job("c", last=True)),
+    ]
+
+    assert done.wait(5)
+    assert order == ["a", "b", "c"]
+    conn = get_conn(tmp_path / "db.sqlite3")
+    try:
+        # The last job's final status write may still be in flight.
+        first = repo.get_job(conn, ids[0])
+        assert first is not None and first.status == "succeeded"
+    finally:
+        conn.close()
+
+
+def test_sync_worker_process_is_reused_until_it_dies(monkeypatch):
+    echo = "import sys\nfor line in sys.stdin:\n    print('OK', line.strip(), flush=True)"
+    monkeypatch.setattr(
+        runner, "_sync_worker_command", lambda: [sys.executable, "-c", echo]
+    )
+    r = runner.JobRunner()
+
+    first = r._submit_sync("a")
+    assert first.replies.get(timeout=10) == "OK a"
+    assert r._submit_sync("b") is first
+    assert first.replies.get(timeout=10) == "OK b"
+
+    first.proc.kill()
+    first.proc.wait(timeout=10)
+    second = r._submit_sync("c")
+    try:
+        assert second is not first
+        assert second.replies.get(timeout=10) == "OK c"
+    finally:
+        second.close()
+        second.proc.wait(timeout=10)
+        first.close()
+
+
+def test_cancel_marks_queued_job_so_it_never_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "get_app_data_dir", lambda: tmp_path)
+    init_db(tmp_path / "db.sqlite3")
+    release = threading.Event()
+    done = threading.Event()
+    ran: list[str] = []
+
+    def blocker(job_id: str, cancel: threading.Event) -> None:
+        release.wait(5)
+
+    def victim(job_id: str, cancel: threading.Event) -> None:
+        ran.append("victim")
+
+    def last(job_id: str, cancel: threading.Event) -> None:
+        done.set()
+
+    r = runner.JobRunner()
+    r.enqueue(kind="test", fn=blocker)
+    victim_id = r.enqueue(kind="test", fn=victim)
+    r.enqueue(kind="test", fn=last)
+
+    assert r.cancel(victim_id) is True
+    release.set()
+    assert done.wait(5)
+    assert ran == []
+    conn = get_conn(tmp_path / "db.sqlite3")
+    try:
+        victim_job = repo.get_job(conn, victim_id)
+        assert victim_job is not None and victim_job.status == "cancelled"
+    finally:
+        conn.close()
+
+
+def test_enqueue_blocks_while_the_queue_is_full(tmp_path, monkeypatch):
+    monkeypatch.setattr(runner, "get_app_data_dir", lambda: tmp_path)
+    init_db(tmp_path / "db.sqlite3")
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocker(job_id: str, cancel: threading.Event) -> None:
+        started.set()
+        release.wait(5)
+
+    def noop(job_id: str, cancel: threading.Event) -> None:
+        pass
+
+    r = runner.JobRunner(max_queued=1)
+    r.enqueue(kind="test", fn=blocker)
+    assert started.wait(5)
+    r.enqueue(kind="test", fn=noop)
+
+    third = threading.Thread(target=lambda: r.enqueue(kind="test", fn=noop))
+    third.start()
+    third.join(0.2)
+    assert third.is_alive()
+
+    release.set()
+    third.join(5)
+    assert not third.is_alive()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from webmail_summary.index.db import get_conn, init_db
+from webmail_summary.jobs import repo
+
+
+def _insert_job(conn, job_id: str, updated_at: datetime) -> None:
+    ts = updated_at.isoformat()
+    conn.execute(
+        "INSERT INTO jobs(id, kind, status, progress_current, progress_total, message, created_at, updated_at) "
+        "VALUES (?, 'sync', 'running', 0, 0, '', ?, ?)",
+        (job_id, ts, ts),
+    )
+    conn.commit()
+
+
+def test_find_active_job_max_age_filters_stale_rows(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    conn = get_conn(db_path)
+    try:
+        _insert_job(conn, "old", datetime.now(timezone.utc) - timedelta(hours=1))
+
+        assert repo.find_active_job(conn, kind="sync", max_age_s=1800) is None
+        stale = repo.find_active_job(conn, kind="sync")
+        assert stale is not None and stale.id == "old"
+
+        _insert_job(conn, "fresh", datetime.now(timezone.utc))
+        active = repo.find_active_job(conn, kind="sync", max_age_s=1800)
+        assert active is not None and active.id == "fresh"
+    finally:
+        conn.close()
+
+
+def test_update_progress_coalesces_small_repeated_updates(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    conn = get_conn(db_path)
+    try:
+        repo.create_job(conn, job_id="j", kind="sync")
+        repo.update_progress(conn, job_id="j", current=1, total=1000, message="fetch")
+        repo.update_progress(conn, job_id="j", current=2, total=1000, message="fetch")
+
+        job = repo.get_job(conn, "j")
+        assert job is not None and job.progress_current == 1
+
+        # A new message is always written immediately.
+        repo.update_progress(conn, job_id="j", current=3, total=1000, message="index")
+        job = repo.get_job(conn, "j")
+        assert job is not None and job.progress_current == 3
+
+        repo.update_progress(conn, job_id="j", current=4, total=1000, message="index")
+        repo.set_job_status(conn, job_id="j", status="succeeded")
+        job = repo.get_job(conn, "j")
+        assert job is not None
+        assert (job.progress_current, job.status) == (4, "succeeded")
+    finally:
+        conn.close()
+
+
+def test_get_events_since_pages_through_the_job_events_index(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    conn = get_conn(db_path)
+    try:
+        _insert_job(conn, "j1", datetime.now(timezone.utc))
+        for i in range(5):
+            repo.add_event(conn, job_id="j1", level="info", text=f"e{i}")
+
+        first = repo.get_events_since(conn, job_id="j1", last_id=0, limit=3)
+        rest = repo.get_events_since(conn, job_id="j1", last_id=int(first[-1][0]))
+
+        assert [r[3] for r in first] == ["e0", "e1", "e2"]
+        assert [r[3] for r in rest] == ["e3", "e4"]
+        plan = " ".join(
+            str(r[-1])
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN " + repo._EVENTS_SINCE_SQL, ("j1", 0, 3)
+            )
+        )
+        assert "idx_job_events_job_id_id" in plan
+    finally:
+        conn.close()
+
+
+def test_find_active_job_seeks_the_partial_active_index(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    conn = get_conn(db_path)
+    try:
+        plan = " ".join(
+            str(r[-1])
+            for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM jobs WHERE kind = ? "
+                "AND status IN ('queued','running','cancel_requested') "
+                "ORDER BY updated_at DESC LIMIT 1",
+                ("sync",),
+            )
+        )
+        assert "idx_jobs_active" in plan
+        assert "TEMP B-TREE" not in plan
+    finally:
+        conn.close()
+
+
+def test_write_batch_defers_repo_commits_to_one_transaction(tmp_path):
+    from webmail_summary.index.db import write_batch
+
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    conn = get_conn(db_path)
+    other = get_conn(db_path)
+    try:
+        repo.create_job(conn, job_id="j1", kind="sync")
+        with write_batch(conn):
+            repo.set_job_status(conn, job_id="j1", status="running")
+            repo.add_event(conn, job_id="j1", level="info", text="start")
+            # Not visible to another connection until the batch commits.
+            assert other.execute("SELECT COUNT(*) FROM job_events").fetchone()[0] == 0
+        assert other.execute("SELECT COUNT(*) FROM job_events").fetchone()[0] == 1
+        job = repo.get_job(other, "j1")
+        assert job is not None and job.status == "running"
+    finally:
+        other.close()
+        conn.close()
+
+
+def test_job_writes_use_wal_with_normal_sync(tmp_path):
+    db = tmp_path / "app.sqlite3"
+    init_db(db)
+    conn = get_conn(db)
+    try:
+        # Each status/event write is its own commit; WAL + synchronous=NORMAL
+        # keeps those from fsyncing a rollback journal every time.
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] >= 5000
+    finally:
+        conn.close()
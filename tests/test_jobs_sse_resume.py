@@ -14,3 +14,82 @@ def test_parse_last_event_id_clamps_negative_value():
 def test_parse_last_event_id_falls_back_for_invalid_value():
     assert _parse_last_event_id("not-a-number") == 0
     assert _parse_last_event_id(None) == 0
+
+
+def test_progress_event_matches_json_encoding():
+    import json
+
+    from webmail_summary.api.routes_jobs import _progress_event
+    from webmail_summary.jobs.repo import JobRow
+
+    job = JobRow(
+        id="j1",
+        kind="sync",
+        status="running",
+        progress_current=3.0,
+        progress_total=10.0,
+        message='[2026-01-02] "quoted" 메일',
+        created_at="2026-01-02T00:00:00+00:00",
+        updated_at="2026-01-02T00:00:01+00:00",
+    )
+    ev = _progress_event(job, "2026-01-02").decode("ascii")
+    assert ev.startswith("event: progress\ndata: ")
+    assert ev.endswith("\n\n")
+    payload = json.loads(ev[len("event: progress\ndata: ") :])
+    assert payload == {
+        "status": "running",
+        "current": 3.0,
+        "total": 10.0,
+        "message": '[2026-01-02] "quoted" 메일',
+        "date_key": "2026-01-02",
+        "created_at": "2026-01-02T00:00:00+00:00",
+        "updated_at": "2026-01-02T00:00:01+00:00",
+    }
+
+
+def test_progress_event_stays_valid_json_for_non_finite_progress():
+    import json
+
+    from webmail_summary.api.routes_jobs import _progress_event
+    from webmail_summary.jobs.repo import JobRow
+
+    job = JobRow(
+        id="j1",
+        kind="sync",
+        status="running",
+        progress_current=float("nan"),
+        progress_total=float("inf"),
+        message="",
+        created_at="",
+        updated_at="",
+    )
+    ev = _progress_event(job, "").decode("ascii")
+    payload = json.loads(ev[len("event: progress\ndata: ") :])
+
+    assert payload["current"] == 0.0
+    assert payload["total"] == 0.0
+    assert "NaN" not in ev and "Infinity" not in ev and "inf" not in ev
+
+
+def test_log_event_escapes_text():
+    import json
+
+    from webmail_summary.api.routes_jobs import _log_event
+
+    ev = _log_event(7, "ts", "info", 'line "one"\nline two').decode("ascii")
+    head, data = ev.split("data: ", 1)
+    assert head == "id: 7\nevent: log\n"
+    assert json.loads(data) == {
+        "id": 7,
+        "ts": "ts",
+        "level": "info",
+        "text": 'line "one"\nline two',
+    }
+
+
+def test_message_date_key_extracts_bracketed_day_prefix():
+    from webmail_summary.api.routes_jobs import _message_date_key
+
+    assert _message_date_key("[2026-01-02] summarizing 3/10") == "2026-01-02"
+    assert _message_date_key("[note] not a date") == ""
+    assert _message_date_key("") == ""
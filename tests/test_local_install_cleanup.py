@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from webmail_summary.jobs.tasks_local_install import (
+    _iter_stale_model_files,
+    _path_key,
+)
+
+
+def test_iter_stale_model_files_finds_nested_models_and_markers(tmp_path: Path):
+    root = tmp_path / "gguf"
+    (root / "a").mkdir(parents=True)
+    (root / "a" / "m.gguf").write_text("x")
+    (root / "a" / "m.gguf.complete").write_text("ok\n")
+    (root / "notes.txt").write_text("keep")
+
+    found = set(_iter_stale_model_files(root))
+
+    assert found == {
+        _path_key(root / "a" / "m.gguf"),
+        _path_key(root / "a" / "m.gguf.complete"),
+    }
+
+
+def test_iter_stale_model_files_missing_root_is_empty(tmp_path: Path):
+    assert list(_iter_stale_model_files(tmp_path / "nope")) == []
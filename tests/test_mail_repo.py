@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from webmail_summary.index import mail_repo
+from webmail_summary.index.db import get_conn, init_db
+
+
+@pytest.fixture
+def conn(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    c = get_conn(db_path)
+    try:
+        yield c
+    finally:
+        c.close()
+
+
+def _upsert(
+    conn,
+    uid: int = 1,
+    *,
+    subject: str | None = None,
+    internal_date: str = "2026-04-03T09:00:00+09:00",
+    ts: str | None = None,
+) -> int:
+    return mail_repo.upsert_message(
+        conn,
+        account_id="a@x",
+        mailbox="INBOX",
+        uidvalidity=7,
+        uid=uid,
+        message_id=f"<{uid}@x>",
+        internal_date=internal_date,
+        from_addr="s@x",
+        to_addr="r@x",
+        subject=subject if subject is not None else f"subject {uid}",
+        raw_eml_path=f"/tmp/{uid}/raw.eml",
+        body_html_path=None,
+        body_text_path=None,
+        rendered_html_path=None,
+        ts=ts,
+    )
+
+
+def test_replace_attachments_and_assets_replace_previous_rows(conn):
+    fk = _upsert(conn)
+    mail_repo.replace_attachments(
+        conn,
+        message_fk=fk,
+        items=[
+            {"filename": "a.png", "size_bytes": 3, "rel_path": "attachments/a.png"},
+            {"filename": "b.pdf", "size_bytes": 5, "rel_path": "attachments/b.pdf"},
+        ],
+    )
+    mail_repo.replace_attachments(
+        conn,
+        message_fk=fk,
+        items=[{"filename": "c.txt", "size_bytes": 1, "rel_path": "attachments/c.txt", "is_inline": True}],
+    )
+    mail_repo.replace_external_assets(
+        conn,
+        message_fk=fk,
+        items=[{"original_url": "https://x.test/a.png", "status": "downloaded"}],
+    )
+    mail_repo.replace_external_assets(conn, message_fk=fk, items=[])
+
+    rows = conn.execute(
+        "SELECT filename, is_inline FROM attachments WHERE message_fk=?", (fk,)
+    ).fetchall()
+    assert [tuple(r) for r in rows] == [("c.txt", 1)]
+    assert conn.execute("SELECT COUNT(*) FROM external_assets").fetchone()[0] == 0
+
+
+def test_upsert_message_returns_same_id_on_conflict(conn):
+    first = _upsert(conn, uid=5)
+    other = _upsert(conn, uid=6)
+    again = _upsert(conn, uid=5, subject="edited")
+    conn.commit()
+
+    assert again == first != other
+    row = conn.execute("SELECT subject FROM messages WHERE id=?", (first,)).fetchone()
+    assert row[0] == "edited"
+
+
+def test_upsert_message_without_returning_falls_back_to_select(conn, monkeypatch):
+    monkeypatch.setattr(mail_repo, "_HAS_RETURNING", False)
+    first = _upsert(conn, uid=9)
+
+    assert _upsert(conn, uid=9) == first
+
+
+def test_list_messages_by_date_matches_day_in_date_order(conn):
+    _upsert(conn, uid=1, internal_date="2026-04-03T18:00:00+09:00")
+    _upsert(conn, uid=2, internal_date="2026-04-03T08:00:00+09:00")
+    _upsert(conn, uid=3, internal_date="2026-04-04T00:00:00+09:00")
+
+    rows = mail_repo.list_messages_by_date(conn, date_prefix="2026-04-03")
+
+    assert [r.subject for r in rows] == ["subject 2", "subject 1"]
+    assert rows[0][1] == "subject 2"
+    plan = " ".join(
+        str(r[3])
+        for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM messages "
+            "WHERE internal_date >= ? AND internal_date < ? ORDER BY internal_date ASC",
+            ("2026-04-03", "2026-04-04"),
+        )
+    )
+    assert "idx_messages_internal_date" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_readonly_connection_rejects_writes(tmp_path):
+    db_path = tmp_path / "ro.sqlite3"
+    init_db(db_path)
+    ro = get_conn(db_path, readonly=True)
+    try:
+        assert ro.execute("SELECT COUNT(*) FROM messages").fetchone()[0] == 0
+        with pytest.raises(sqlite3.OperationalError):
+            ro.execute("INSERT INTO settings(key, value) VALUES ('k', 'v')")
+    finally:
+        ro.close()
+
+
+def test_init_db_migrates_in_one_transaction_and_is_idempotent(tmp_path):
+    db_path = tmp_path / "fresh.sqlite3"
+    init_db(db_path)
+    init_db(db_path)
+
+    c = get_conn(db_path)
+    try:
+        assert [r[0] for r in c.execute("SELECT version FROM schema_version")] == [8]
+        names = {
+            r[0]
+            for r in c.execute("SELECT name FROM sqlite_master WHERE type IN ('table','index')")
+        }
+        assert {"settings", "jobs", "messages", "daily_overviews", "idx_messages_day_date"} <= names
+        assert "idx_messages_day_prefix" not in names
+    finally:
+        c.close()
+
+
+def test_list_messages_by_date_ignores_malformed_day(conn):
+    _upsert(conn, uid=1)
+
+    assert mail_repo.list_messages_by_date(conn, date_prefix="2026-04") == []
+
+
+def test_writers_reuse_a_caller_supplied_timestamp(conn):
+    ts = "2026-04-03T00:00:00+00:00"
+    fk = _upsert(conn, ts=ts)
+    mail_repo.replace_attachments(
+        conn,
+        message_fk=fk,
+        items=[{"filename": "a.png", "size_bytes": 3, "rel_path": "attachments/a.png"}],
+        ts=ts,
+    )
+    mail_repo.replace_external_assets(
+        conn,
+        message_fk=fk,
+        items=[{"original_url": "https://x.test/a.png", "status": "downloaded"}],
+        ts=ts,
+    )
+
+    assert conn.execute("SELECT archived_at FROM messages WHERE id=?", (fk,)).fetchone()[0] == ts
+    assert conn.execute("SELECT created_at FROM attachments").fetchone()[0] == ts
+    assert conn.execute("SELECT created_at FROM external_assets").fetchone()[0] == ts
+
+
+def test_set_analysis_stores_compact_json_lists(conn):
+    fk = _upsert(conn)
+    mail_repo.set_analysis(
+        conn, message_fk=fk, summary="s", tags=["a", "비"], topics=["t1", "t2"], personal=False
+    )
+
+    row = conn.execute("SELECT tags_json, topics_json FROM messages WHERE id=?", (fk,)).fetchone()
+    assert row[0] == '["a","\\ube44"]'
+    assert row[1] == '["t1","t2"]'
+
+
+@pytest.mark.parametrize("json_each", [True, False])
+def test_list_messages_for_resummarize_by_ids_handles_large_id_lists(conn, monkeypatch, json_each):
+    monkeypatch.setattr(mail_repo, "_HAS_JSON_EACH", json_each)
+    first = _upsert(conn, uid=1, internal_date="2026-04-03T10:00:00+09:00")
+    second = _upsert(conn, uid=2, internal_date="2026-04-03T09:00:00+09:00")
+    ids = [first, second, first] + list(range(10_000, 12_000))
+
+    rows = mail_repo.list_messages_for_resummarize_by_ids(conn, message_ids=ids)
+
+    assert [r[0] for r in rows] == [second, first]
+
+
+def test_set_seen_marked_and_exported_only_write_the_first_time(conn):
+    fk = _upsert(conn)
+
+    assert mail_repo.set_exported(conn, message_fk=fk, exported_at="t1") is True
+    assert mail_repo.set_exported(conn, message_fk=fk, exported_at="t2") is False
+    assert mail_repo.set_seen_marked(conn, message_fk=fk) is True
+    first_seen = conn.execute("SELECT seen_marked_at FROM messages WHERE id=?", (fk,)).fetchone()[0]
+    assert mail_repo.set_seen_marked(conn, message_fk=fk) is False
+
+    row = conn.execute("SELECT exported_at, seen_marked_at FROM messages WHERE id=?", (fk,)).fetchone()
+    assert row[0] == "t1"
+    assert row[1] == first_seen
+
+
+def test_get_conn_reuses_the_threads_closed_connection(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+
+    first = get_conn(db_path)
+    nested = get_conn(db_path)
+    assert nested is not first
+    first.execute("INSERT INTO settings(key, value) VALUES ('k', 'v')")
+    first.close()
+    nested.close()
+
+    again = get_conn(db_path)
+    try:
+        assert again is first
+        assert again.execute("SELECT COUNT(*) FROM settings WHERE key='k'").fetchone()[0] == 0
+        assert isinstance(again.execute("SELECT 1 AS x").fetchone(), sqlite3.Row)
+    finally:
+        again.close()
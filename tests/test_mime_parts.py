@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from email.message import EmailMessage
+
+from webmail_summary.archive.mime_parts import extract_attachments
+
+
+def _message() -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = "hello"
+    msg.set_content("plain body")
+    msg.add_alternative("<p>html body</p>", subtype="html")
+    msg.add_attachment(
+        b"\x00\x01binary" * 10,
+        maintype="application",
+        subtype="octet-stream",
+        filename="data.bin",
+    )
+    return msg
+
+
+def test_extract_attachments_records_payload_size(tmp_path):
+    saved, cid_map = extract_attachments(msg=_message(), out_dir=tmp_path)
+
+    assert [a.filename for a in saved] == ["data.bin"]
+    assert saved[0].size_bytes == len(b"\x00\x01binary" * 10)
+    assert (tmp_path / "data.bin").stat().st_size == saved[0].size_bytes
+    assert cid_map == {}
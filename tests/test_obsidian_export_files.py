@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import datetime as dt
+
+from webmail_summary.export.obsidian import exporter
+from webmail_summary.export.obsidian.exporter import MessageExportInput, export_email_note
+
+
+def test_link_or_copy_replaces_stale_destination(tmp_path):
+    src = tmp_path / "src.txt"
+    dst = tmp_path / "dst.txt"
+    src.write_text("new", encoding="utf-8")
+    dst.write_text("old", encoding="utf-8")
+
+    exporter._link_or_copy(src, dst)
+    assert dst.read_text(encoding="utf-8") == "new"
+
+    # Re-exporting the same file is a no-op.
+    exporter._link_or_copy(src, dst)
+    assert dst.read_text(encoding="utf-8") == "new"
+
+
+def test_export_email_note_places_archive_files_in_vault(tmp_path):
+    archive = tmp_path / "archive"
+    (archive / "attachments" / "nested").mkdir(parents=True)
+    (archive / "body.txt").write_text("body", encoding="utf-8")
+    (archive / "raw.eml").write_bytes(b"From: a\r\n\r\nhi")
+    (archive / "attachments" / "a.png").write_bytes(b"png")
+    (archive / "attachments" / "nested" / "b.bin").write_bytes(b"bin")
+    vault = tmp_path / "vault"
+
+    export_email_note(
+        vault_root=vault,
+        inp=MessageExportInput(
+            message_key="k1",
+            date=dt.date(2026, 1, 2),
+            sender="a@example.com",
+            subject="Hello",
+            summary="s",
+            tags=[],
+            topics=[],
+            archive_dir=archive,
+        ),
+    )
+
+    assets = vault / "Assets" / "k1"
+    assert (assets / "body.txt").read_text(encoding="utf-8") == "body"
+    assert (assets / "attachments" / "a.png").read_bytes() == b"png"
+    assert (assets / "attachments" / "nested" / "b.bin").read_bytes() == b"bin"
+    assert (vault / "Raw" / "k1.eml").read_bytes() == b"From: a\r\n\r\nhi"
+
+
+def test_first_images_filters_by_extension_and_caps_count(tmp_path):
+    for i in range(25):
+        (tmp_path / f"img{i}.PNG").write_bytes(b"x")
+    (tmp_path / "doc.pdf").write_bytes(b"x")
+    (tmp_path / "noext").write_bytes(b"x")
+    (tmp_path / "dir.png").mkdir()
+
+    names = exporter._first_images(tmp_path)
+    assert len(names) == 20
+    assert all(n.lower().endswith(".png") and n.startswith("img") for n in names)
+    assert exporter._first_images(tmp_path / "missing") == []
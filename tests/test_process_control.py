@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from webmail_summary.util.process_control import (
+    kill_pidfd,
+    open_pidfd,
+    process_group_subprocess_kwargs,
+    terminate_process_tree,
+    wait_pidfd,
+)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="pidfd is Linux-only")
+def test_pidfd_wait_and_kill_child():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    pidfd = open_pidfd(proc.pid)
+    if pidfd is None:
+        proc.kill()
+        proc.wait()
+        pytest.skip("pidfd_open unavailable on this kernel")
+    try:
+        assert wait_pidfd(pidfd, 0) is False
+        kill_pidfd(pidfd)
+        assert wait_pidfd(pidfd, 5.0) is True
+        assert proc.wait(timeout=0) == -9
+    finally:
+        os.close(pidfd)
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX process groups")
+def test_terminate_process_tree_signals_the_childs_group():
+    psutil = pytest.importorskip("psutil")
+    spawn = (
+        "import subprocess, sys, time\n"
+        "p = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])\n"
+        "print(p.pid, flush=True)\n"
+        "time.sleep(30)\n"
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-c", spawn],
+        stdout=subprocess.PIPE,
+        text=True,
+        **process_group_subprocess_kwargs(),
+    )
+    assert proc.stdout is not None
+    try:
+        grandchild = psutil.Process(int(proc.stdout.readline()))
+        terminate_process_tree(proc.pid)
+        assert proc.wait(timeout=5) != 0
+        gone, _ = psutil.wait_procs([grandchild], timeout=5)
+        assert gone or grandchild.status() == psutil.STATUS_ZOMBIE
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
@@ -82,7 +82,8 @@ def test_refresh_overviews_for_dates_updates_selected_day(tmp_path, monkeypatch)
         lambda provider,
         day,
         summaries,
-        user_profile=None: f"- {day} ({len(summaries)})",
+        user_profile=None,
+        stop=None: f"- {day} ({len(list(summaries))})",
     )
 
     refreshed = refresh_overviews_for_dates(
@@ -125,7 +126,7 @@ def test_refresh_overviews_for_dates_skips_up_to_date_day(tmp_path, monkeypatch)
     monkeypatch.setattr(
         mod,
         "synthesize_daily_overview",
-        lambda provider, day, summaries, user_profile=None: "- 새 개요",
+        lambda provider, day, summaries, user_profile=None, stop=None: "- 새 개요",
     )
 
     refreshed = refresh_overviews_for_dates(
@@ -145,3 +146,219 @@ def test_refresh_overviews_for_dates_skips_up_to_date_day(tmp_path, monkeypatch)
     conn.close()
     assert row is not None
     assert row[0] == "- 기존 개요"
+
+
+def test_load_day_inputs_buckets_summaries_and_timestamps_per_day(tmp_path):
+    from webmail_summary.jobs.tasks_refresh_overviews import _load_day_inputs
+
+    db = tmp_path / "db.sqlite3"
+    _mk_db(db)
+    conn = sqlite3.connect(db)
+    conn.executemany(
+        "INSERT INTO messages(internal_date, summary, summarized_at) VALUES (?, ?, ?)",
+        [
+            ("2026-03-30T11:00:00+09:00", "- b", "2026-03-30T11:05:00+09:00"),
+            ("2026-03-30T10:00:00+09:00", "- a", "2026-03-30T12:00:00+09:00"),
+            ("2026-03-31T09:00:00+09:00", "  ", None),
+            ("2026-04-01T09:00:00+09:00", "- other day", "2026-04-01T09:05:00+09:00"),
+        ],
+    )
+    conn.execute(
+        "INSERT INTO daily_overviews(day, overview, updated_at) VALUES (?, ?, ?)",
+        ("2026-03-30", "- ov", "2026-03-30T13:00:00+09:00"),
+    )
+    statements: list[str] = []
+    conn.set_trace_callback(statements.append)
+
+    inputs = _load_day_inputs(conn, ["2026-03-30", "2026-03-31"])
+    conn.close()
+
+    assert len(statements) == 3
+    assert inputs.summaries == {"2026-03-30": ["- a", "- b"]}
+    assert inputs.max_summarized_at == {"2026-03-30": "2026-03-30T12:00:00+09:00"}
+    assert inputs.overview_updated_at == {"2026-03-30": "2026-03-30T13:00:00+09:00"}
+
+
+def test_day_input_queries_use_the_day_expression_index(tmp_path):
+    from webmail_summary.index.db import get_conn, init_db
+
+    db = tmp_path / "app.sqlite3"
+    init_db(db)
+    conn = get_conn(db)
+    plans: list[str] = []
+    conn.set_trace_callback(plans.append)
+    try:
+        from webmail_summary.jobs.tasks_refresh_overviews import _load_day_inputs
+
+        _load_day_inputs(conn, ["2026-03-30"])
+        conn.set_trace_callback(None)
+        message_queries = [q for q in plans if "FROM messages" in q]
+        assert len(message_queries) == 2
+        for q in message_queries:
+            plan = " ".join(
+                str(r[-1]) for r in conn.execute("EXPLAIN QUERY PLAN " + q)
+            )
+            assert "idx_messages_day_date" in plan
+    finally:
+        conn.close()
+
+
+def test_refresh_overviews_for_dates_stops_before_llm_after_cancel(
+    tmp_path, monkeypatch
+):
+    import threading
+
+    db = tmp_path / "db.sqlite3"
+    _mk_db(db)
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "INSERT INTO messages(internal_date, summary, summarized_at) VALUES (?, ?, ?)",
+        ("2026-03-30T10:00:00+09:00", "- 첫 메일", "2026-03-30T10:05:00+09:00"),
+    )
+    conn.commit()
+    conn.close()
+
+    import webmail_summary.jobs.tasks_refresh_overviews as mod
+
+    calls: list[str] = []
+
+    def fake_synthesize(provider, day, summaries, user_profile=None, stop=None):
+        calls.append(day)
+        return "- x"
+
+    monkeypatch.setattr(mod, "synthesize_daily_overview", fake_synthesize)
+    cancel = threading.Event()
+    cancel.set()
+
+    refreshed = refresh_overviews_for_dates(
+        db_path=db,
+        provider=_DummyProvider(),
+        settings=_settings(),
+        date_keys=["2026-03-30"],
+        cancel=cancel,
+    )
+
+    assert refreshed == []
+    assert calls == []
+
+
+def test_synthesize_daily_overview_skips_provider_when_stopped():
+    import threading
+
+    from webmail_summary.llm.base import LlmProvider
+    from webmail_summary.llm.long_summarize import synthesize_daily_overview
+
+    class _FailProvider(LlmProvider):
+        def summarize(self, **kwargs):
+            raise AssertionError("provider must not be called")
+
+    stop = threading.Event()
+    stop.set()
+
+    assert (
+        synthesize_daily_overview(
+            _FailProvider(), day="2026-03-30", summaries=["- a"], stop=stop
+        )
+        == ""
+    )
+
+
+def test_synthesize_daily_overview_reads_summaries_only_up_to_its_budget():
+    import threading
+
+    from webmail_summary.llm.base import LlmProvider
+    from webmail_summary.llm.long_summarize import synthesize_daily_overview
+
+    class _FailProvider(LlmProvider):
+        def summarize(self, **kwargs):
+            raise AssertionError("provider must not be called")
+
+    consumed = 0
+
+    def _summaries():
+        nonlocal consumed
+        for n in range(10_000):
+            consumed += 1
+            yield f"- item {n}"
+
+    stop = threading.Event()
+    stop.set()
+
+    synthesize_daily_overview(
+        _FailProvider(), day="2026-03-30", summaries=_summaries(), stop=stop
+    )
+
+    assert consumed == 24
+
+
+def test_normalize_days_keeps_first_valid_occurrence_in_order():
+    from webmail_summary.jobs.tasks_refresh_overviews import _normalize_days
+
+    assert _normalize_days(
+        [" 2026-03-30", "bad", "2026-03-29", "2026-03-30", "", "2026-3-1"]
+    ) == ["2026-03-30", "2026-03-29"]
+    assert _normalize_days(None) == []
+
+
+def test_overview_is_current_compares_iso_text_and_mixed_offsets():
+    from webmail_summary.jobs.tasks_refresh_overviews import _overview_is_current
+
+    assert _overview_is_current(
+        "2026-03-30T12:00:00+00:00", "2026-03-30T11:59:59.999999+00:00"
+    )
+    assert not _overview_is_current(
+        "2026-03-30T12:00:00+00:00", "2026-03-30T12:00:00.000001+00:00"
+    )
+    # 12:00+09:00 is 03:00Z, earlier than 04:00Z.
+    assert not _overview_is_current(
+        "2026-03-30T12:00:00+09:00", "2026-03-30T04:00:00+00:00"
+    )
+    assert not _overview_is_current(None, "2026-03-30T04:00:00+00:00")
+    assert not _overview_is_current("garbage", "2026-03-30T04:00:00+00:00")
+
+
+def test_refresh_overviews_for_dates_writes_skip_events_in_one_commit(
+    tmp_path, monkeypatch
+):
+    from webmail_summary.index.db import get_conn, init_db
+    from webmail_summary.jobs import repo
+
+    db = tmp_path / "db.sqlite3"
+    init_db(db)
+    conn = get_conn(db)
+    try:
+        repo.create_job(conn, job_id="job-1", kind="refresh-overviews")
+    finally:
+        conn.close()
+
+    import webmail_summary.jobs.tasks_refresh_overviews as mod
+
+    statements: list[str] = []
+    real_get_conn = mod.get_conn
+
+    def traced_get_conn(path):
+        conn = real_get_conn(path)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(mod, "get_conn", traced_get_conn)
+
+    refresh_overviews_for_dates(
+        db_path=db,
+        provider=_DummyProvider(),
+        settings=_settings(),
+        date_keys=["2026-03-28", "2026-03-29", "2026-03-30"],
+        job_id="job-1",
+    )
+
+    conn = sqlite3.connect(db)
+    texts = [
+        r[0] for r in conn.execute("SELECT text FROM job_events ORDER BY id")
+    ]
+    conn.close()
+    assert texts == [
+        "[2026-03-28] 요약 데이터가 없어 건너뜀",
+        "[2026-03-29] 요약 데이터가 없어 건너뜀",
+        "[2026-03-30] 요약 데이터가 없어 건너뜀",
+    ]
+    assert sum(1 for q in statements if q.strip().upper() == "COMMIT") == 1
@@ -18,3 +18,78 @@ def test_needs_resummarize_when_no_summary_or_placeholder():
 
 def test_needs_resummarize_when_ok_summary():
     assert _needs_resummarize("- 일정 확정\n- 요청 사항") is False
+
+
+def test_needs_resummarize_matches_markers_across_case_and_punctuation():
+    assert _needs_resummarize("No-Summary!") is True
+    assert _needs_resummarize("- Loading Model...") is True
+    assert _needs_resummarize("```json\n{}\n```") is True
+    assert _needs_resummarize("- summary of the model launch") is False
+
+
+def test_sql_prefilter_keeps_every_row_needing_resummarize(tmp_path):
+    from webmail_summary.index.db import get_conn, init_db
+    from webmail_summary.index.mail_repo import (
+        list_messages_for_resummarize_by_date,
+        list_messages_for_resummarize_by_dates,
+        set_analysis,
+        upsert_message,
+    )
+
+    summaries = [
+        "",
+        "   ",
+        "　{\"summary\": 1}",
+        " ```json\n{}\n```",
+        "(LLM timeout)",
+        "No-Summary!",
+        "### 상세 요약\n- (상세 요약 항목이 부족합니다.)",
+        "- Loading Model...",
+        "- 일정 확정\n- 요청 사항",
+        "- summary of the model launch",
+    ]
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    conn = get_conn(db_path)
+    try:
+        for uid, summary in enumerate(summaries, start=1):
+            msg_id = upsert_message(
+                conn,
+                account_id="acct",
+                mailbox="INBOX",
+                uidvalidity=1,
+                uid=uid,
+                message_id=f"<{uid}@example.com>",
+                internal_date=f"2026-04-16T09:00:{uid:02d}+09:00",
+                from_addr="a@example.com",
+                to_addr="b@example.com",
+                subject=f"s{uid}",
+                raw_eml_path="",
+                body_html_path=None,
+                body_text_path=None,
+                rendered_html_path=None,
+            )
+            set_analysis(
+                conn,
+                message_fk=msg_id,
+                summary=summary,
+                tags=[],
+                topics=[],
+                personal=False,
+                summarize_ms=0,
+            )
+
+        one_day = list_messages_for_resummarize_by_date(
+            conn, date_prefix="2026-04-16", needs_resummarize_only=True
+        )
+        many_days = list_messages_for_resummarize_by_dates(
+            conn, date_keys=["2026-04-16", "2026-04-17"], needs_resummarize_only=True
+        )
+    finally:
+        conn.close()
+
+    expected = [s for s in summaries if _needs_resummarize(s)]
+    assert len(expected) == 8
+    for rows in (one_day, many_days):
+        assert [r[8] for r in rows if _needs_resummarize(str(r[8] or ""))] == expected
+        assert "- 일정 확정\n- 요청 사항" not in [r[8] for r in rows]
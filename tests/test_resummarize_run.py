@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from webmail_summary.index.db import get_conn, init_db
+from webmail_summary.index.mail_repo import (
+    ResummarizeRow,
+    set_analysis,
+    upsert_message,
+)
+from webmail_summary.jobs import repo
+from webmail_summary.llm.base import LlmResult
+
+
+class CloudProvider:
+    tier = "cloud"
+
+
+def _seed_failed(conn, *, uid: int, archive_root: Path) -> None:
+    msg_dir = archive_root / f"msg-{uid}"
+    msg_dir.mkdir(parents=True, exist_ok=True)
+    (msg_dir / "body.txt").write_text(f"body {uid}", encoding="utf-8")
+    msg_id = upsert_message(
+        conn,
+        account_id="acct",
+        mailbox="INBOX",
+        uidvalidity=1,
+        uid=uid,
+        message_id=f"<{uid}@example.com>",
+        internal_date="2026-04-16T09:00:00+09:00",
+        from_addr="sender@example.com",
+        to_addr="user@example.com",
+        subject=f"mail-{uid}",
+        raw_eml_path=str(msg_dir / "raw.eml"),
+        body_html_path=None,
+        body_text_path=str(msg_dir / "body.txt"),
+        rendered_html_path=None,
+    )
+    set_analysis(
+        conn,
+        message_fk=msg_id,
+        summary="(LLM timeout)",
+        tags=[],
+        topics=[],
+        personal=False,
+        summarize_ms=0,
+    )
+
+
+def _prepare_run(tmp_path, monkeypatch, *, provider, summarize, uids=(1, 2, 3, 4)):
+    from webmail_summary.jobs import tasks_resummarize as mod
+
+    data_dir = tmp_path / "data"
+    db_path = data_dir / "db.sqlite3"
+    init_db(db_path)
+    conn = get_conn(db_path)
+    try:
+        for uid in uids:
+            _seed_failed(conn, uid=uid, archive_root=tmp_path / "archive")
+        repo.create_job(conn, job_id="job-1", kind="resummarize-day")
+    finally:
+        conn.close()
+
+    settings = SimpleNamespace(
+        obsidian_root=str(tmp_path / "vault"),
+        sender_filter="",
+        cloud_provider="openai",
+        openrouter_model="",
+        user_roles="",
+        user_interests="",
+    )
+    monkeypatch.setattr(mod, "get_app_data_dir", lambda: data_dir)
+    monkeypatch.setattr(mod, "load_settings", lambda conn: settings)
+    monkeypatch.setattr(mod, "get_llm_provider", lambda _settings: provider)
+    monkeypatch.setattr(mod, "_cloud_base_delay_seconds", lambda *_a: 0.0)
+    monkeypatch.setattr(mod, "summarize_email_long_aware", summarize)
+    monkeypatch.setattr(mod, "refresh_overviews_for_dates", lambda **_kw: [])
+    monkeypatch.setattr(
+        mod, "export_email_note", lambda *, vault_root, inp: Path(vault_root) / "n.md"
+    )
+    monkeypatch.setattr(mod, "export_daily_note", lambda **_kw: None)
+    return mod, db_path
+
+
+def test_cloud_resummarize_overlaps_llm_calls_and_saves_in_order(
+    tmp_path, monkeypatch
+):
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def _fake_summarize(
+        _provider, *, subject, body, on_detail, on_progress, user_profile
+    ):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        on_detail({"type": "llm_test", "subject": subject})
+        time.sleep(0.5)
+        on_progress(1.0)
+        with lock:
+            in_flight -= 1
+        return LlmResult(
+            summary=f"- {subject} done", tags=[], backlinks=[], personal=False
+        )
+
+    mod, db_path = _prepare_run(
+        tmp_path, monkeypatch, provider=CloudProvider(), summarize=_fake_summarize
+    )
+    run = mod.resummarize_day_task(date_key="2026-04-16", only_failed=True)
+    run("job-1", threading.Event())
+
+    assert peak > 1
+
+    conn = get_conn(db_path)
+    try:
+        summaries = [
+            r[0] for r in conn.execute("SELECT summary FROM messages ORDER BY uid")
+        ]
+        updated = [
+            r[0]
+            for r in conn.execute(
+                "SELECT text FROM job_events WHERE job_id=? AND level='message_updated'"
+                " ORDER BY id",
+                ("job-1",),
+            )
+        ]
+        details = [
+            json.loads(r[0])
+            for r in conn.execute(
+                "SELECT text FROM job_events WHERE job_id=? AND level='detail'"
+                " ORDER BY id",
+                ("job-1",),
+            )
+        ]
+    finally:
+        conn.close()
+
+    assert summaries == [f"- mail-{uid} done" for uid in (1, 2, 3, 4)]
+    assert [json.loads(u)["summary"] for u in updated] == summaries
+    # Details from calls that ran ahead are logged once the run reaches
+    # their item, so each one follows its own item header.
+    order = [
+        d["index"] if d.get("type") == "email" else d["subject"]
+        for d in details
+        if d.get("type") in ("email", "llm_test")
+    ]
+    assert order == [1, "mail-1", 2, "mail-2", 3, "mail-3", 4, "mail-4"]
+
+
+def test_local_resummarize_throttles_llm_sub_progress_writes(tmp_path, monkeypatch):
+    class _LocalProvider:
+        tier = "standard"
+
+    def _fake_summarize(
+        _provider, *, subject, body, on_detail, on_progress, user_profile
+    ):
+        for step in range(1, 201):
+            on_progress(step / 200)
+        return LlmResult(
+            summary=f"- {subject} done", tags=[], backlinks=[], personal=False
+        )
+
+    mod, db_path = _prepare_run(
+        tmp_path,
+        monkeypatch,
+        provider=_LocalProvider(),
+        summarize=_fake_summarize,
+        uids=(1,),
+    )
+    currents: list[float] = []
+    original_update_progress = mod.repo.update_progress
+
+    def _capture(conn, *, job_id, current, total, message):
+        currents.append(current)
+        return original_update_progress(
+            conn, job_id=job_id, current=current, total=total, message=message
+        )
+
+    monkeypatch.setattr(mod.repo, "update_progress", _capture)
+
+    run = mod.resummarize_day_task(date_key="2026-04-16", only_failed=True)
+    run("job-1", threading.Event())
+
+    # 200 on_progress calls; only the first and the final one reach SQLite.
+    assert len(currents) < 20
+    assert currents[-1] == 1
+
+
+def test_token_bucket_bursts_to_capacity_then_paces():
+    from webmail_summary.jobs.tasks_resummarize import _TokenBucket
+
+    bucket = _TokenBucket(20.0, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    burst_s = time.monotonic() - started
+    for _ in range(2):
+        bucket.acquire()
+    paced_s = time.monotonic() - started
+
+    assert burst_s < 0.04
+    assert paced_s >= 0.09
+
+
+def _body_row(
+    tmp_path, *, body_text_path: str = "", body_html_path: str = ""
+) -> ResummarizeRow:
+    return ResummarizeRow(
+        id=1,
+        account_id="acct",
+        mailbox="INBOX",
+        uidvalidity=1,
+        uid=1,
+        subject="s",
+        from_addr="",
+        internal_date="2026-04-16T09:00:00+09:00",
+        summary="",
+        raw_eml_path=str(tmp_path / "raw.eml"),
+        body_text_path=body_text_path,
+        body_html_path=body_html_path,
+        topics_json="[]",
+    )
+
+
+def test_load_body_reads_body_text_and_ignores_rendered_html(tmp_path):
+    from webmail_summary.jobs.tasks_resummarize import _load_body_for_llm
+
+    (tmp_path / "rendered.html").write_text(
+        "<title>Newsletter</title><p>Visible</p>", encoding="utf-8"
+    )
+    (tmp_path / "body.txt").write_text("Visible", encoding="utf-8")
+
+    row = _body_row(tmp_path, body_text_path=str(tmp_path / "body.txt"))
+    assert _load_body_for_llm(row) == "Visible"
+    assert _load_body_for_llm(_body_row(tmp_path)) == ""
+
+
+def test_load_body_reads_legacy_body_html(tmp_path):
+    from webmail_summary.jobs.tasks_resummarize import _load_body_for_llm
+
+    (tmp_path / "body.html").write_text(
+        "<p>Visible</p><blockquote>quoted</blockquote>", encoding="utf-8"
+    )
+    row = _body_row(tmp_path, body_html_path=str(tmp_path / "body.html"))
+
+    assert _load_body_for_llm(row) == "Visible"
+
+
+def test_full_resummarize_hands_overview_summaries_from_memory(
+    tmp_path, monkeypatch
+):
+    class _LocalProvider:
+        tier = "standard"
+
+    def _fake_summarize(
+        _provider, *, subject, body, on_detail, on_progress, user_profile
+    ):
+        return LlmResult(
+            summary=f"- {subject} redone", tags=[], backlinks=[], personal=False
+        )
+
+    mod, _db_path = _prepare_run(
+        tmp_path,
+        monkeypatch,
+        provider=_LocalProvider(),
+        summarize=_fake_summarize,
+        uids=(1, 2),
+    )
+    captured: dict[str, Any] = {}
+    monkeypatch.setattr(
+        mod, "refresh_overviews_for_dates", lambda **kw: captured.update(kw) or []
+    )
+
+    run = mod.resummarize_day_task(date_key="2026-04-16", only_failed=False)
+    run("job-1", threading.Event())
+
+    assert captured["date_keys"] == ["2026-04-16"]
+    assert captured["inputs"].summaries == {
+        "2026-04-16": ["- mail-1 redone", "- mail-2 redone"]
+    }
+
+
+def test_resummarize_exports_notes_off_the_job_thread_in_order(
+    tmp_path, monkeypatch
+):
+    class _LocalProvider:
+        tier = "standard"
+
+    def _fake_summarize(
+        _provider, *, subject, body, on_detail, on_progress, user_profile
+    ):
+        return LlmResult(summary=f"- {subject}", tags=[], backlinks=[], personal=False)
+
+    mod, _db_path = _prepare_run(
+        tmp_path, monkeypatch, provider=_LocalProvider(), summarize=_fake_summarize
+    )
+    export_threads: set[str] = set()
+    daily_notes: list[list[str]] = []
+
+    def _fake_export_email_note(*, vault_root, inp):
+        export_threads.add(threading.current_thread().name)
+        return Path(vault_root) / f"{inp.subject}.md"
+
+    def _fake_export_daily_note(*, vault_root, date, message_notes, daily_summary):
+        daily_notes.append([p.stem for p in message_notes])
+
+    monkeypatch.setattr(mod, "export_email_note", _fake_export_email_note)
+    monkeypatch.setattr(mod, "export_daily_note", _fake_export_daily_note)
+
+    run = mod.resummarize_day_task(date_key="2026-04-16", only_failed=True)
+    run("job-1", threading.Event())
+
+    assert threading.current_thread().name not in export_threads
+    assert daily_notes == [["mail-1", "mail-2", "mail-3", "mail-4"]]
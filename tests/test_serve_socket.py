@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import os
+import socket
+
+import pytest
+
+from webmail_summary.app.serve import _bind_listen_socket, _http_url
+
+
+def test_http_url_brackets_ipv6_hosts():
+    assert _http_url("127.0.0.1", 8000) == "http://127.0.0.1:8000/"
+    assert _http_url("::1", 8000) == "http://[::1]:8000/"
+    assert _http_url("[::1]", 8000) == "http://[::1]:8000/"
+
+
+@pytest.mark.skipif(os.name == "nt", reason="SO_REUSEADDR is left off on Windows")
+def test_bind_listen_socket_sets_reuseaddr():
+    sock = _bind_listen_socket("127.0.0.1", 0)
+    try:
+        assert sock.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR)
+        assert sock.getsockname()[1] > 0
+    finally:
+        sock.close()
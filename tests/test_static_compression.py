@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import gzip
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from webmail_summary.app.static_files import CompressedStaticFiles
+
+
+def _client(tmp_path) -> TestClient:
+    (tmp_path / "app.css").write_text("body { color: red; }\n" * 200, encoding="utf-8")
+    (tmp_path / "tiny.css").write_text("a{}", encoding="utf-8")
+    app = FastAPI()
+    app.mount("/static", CompressedStaticFiles(directory=str(tmp_path)), name="static")
+    return TestClient(app)
+
+
+def test_static_serves_gzip_variant_when_accepted(tmp_path):
+    client = _client(tmp_path)
+    r = client.get("/static/app.css?v=1", headers={"Accept-Encoding": "gzip"})
+
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert "immutable" in r.headers["cache-control"]
+    assert r.text.startswith("body { color: red; }")
+    assert r.headers.get("etag")
+
+
+def test_static_serves_identity_without_gzip_or_for_small_files(tmp_path):
+    client = _client(tmp_path)
+    r = client.get("/static/app.css", headers={"Accept-Encoding": "identity"})
+    assert r.status_code == 200
+    assert "content-encoding" not in r.headers
+    assert r.headers["cache-control"] == "no-cache"
+
+    small = client.get("/static/tiny.css", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_static_gzip_body_is_cached_per_file(tmp_path):
+    static = CompressedStaticFiles(directory=str(tmp_path))
+    (tmp_path / "x.js").write_text("console.log(1);\n" * 200, encoding="utf-8")
+    first = static._gzip_bytes(str(tmp_path / "x.js"))
+    second = static._gzip_bytes(str(tmp_path / "x.js"))
+
+    assert first is second
+    assert gzip.decompress(first or b"").startswith(b"console.log(1);")
+
+
+def test_static_gzip_variant_has_its_own_etag_and_revalidates(tmp_path):
+    client = _client(tmp_path)
+    plain = client.get("/static/app.css", headers={"Accept-Encoding": "identity"})
+    gz = client.get("/static/app.css", headers={"Accept-Encoding": "gzip"})
+
+    assert gz.headers["etag"] != plain.headers["etag"]
+    assert gz.headers["etag"].endswith('-gz"')
+
+    again = client.get(
+        "/static/app.css",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": gz.headers["etag"]},
+    )
+    assert again.status_code == 304
+    assert again.headers["vary"] == "Accept-Encoding"
+
+    plain_again = client.get(
+        "/static/app.css",
+        headers={"Accept-Encoding": "identity", "If-None-Match": plain.headers["etag"]},
+    )
+    assert plain_again.status_code == 304
+    assert plain_again.headers["vary"] == "Accept-Encoding"
+
+
+def test_static_only_v_query_parameter_marks_immutable(tmp_path):
+    client = _client(tmp_path)
+    r = client.get("/static/app.css?dev=1", headers={"Accept-Encoding": "identity"})
+
+    assert r.headers["cache-control"] == "no-cache"
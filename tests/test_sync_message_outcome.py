@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from webmail_summary.index import mail_repo
+from webmail_summary.index.db import get_conn, init_db
+from webmail_summary.jobs import repo
+from webmail_summary.jobs.tasks_sync import _save_message_outcome
+from webmail_summary.llm.base import LlmResult
+
+
+def _setup(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    init_db(db_path)
+    conn = get_conn(db_path)
+    try:
+        repo.create_job(conn, job_id="j1", kind="sync")
+        fk = mail_repo.upsert_message(
+            conn,
+            account_id="a@x",
+            mailbox="INBOX",
+            uidvalidity=7,
+            uid=1,
+            message_id="<1@x>",
+            internal_date="2026-04-03T09:00:00+09:00",
+            from_addr="s@x",
+            to_addr="r@x",
+            subject="hello",
+            raw_eml_path="/tmp/1/raw.eml",
+            body_html_path=None,
+            body_text_path=None,
+            rendered_html_path=None,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    return db_path, fk
+
+
+def test_save_message_outcome_writes_everything_in_one_commit(tmp_path):
+    db_path, fk = _setup(tmp_path)
+    statements: list[str] = []
+    conn = get_conn(db_path)
+    conn.set_trace_callback(statements.append)
+    conn.close()
+    try:
+        _save_message_outcome(
+            db_path=db_path,
+            job_id="j1",
+            message_fk=fk,
+            llm_res=LlmResult(
+                summary="요약", tags=["t"], backlinks=["topic"], personal=False
+            ),
+            summarize_ms=1200,
+            exported=True,
+            seen_marked=True,
+            events=[("warn", "slow")],
+            progress={"current": 1, "total": 1, "message": "done"},
+        )
+    finally:
+        conn.set_trace_callback(None)
+
+    assert [s for s in statements if s.strip().upper() == "COMMIT"] == ["COMMIT"]
+    conn = get_conn(db_path)
+    try:
+        row = conn.execute(
+            "SELECT summary, exported_at, seen_marked_at FROM messages WHERE id = ?",
+            (fk,),
+        ).fetchone()
+        assert row["summary"] == "요약"
+        assert row["exported_at"] and row["seen_marked_at"]
+        events = repo.get_events_since(conn, job_id="j1", last_id=0)
+        assert [(e["level"], e["text"]) for e in events] == [("warn", "slow")]
+        job = repo.get_job(conn, "j1")
+        assert job is not None and job.message == "done"
+    finally:
+        conn.close()
+
+
+def test_save_message_outcome_analysis_step_leaves_retry_marks_unset(tmp_path):
+    db_path, fk = _setup(tmp_path)
+    _save_message_outcome(
+        db_path=db_path,
+        job_id="j1",
+        message_fk=fk,
+        llm_res=LlmResult(summary="(LLM timeout)", tags=[], backlinks=[], personal=False),
+    )
+    conn = get_conn(db_path)
+    try:
+        row = conn.execute(
+            "SELECT summary, exported_at, seen_marked_at FROM messages WHERE id = ?",
+            (fk,),
+        ).fetchone()
+        assert row["summary"] == "(LLM timeout)"
+        assert row["exported_at"] is None and row["seen_marked_at"] is None
+    finally:
+        conn.close()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from concurrent.futures import Future
+
+from webmail_summary.jobs.tasks_sync import _prefetched
+
+
+def _done(value) -> Future:
+    fut: Future = Future()
+    fut.set_result(value)
+    return fut
+
+
+def test_prefetched_submits_ahead_and_preserves_order():
+    submitted: list[int] = []
+
+    def submit(item):
+        submitted.append(item)
+        return _done(item * 10)
+
+    it = _prefetched(iter(range(5)), submit, 2)
+    item, fut = next(it)
+
+    assert item == 0 and fut.result() == 0
+    # Two items are already in flight beyond the one being consumed.
+    assert submitted == [0, 1, 2]
+    rest = [(i, f.result()) for i, f in it]
+    assert rest == [(1, 10), (2, 20), (3, 30), (4, 40)]
+
+
+def test_prefetched_with_zero_depth_is_lockstep():
+    submitted: list[int] = []
+
+    def submit(item):
+        submitted.append(item)
+        return _done(item)
+
+    it = _prefetched(iter([1, 2]), submit, 0)
+    next(it)
+    assert submitted == [1]
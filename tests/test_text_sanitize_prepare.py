@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from webmail_summary.util.text_sanitize import prepare_body_for_llm
+from webmail_summary.util.text_sanitize import html_to_visible_text, prepare_body_for_llm
 
 
 def test_prepare_body_keeps_forwarded_content_after_header_block():
@@ -58,3 +58,40 @@ def test_prepare_body_does_not_return_empty_for_forwarded_like_input():
 
     assert out.strip() != ""
     assert "다락편지 1383호" in out
+
+
+def test_html_to_visible_text_drops_hidden_quoted_and_head_content():
+    html = (
+        "<html><head><title>T</title><style>p{}</style></head><body>"
+        "<p>Hello</p><div style='display:none'>hidden</div>"
+        "<blockquote>quoted</blockquote><p>World &amp; co</p></body></html>"
+    )
+
+    assert html_to_visible_text(html) == "Hello\nWorld & co"
+
+
+def test_html_file_to_visible_text_matches_in_memory_extraction(tmp_path):
+    from webmail_summary.util import text_sanitize
+
+    html = (
+        "<html><body><p>Hi</p><div class='note gmail_quote'>old</div>"
+        + "<p>line</p>" * 8000
+        + "<pre> \n </pre><ruby>漢<rt>kan</rt></ruby><!-- c -->tail</body></html>"
+    )
+    path = tmp_path / "rendered.html"
+    path.write_text(html, encoding="utf-8")
+
+    out = text_sanitize.html_file_to_visible_text(path)
+
+    assert len(html) > text_sanitize._FEED_CHARS
+    assert out == html_to_visible_text(html)
+    assert out.startswith("Hi\nline\n")
+    assert out.endswith("line\n \n \n漢\ntail")
+
+
+def test_sanitize_text_for_llm_replaces_nul_and_lone_surrogates():
+    from webmail_summary.util.text_sanitize import sanitize_text_for_llm
+
+    assert sanitize_text_for_llm("a\x00b") == "a b"
+    assert sanitize_text_for_llm("plain ascii") == "plain ascii"
+    assert sanitize_text_for_llm("한\ud800글\x00") == "한?글 "
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import io
+
+from webmail_summary.jobs import worker_sync
+
+
+def test_serve_worker_answers_each_job_id(monkeypatch):
+    ran: list[str] = []
+
+    def fake_run_worker(job_id: str) -> None:
+        ran.append(job_id)
+        if job_id == "bad":
+            raise RuntimeError("imap\nlogin failed")
+
+    monkeypatch.setattr(worker_sync, "run_worker", fake_run_worker)
+    replies = io.StringIO()
+
+    worker_sync.serve_worker(io.StringIO("ok1\n\nbad\nok2\n"), replies)
+
+    assert ran == ["ok1", "bad", "ok2"]
+    assert replies.getvalue().splitlines() == [
+        "OK ok1",
+        "ERR bad imap login failed",
+        "OK ok2",
+    ]